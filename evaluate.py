@@ -4,6 +4,8 @@ This takes a jsonl file produced by link_benchmark.py with one linked
 article and its ground truth labels per line.
 The resulting evaluation cases are written to an output file in jsonl format
 with one case per line.
+An index of the evaluation cases file with the position and error label
+counts of each article is written to a .eval_cases.index.json file.
 The evaluation results are printed.
 """
 
@@ -13,11 +15,13 @@ import json
 import re
 
 from elevant import settings
-from elevant.utils import log
+from elevant.utils import log, json_serialization
 from elevant.utils.colors import Colors
+from elevant.utils.columnar_storage import convert_jsonl_to_columnar, COLUMNAR_FILE_EXTENSION
 from elevant.evaluation.benchmark import get_available_benchmarks
 from elevant.evaluation.benchmark_iterator import get_benchmark_iterator
 from elevant.models.article import article_from_json
+from elevant.evaluation.eval_cases_index import EvalCasesIndexWriter, get_index_filename
 from elevant.evaluation.evaluator import Evaluator
 from elevant.utils.knowledge_base_mapper import KnowledgeBaseMapper
 
@@ -57,6 +61,7 @@ def main(args):
         idx = input_file_name.rfind('.linked_articles.jsonl')
         output_filename = args.output_file if args.output_file else input_file_name[:idx] + ".eval_cases.jsonl"
         output_file = open(output_filename, 'w', encoding='utf8')
+        index_writer = EvalCasesIndexWriter()
         results_file = (args.output_file[:-len(".eval_cases.jsonl")] if args.output_file else input_file_name[:idx]) \
             + ".eval_results.json"
 
@@ -117,10 +122,13 @@ def main(args):
             cases = evaluator.evaluate_article(article)
 
             case_list = [case.to_dict() for case in cases]
-            output_file.write(json.dumps(case_list) + "\n")
+            case_line = json_serialization.dumps(case_list)
+            output_file.write(case_line + "\n")
+            index_writer.add_article(case_line, case_list)
 
         results_dict = evaluator.get_results_dict()
         evaluator.print_results()
+        evaluator.entity_lookups.log_stats()
         evaluator.reset_variables()
 
         with open(results_file, "w") as f:
@@ -145,6 +153,14 @@ def main(args):
 
         output_file.close()
         logger.info(f"Wrote evaluation cases to {Colors.BOLD}{output_filename}{Colors.END}")
+        index_filename = get_index_filename(output_filename)
+        index_writer.write(index_filename, output_filename)
+        logger.info(f"Wrote evaluation cases index to {Colors.BOLD}{index_filename}{Colors.END}")
+
+        if args.columnar:
+            columnar_filename = output_filename[:-len(".jsonl")] + COLUMNAR_FILE_EXTENSION
+            convert_jsonl_to_columnar(output_filename, columnar_filename)
+            logger.info(f"Wrote evaluation cases in columnar format to {Colors.BOLD}{columnar_filename}{Colors.END}")
 
 
 if __name__ == "__main__":
@@ -175,6 +191,9 @@ if __name__ == "__main__":
                         help="Ignore predicted links that do not have a type from the provided type whitelist.")
     parser.add_argument("-c", "--custom_kb", action="store_true",
                         help="Use custom entity to name and entity to type mappings (instead of Wikidata mappings).")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Additionally write the evaluation cases in columnar format to a file with "
+                             f"{COLUMNAR_FILE_EXTENSION} extension.")
 
     logger = log.setup_logger(sys.argv[0])
     logger.debug(' '.join(sys.argv))
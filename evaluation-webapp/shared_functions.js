@@ -8,6 +8,7 @@ window.BENCHMARK_EXTENSION = ".benchmark.jsonl"
 window.RESULTS_EXTENSION = ".eval_results.json";
 window.METADATA_EXTENSION = ".metadata.json";
 window.EVALUATION_RESULT_PATH = "evaluation-results";
+window.RESULTS_API_PATH = "api/results";
 
 window.MAX_SELECTED_APPROACHES = 2;
 window.MAX_CACHED_FILES = 15;
@@ -451,6 +452,54 @@ function read_benchmark_articles() {
 }
 
 function read_evaluation_results() {
+    /*
+     * Read the evaluation results and metadata of all experiments from the results API of the web app server.
+     * If the web app is served by a plain file server, read them from the evaluation results directory.
+     */
+    return $.getJSON(RESULTS_API_PATH).then(function(data) {
+        $.each(data["experiments"], function(experiment_id, experiment) {
+            add_evaluation_results(experiment_id, EVALUATION_RESULT_PATH + "/" + experiment["path"], experiment["results"]);
+            if (experiment["metadata"] !== null) window.experiments_metadata[experiment_id] = experiment["metadata"];
+        });
+    }, function() {
+        return read_evaluation_results_from_directory();
+    });
+}
+
+function add_evaluation_results(experiment_id, path, results) {
+    /*
+     * Add the evaluation results of the experiment with the given file path prefix.
+     */
+    // Add the radio buttons for the different evaluation modes if they haven't been added yet
+    if ($('#evaluation_overview #evaluation_modes').find("input").length === 0) {
+        add_eval_mode_radio_buttons(results);
+    }
+
+    window.evaluation_result_files[experiment_id] = path;
+
+    // Filter out certain keys in results according to config
+    $.each(results, function (eval_mode) {
+        $.each(results[eval_mode]["error_categories"], function (key) {
+            if ("hide_error_checkboxes" in window.config && window.config["hide_error_checkboxes"].includes(key))
+                delete results[eval_mode]["error_categories"][key];
+        });
+        $.each(results[eval_mode]["entity_types"], function (key) {
+            let type_label = key.toLowerCase().replace(/Q[0-9]+:/g, "");
+            type_label = type_label.replace(" ", "_");
+            if ("hide_type_checkboxes" in window.config && (window.config["hide_type_checkboxes"].includes(key) ||
+                window.config["hide_type_checkboxes"].includes(type_label)))
+                delete results[eval_mode]["entity_types"][key];
+        });
+        $.each(results[eval_mode]["mention_types"], function (key) {
+            if ("hide_mention_checkboxes" in window.config && window.config["hide_mention_checkboxes"].includes(key))
+                delete results[eval_mode]["mention_types"][key];
+        });
+    })
+    // Add results for experiment to array
+    window.evaluation_results.push([experiment_id, results]);
+}
+
+function read_evaluation_results_from_directory() {
     let folders = [];
     let results_urls = [];
     let metadata_urls = [];
@@ -479,33 +528,7 @@ function read_evaluation_results() {
                     let experiment_id = url.substring(url.lastIndexOf("/") + 1, url.length - RESULTS_EXTENSION.length);
 
                     return $.getJSON(url, function (results) {
-                        // Add the radio buttons for the different evaluation modes if they haven't been added yet
-                        if ($('#evaluation_overview #evaluation_modes').find("input").length === 0) {
-                            add_eval_mode_radio_buttons(results);
-                        }
-
-                        window.evaluation_result_files[experiment_id] = url.substring(0, url.length - RESULTS_EXTENSION.length);
-
-                        // Filter out certain keys in results according to config
-                        $.each(results, function (eval_mode) {
-                            $.each(results[eval_mode]["error_categories"], function (key) {
-                                if ("hide_error_checkboxes" in window.config && window.config["hide_error_checkboxes"].includes(key))
-                                    delete results[eval_mode]["error_categories"][key];
-                            });
-                            $.each(results[eval_mode]["entity_types"], function (key) {
-                                let type_label = key.toLowerCase().replace(/Q[0-9]+:/g, "");
-                                type_label = type_label.replace(" ", "_");
-                                if ("hide_type_checkboxes" in window.config && (window.config["hide_type_checkboxes"].includes(key) ||
-                                    window.config["hide_type_checkboxes"].includes(type_label)))
-                                    delete results[eval_mode]["entity_types"][key];
-                            });
-                            $.each(results[eval_mode]["mention_types"], function (key) {
-                                if ("hide_mention_checkboxes" in window.config && window.config["hide_mention_checkboxes"].includes(key))
-                                    delete results[eval_mode]["mention_types"][key];
-                            });
-                        })
-                        // Add results for experiment to array
-                        window.evaluation_results.push([experiment_id, results]);
+                        add_evaluation_results(experiment_id, url.substring(0, url.length - RESULTS_EXTENSION.length), results);
                     })
                 })),
                 // Retrieve experiments metadata for table tooltips and the first table column text
@@ -0,0 +1,259 @@
+"""
+Links the articles of several benchmarks with several linkers and evaluates
+the linking results in a single run.
+
+This is equivalent to running link_benchmark.py once per linker followed by
+evaluate.py for each linking result, but resources that are shared between
+the runs are only loaded once:
+
+    - the benchmark readers are created once
+    - the entity database and spaCy model used for evaluation are loaded once
+    - entity database mappings used by linkers are loaded once and shared
+      between all linkers
+
+Linked articles are passed directly to the evaluation instead of being read
+back from the linked articles file.
+The usual output files are written for each linker and benchmark:
+<evaluation_dir>/<linker_name>/<experiment_name>.<benchmark_name>.linked_articles.jsonl,
+.metadata.json, .eval_cases.jsonl, .eval_cases.index.json and .eval_results.json
+
+Linkers are specified as [<experiment_name>=]<linker_name>[:<linker_config>],
+e.g. "refined" or "spacy.wikidata=spacy:configs/spacy_wikidata.config.json".
+The experiment name defaults to the linker name.
+
+With --processes > 1, several linkers are run in parallel. LMDB database
+environments must not be used across fork(), so each worker process loads
+the shared resources once itself instead of inheriting them from the main
+process, and reuses them for all linkers it runs. The linking system of a
+linker is freed after its run, but mappings that were loaded through the
+mapping registry stay loaded in the worker process, where they are shared
+with later linkers that use them. Each process therefore holds the shared
+resources and the registered mappings of the linkers it has run, so choose
+the number of processes according to the available memory.
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from elevant import settings
+from elevant.utils import log, json_serialization
+from elevant.utils.colors import Colors
+from elevant.utils.columnar_storage import convert_jsonl_to_columnar, COLUMNAR_FILE_EXTENSION
+from elevant.evaluation.benchmark import get_available_benchmarks
+from elevant.evaluation.benchmark_iterator import get_benchmark_iterator
+from elevant.evaluation.eval_cases_index import EvalCasesIndexWriter, get_index_filename
+from elevant.evaluation.evaluator import Evaluator
+from elevant.linkers.linkers import Linkers, CoreferenceLinkers, parse_linker_spec
+from elevant.linkers.linking_system import LinkingSystem
+from elevant.linkers.oracle_linker import link_entities_with_oracle
+from elevant.models.article import article_from_json
+from elevant.models.entity_database import EntityDatabase
+from elevant.utils.utils import convert_to_filename
+
+# Resources that are shared between all linker runs of a process. They are set by load_shared_resources() in the
+# main process or, with several processes, in each worker process.
+benchmark_readers = {}
+evaluator = None
+linker_entity_dbs = {}
+
+
+def write_metadata(metadata_filename: str, experiment_name: str, linker_name: str,
+                   linking_system: Optional[LinkingSystem], linking_time: float):
+    linker_config = linking_system.get_linker_config() if linking_system else {}
+    exp_description = None
+    if args.description:
+        exp_description = args.description
+    elif "experiment_description" in linker_config:
+        exp_description = linker_config["experiment_description"]
+    if "linker_name" in linker_config:
+        linker_name = linker_config["linker_name"]
+    metadata = {"experiment_name": experiment_name,
+                "experiment_description": exp_description,
+                "linker_name": linker_name,
+                "timestamp": datetime.now().strftime("%Y/%m/%d %H:%M"),
+                "linking_time": linking_time}
+    with open(metadata_filename, "w", encoding="utf8") as metadata_file:
+        metadata_file.write(json.dumps(metadata))
+
+
+def link_and_evaluate_benchmark(article_iterator, benchmark: str, experiment_name: str, linker_name: str,
+                                linking_system: Optional[LinkingSystem]):
+    output_dir = args.evaluation_dir.rstrip("/") + "/" + linker_name
+    os.makedirs(output_dir, exist_ok=True)
+    filename_prefix = output_dir + "/" + convert_to_filename(experiment_name) + "." + benchmark
+    linked_articles_filename = filename_prefix + ".linked_articles.jsonl"
+    eval_cases_filename = filename_prefix + ".eval_cases.jsonl"
+
+    logger.info(f"Linking entities in {Colors.BLUE}{benchmark}{Colors.END} benchmark with "
+                f"{Colors.BLUE}{experiment_name}{Colors.END} ...")
+    evaluator.reset_variables()
+    index_writer = EvalCasesIndexWriter()
+    linking_time = 0
+    n_articles = 0
+    with open(linked_articles_filename, "w", encoding="utf8") as linked_articles_file, \
+            open(eval_cases_filename, "w", encoding="utf8") as eval_cases_file:
+        for article in article_iterator:
+            start_time = time.time()
+            evaluation_span = article.evaluation_span if args.evaluation_span else None
+            if linking_system:
+                linking_system.link_entities(article, args.uppercase, args.only_pronouns, evaluation_span)
+            else:
+                link_entities_with_oracle(article)
+            linking_time += time.time() - start_time
+            article_json = article.to_json()
+            linked_articles_file.write(article_json + "\n")
+
+            # Evaluate the article exactly as evaluate.py would evaluate the line in the linked articles file
+            cases = evaluator.evaluate_article(article_from_json(article_json))
+            case_list = [case.to_dict() for case in cases]
+            case_line = json_serialization.dumps(case_list)
+            eval_cases_file.write(case_line + "\n")
+            index_writer.add_article(case_line, case_list)
+            n_articles += 1
+
+    index_writer.write(get_index_filename(eval_cases_filename), eval_cases_filename)
+    write_metadata(filename_prefix + ".metadata.json", experiment_name, linker_name, linking_system, linking_time)
+    results_filename = filename_prefix + ".eval_results.json"
+    with open(results_filename, "w") as results_file:
+        results_file.write(json.dumps(evaluator.get_results_dict()))
+    logger.info(f"Wrote {n_articles} linked articles to {Colors.BOLD}{linked_articles_filename}{Colors.END}")
+    logger.info(f"Wrote evaluation cases to {Colors.BOLD}{eval_cases_filename}{Colors.END}")
+    logger.info(f"Wrote results to {Colors.BOLD}{results_filename}{Colors.END}")
+
+    if args.columnar:
+        for filename in (linked_articles_filename, eval_cases_filename):
+            convert_jsonl_to_columnar(filename, filename[:-len(".jsonl")] + COLUMNAR_FILE_EXTENSION)
+
+
+def link_and_evaluate_linker(linker_spec: str) -> str:
+    """
+    Links and evaluates all benchmarks with the given linker.
+    """
+    experiment_name, linker_name, linker_config = parse_linker_spec(linker_spec)
+    linking_system = None
+    if linker_name != "oracle":
+        entity_db = linker_entity_dbs[LinkingSystem.uses_entity_set(linker_name, args.coreference_linker)]
+        linking_system = LinkingSystem(linker_name,
+                                       linker_config,
+                                       coref_linker=args.coreference_linker,
+                                       min_score=args.minimum_score,
+                                       type_mapping_file=args.type_mapping,
+                                       custom_kb=args.custom_kb,
+                                       entity_db=entity_db)
+
+    for benchmark, benchmark_reader in benchmark_readers.items():
+        link_and_evaluate_benchmark(benchmark_reader.iterate(), benchmark, experiment_name, linker_name,
+                                    linking_system)
+
+    # Free the linker before the next linker of the process is loaded
+    del linking_system
+    gc.collect()
+    return experiment_name
+
+
+def load_linker_entity_dbs(linker_specs: List[str]) -> Dict[bool, EntityDatabase]:
+    """
+    Linkers that use the set of all entities in Wikipedia and linkers that
+    don't must not share an entity database, since some linkers behave
+    differently depending on whether the entity set is loaded.
+    The entity set and entity types and names are loaded once per process.
+    """
+    entity_dbs = {False: EntityDatabase(), True: EntityDatabase()}
+    linker_names = [parse_linker_spec(linker_spec)[1] for linker_spec in linker_specs]
+    if any(LinkingSystem.uses_entity_set(linker_name, args.coreference_linker) for linker_name in linker_names):
+        entity_dbs[True].load_all_entities_in_wikipedia(minimum_sitelink_count=args.minimum_score)
+        entity_dbs[True].load_entity_types(args.type_mapping)
+        entity_dbs[True].load_entity_names()
+    return entity_dbs
+
+
+def load_shared_resources(benchmarks: List[str]):
+    """
+    Loads the benchmark readers, the evaluator and the entity databases of
+    the linkers that are shared between all linker runs of a process.
+    """
+    global evaluator, linker_entity_dbs
+
+    for benchmark in benchmarks:
+        benchmark_readers[benchmark] = get_benchmark_iterator(benchmark)
+
+    whitelist_file = settings.CUSTOM_WHITELIST_TYPES_FILE if args.custom_kb else settings.WHITELIST_FILE
+    evaluator = Evaluator(args.type_mapping, whitelist_file=whitelist_file, contains_unknowns=not args.no_unknowns,
+                          custom_kb=args.custom_kb)
+    linker_entity_dbs = load_linker_entity_dbs(args.linkers)
+
+
+def main():
+    benchmarks = get_available_benchmarks() if "ALL" in args.benchmark else args.benchmark
+
+    start_time = time.time()
+    if args.processes > 1:
+        # The main process must not open any LMDB environment before the worker processes are forked, since an
+        # environment must not be used across fork(). Each worker process loads the shared resources once itself
+        # and reuses them for all linkers it runs.
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes=args.processes, initializer=load_shared_resources,
+                          initargs=(benchmarks,)) as pool:
+            for experiment_name in pool.imap_unordered(link_and_evaluate_linker, args.linkers):
+                logger.info(f"Finished linking and evaluating with {Colors.BLUE}{experiment_name}{Colors.END}")
+    else:
+        load_shared_resources(benchmarks)
+        for linker_spec in args.linkers:
+            link_and_evaluate_linker(linker_spec)
+    logger.info(f"Linked and evaluated {len(benchmarks)} benchmarks with {len(args.linkers)} linkers in "
+                f"{time.time() - start_time:.1f} s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=__doc__)
+
+    parser.add_argument("-l", "--linkers", type=str, nargs='+', required=True,
+                        help="Linkers in the format [<experiment_name>=]<linker_name>[:<linker_config>]. Linker names: "
+                             + ", ".join([li.value for li in Linkers] + ["oracle"]))
+    parser.add_argument("-b", "--benchmark", choices=get_available_benchmarks() + ["ALL"], required=True, nargs='+',
+                        help="Benchmark(s) over which to evaluate the linkers.")
+    parser.add_argument("-dir", "--evaluation_dir", default=settings.EVALUATION_RESULTS_DIR,
+                        help="Directory to which the evaluation result files are written.")
+    parser.add_argument("-p", "--processes", type=int, default=1,
+                        help="Number of linkers to run in parallel. Default is 1, i.e. no multiprocessing.")
+    parser.add_argument("-coref", "--coreference_linker", choices=[cl.value for cl in CoreferenceLinkers],
+                        help="Coreference linker to apply after entity linkers.")
+    parser.add_argument("--only_pronouns", action="store_true",
+                        help="Only link coreferences that are pronouns.")
+    parser.add_argument("--evaluation_span", action="store_true",
+                        help="If specified, let coreference linker refer only to entities within the evaluation span")
+    parser.add_argument("-min", "--minimum_score", type=int, default=0,
+                        help="Minimum entity score to include entity in database")
+    parser.add_argument("--uppercase", action="store_true",
+                        help="Set to remove all predictions on snippets which do not contain an uppercase character.")
+    parser.add_argument("--type_mapping", type=str, default=settings.QID_TO_WHITELIST_TYPES_DB,
+                        help="Map predicted and groundtruth entities to types using the given mapping.")
+    parser.add_argument("--description", "-desc", type=str,
+                        help="A description for the experiments. This will be displayed in the webapp.")
+    parser.add_argument("--no-unknowns", action="store_true",
+                        help="Set if the benchmarks contain no 'unknown' labels. "
+                             "Uppercase false detections will be treated as 'unknown named entity' errors.")
+    parser.add_argument("-c", "--custom_kb", action="store_true",
+                        help="Use custom entity to name and entity to type mappings (instead of Wikidata mappings).")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Additionally write the linked articles and evaluation cases in columnar format to files "
+                             f"with {COLUMNAR_FILE_EXTENSION} extension.")
+
+    logger = log.setup_logger(sys.argv[0])
+    logger.debug(' '.join(sys.argv))
+
+    args = parser.parse_args()
+
+    for spec in args.linkers:
+        if parse_linker_spec(spec)[1] not in [li.value for li in Linkers] + ["oracle"]:
+            parser.error(f"Unknown linker in linker specification \"{spec}\".")
+
+    main()
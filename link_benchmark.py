@@ -23,6 +23,9 @@ from tqdm import tqdm
 from elevant import settings
 from elevant.utils import log
 from elevant.utils.colors import Colors
+from elevant.utils.linking_profiler import LinkingProfiler
+from elevant.utils import linking_profiler
+from elevant.utils.columnar_storage import convert_jsonl_to_columnar, COLUMNAR_FILE_EXTENSION
 from elevant.evaluation.benchmark import get_available_benchmarks
 from elevant.evaluation.benchmark_iterator import get_benchmark_iterator
 from elevant.linkers.linkers import Linkers, CoreferenceLinkers, PredictionFormats
@@ -43,10 +46,16 @@ def main(args):
                                        args.minimum_score,
                                        args.type_mapping,
                                        args.custom_kb,
-                                       args.api_url)
+                                       args.api_url,
+                                       args.lazy_predictions)
 
     benchmarks = get_available_benchmarks() if "ALL" in args.benchmark else args.benchmark
 
+    profiler = None
+    if args.profile or args.profile_output:
+        profiler = LinkingProfiler(args.profile_output)
+        profiler.activate()
+
     for benchmark in benchmarks:
         benchmark_iterator = get_benchmark_iterator(benchmark)
 
@@ -66,13 +75,21 @@ def main(args):
 
         n_articles = 0
         start_time = time.time()
+        if profiler:
+            profiler.reset()
         for i, article in enumerate(tqdm(benchmark_iterator.iterate(), desc="Linking progress", unit=" articles")):
+            if profiler:
+                profiler.start_article()
             evaluation_span = article.evaluation_span if args.evaluation_span else None
             if args.linker_name == "oracle":
                 link_entities_with_oracle(article)
             else:
                 linking_system.link_entities(article, args.uppercase, args.only_pronouns, evaluation_span)
-            output_file.write(article.to_json() + '\n')
+            with linking_profiler.stage("json_serialization"):
+                article_json = article.to_json()
+            output_file.write(article_json + '\n')
+            if profiler:
+                profiler.end_article()
             n_articles = i+1
         linking_time = time.time() - start_time
 
@@ -99,11 +116,27 @@ def main(args):
                         "linker_name": linker_name,
                         "timestamp": datetime.now().strftime("%Y/%m/%d %H:%M"),
                         "linking_time": linking_time if args.linker_name else None}
+            if profiler:
+                metadata["linking_profile"] = profiler.get_summary()
             metadata_file.write(json.dumps(metadata))
 
         logger.info(f"Wrote metadata to {Colors.BOLD}{metadata_filename}{Colors.END}")
         logger.info(f"Wrote {n_articles} linked articles to {Colors.BOLD}{output_filename}{Colors.END}")
 
+        if args.columnar:
+            columnar_filename = output_filename[:-len(".jsonl")] + COLUMNAR_FILE_EXTENSION
+            convert_jsonl_to_columnar(output_filename, columnar_filename)
+            logger.info(f"Wrote linked articles in columnar format to {Colors.BOLD}{columnar_filename}{Colors.END}")
+
+        if linking_system and getattr(linking_system.linker, "global_prediction_cache_size", 0) > 0:
+            linking_system.linker.log_global_prediction_cache_stats()
+
+        if profiler:
+            profiler.log_summary()
+
+    if profiler:
+        profiler.deactivate()
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -128,6 +161,9 @@ if __name__ == "__main__":
                         help="Format of the prediction file.")
     parser.add_argument("-pname", "--prediction_name", default="Unknown Linker",
                         help="Name of the system that produced the predictions.")
+    parser.add_argument("--lazy_predictions", action="store_true",
+                        help="Read predictions from the prediction file on demand using an article index instead of "
+                             "loading all predictions into memory. The index is stored next to the prediction file.")
 
     parser.add_argument("-b", "--benchmark", choices=get_available_benchmarks() + ["ALL"], required=True, nargs='+',
                         help="Benchmark(s) over which to evaluate the linker.")
@@ -150,6 +186,16 @@ if __name__ == "__main__":
                         help="A description for the experiment. This will be displayed in the webapp.")
     parser.add_argument("-c", "--custom_kb", action="store_true",
                         help="Use custom entity to name and entity to type mappings (instead of Wikidata mappings).")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Additionally write the linked articles in columnar format to a file with "
+                             f"{COLUMNAR_FILE_EXTENSION} extension.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record wall and CPU time per linking stage and LMDB lookups per article and write "
+                             "their percentiles to the metadata file.")
+    parser.add_argument("--profile_output", type=str,
+                        help="Implies --profile. Additionally profile the linking with cProfile and write the profile "
+                             "to the given file. If the file ends with .html and pyinstrument is installed, "
+                             "pyinstrument is used instead.")
 
     logger = log.setup_logger(sys.argv[0])
     logger.debug(' '.join(sys.argv))
@@ -1,10 +1,9 @@
 import argparse
 import sys
-import json
 import spacy
 
 from elevant import settings
-from elevant.utils import log
+from elevant.utils import log, json_serialization
 from elevant.evaluation.benchmark import get_available_benchmarks
 from elevant.evaluation.benchmark_statistics import BenchmarkStatistics
 from elevant.utils.colors import Colors
@@ -34,7 +33,7 @@ def main(args):
         benchmark_cases = stats.analyze_benchmark(benchmark, args.only_root_labels)
         json_string = ""
         for article_cases in benchmark_cases:
-            json_string += json.dumps([case.to_dict() for case in article_cases])
+            json_string += json_serialization.dumps([case.to_dict() for case in article_cases])
             json_string += "\n"
 
         # Write the benchmark cases and statistics to an output file
@@ -91,6 +91,9 @@ if __name__ == "__main__":
                         help="Port for the API.")
     parser.add_argument("-i", "--input_predictions", type=str,
                         help="Read linked articles from file.")
+    parser.add_argument("--lazy_mappings", action="store_true",
+                        help="Load mappings only when they are accessed for the first time. Reduces the startup time "
+                             "of the API.")
 
     logger = log.setup_logger(sys.argv[0])
     logger.debug(' '.join(sys.argv))
@@ -115,7 +118,8 @@ if __name__ == "__main__":
                                    args.prediction_name,
                                    args.coreference_linker,
                                    args.minimum_score,
-                                   args.type_mapping)
+                                   args.type_mapping,
+                                   lazy_mappings=args.lazy_mappings)
 
     if not args.wikidata_annotations and not linking_system.entity_db.is_wikidata_to_wikipedia_mapping_loaded():
         linking_system.entity_db.load_wikidata_to_wikipedia_mapping()
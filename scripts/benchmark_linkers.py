@@ -0,0 +1,304 @@
+"""
+Measures the throughput and memory usage of linkers on benchmarks.
+
+Each linker is run on each benchmark in a separate process so that no
+in-process cache (e.g. loaded spaCy models or memoized lookups) is warmed up
+by another linker or benchmark. In the process, the linking system is loaded
+and the benchmark is linked once (cold run) and, in warm mode, linked again
+after the first run (warm run). For each run, articles/s, tokens/s, the peak
+RSS during the run and the mean time per article of each linking stage are
+recorded. The peak RSS of a run can only be measured on Linux and is null
+otherwise. Startup time and memory usage after startup are taken from the
+process of the first benchmark, the peak RSS of the linker is the maximum
+over all of its processes.
+
+The results are appended as one JSON line to a history file. If a baseline
+file is given, the results are compared against it and the script exits
+with status 1 if the throughput dropped or the peak memory usage increased
+by more than the given tolerance.
+
+Linkers are specified as [<name>=]<linker_name>[:<linker_config>], as for
+link_and_evaluate.py.
+
+Example:
+    python3 scripts/benchmark_linkers.py -l baseline popular-entities -b kore50 msnbc --mode warm \
+        --baseline linker_performance_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from elevant.utils import log
+from elevant.utils.colors import Colors
+from elevant.evaluation.benchmark import get_available_benchmarks
+from elevant.linkers.linkers import parse_linker_spec
+
+TOKEN_REGEX = re.compile(r"\w+|[^\w\s]")
+RESULT_PREFIX = "BENCHMARK_RESULT "
+COLD = "cold"
+WARM = "warm"
+
+
+def get_process_peak_rss_mb() -> float:
+    """
+    Returns the peak RSS of the process since its start.
+    """
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak RSS of the process (VmHWM) to its current RSS. Only
+    supported on Linux. Returns False if the peak RSS could not be reset.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak RSS of the process since the last reset_peak_rss() or
+    None if it can not be read.
+    """
+    try:
+        with open("/proc/self/status", "r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def link_articles(linking_system, articles, profiler) -> Dict[str, Any]:
+    from elevant.utils import linking_profiler
+
+    profiler.reset()
+    n_tokens = sum(len(TOKEN_REGEX.findall(article.text)) for article in articles)
+    peak_rss_is_reset = reset_peak_rss()
+    start_time = time.perf_counter()
+    for article in articles:
+        profiler.start_article()
+        linking_system.link_entities(article)
+        with linking_profiler.stage("json_serialization"):
+            article.to_json()
+        profiler.end_article()
+    seconds = time.perf_counter() - start_time
+    peak_rss = get_peak_rss_mb() if peak_rss_is_reset else None
+    summary = profiler.get_summary()
+    return {"n_articles": len(articles),
+            "n_tokens": n_tokens,
+            "seconds": seconds,
+            "articles_per_second": len(articles) / seconds if seconds > 0 else 0,
+            "tokens_per_second": n_tokens / seconds if seconds > 0 else 0,
+            "peak_rss_mb": peak_rss,
+            "stages_ms_per_article": {name: times["wall_time"]["mean"] * 1000
+                                      for name, times in summary["stages"].items()},
+            "counters_per_article": {name: values["mean"] for name, values in summary["counters"].items()}}
+
+
+def run_worker(config: Dict[str, Any]):
+    """
+    Loads the linking system and links the benchmark. Runs in a separate process.
+    """
+    from elevant.evaluation.benchmark_iterator import get_benchmark_iterator
+    from elevant.linkers.linking_system import LinkingSystem
+    from elevant.utils.linking_profiler import LinkingProfiler
+
+    _, linker_name, linker_config = parse_linker_spec(config["linker"])
+    linking_system = LinkingSystem(linker_name, linker_config, coref_linker=config["coreference_linker"])
+    startup_time = time.time() - config["start_time"]
+    result = {"startup_seconds": startup_time, "startup_peak_rss_mb": get_process_peak_rss_mb()}
+
+    profiler = LinkingProfiler()
+    profiler.activate()
+    benchmark_reader = get_benchmark_iterator(config["benchmark"])
+    # Articles are read before the time measurement starts. Each run gets fresh articles.
+    runs = {COLD: link_articles(linking_system, list(benchmark_reader.iterate(config["n_articles"])), profiler)}
+    if config["mode"] == WARM:
+        runs[WARM] = link_articles(linking_system, list(benchmark_reader.iterate(config["n_articles"])), profiler)
+    profiler.deactivate()
+    result["runs"] = runs
+    result["peak_rss_mb"] = get_process_peak_rss_mb()
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def run_worker_process(linker_spec: str, benchmark: str, args) -> Optional[Dict[str, Any]]:
+    config = {"linker": linker_spec,
+              "coreference_linker": args.coreference_linker,
+              "benchmark": benchmark,
+              "n_articles": args.n_articles,
+              "mode": args.mode,
+              "start_time": time.time()}
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config)],
+                             stdout=subprocess.PIPE, universal_newlines=True)
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    logger.error(f"Benchmarking linker {linker_spec} on {benchmark} failed with exit code {process.returncode}.")
+    return None
+
+
+def run_linker(linker_spec: str, args) -> Optional[Dict[str, Any]]:
+    """
+    Links each benchmark in a fresh process and combines the results.
+    """
+    result = None
+    for benchmark in args.benchmark:
+        worker_result = run_worker_process(linker_spec, benchmark, args)
+        if worker_result is None:
+            return None
+        if result is None:
+            result = {"startup_seconds": worker_result["startup_seconds"],
+                      "startup_peak_rss_mb": worker_result["startup_peak_rss_mb"],
+                      "peak_rss_mb": worker_result["peak_rss_mb"],
+                      "benchmarks": {}}
+        result["peak_rss_mb"] = max(result["peak_rss_mb"], worker_result["peak_rss_mb"])
+        result["benchmarks"][benchmark] = worker_result["runs"]
+    return result
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              universal_newlines=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_relative_change(value: Optional[float], baseline_value: Optional[float]) -> float:
+    return value / baseline_value - 1 if value is not None and baseline_value else 0
+
+
+def format_rss(rss_mb: Optional[float]) -> str:
+    return f"{rss_mb:.0f} MB" if rss_mb is not None else "n/a"
+
+
+def compare_to_baseline(record: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Logs a comparison report and returns the detected regressions.
+    """
+    regressions = []
+    logger.info(f"Comparison to baseline from {baseline['timestamp']} (commit {baseline.get('git_commit')}):")
+    for linker, result in record["linkers"].items():
+        baseline_result = baseline["linkers"].get(linker)
+        if not baseline_result:
+            logger.info(f"  {linker}: not in baseline")
+            continue
+        for benchmark, runs in result["benchmarks"].items():
+            for mode, run in runs.items():
+                baseline_run = baseline_result["benchmarks"].get(benchmark, {}).get(mode)
+                if not baseline_run:
+                    continue
+                throughput_change = run["articles_per_second"] / baseline_run["articles_per_second"] - 1 \
+                    if baseline_run["articles_per_second"] else 0
+                memory_change = get_relative_change(run["peak_rss_mb"], baseline_run["peak_rss_mb"])
+                regressed = throughput_change < -tolerance or memory_change > tolerance
+                color, color_end = (Colors.RED, Colors.END) if regressed else ("", "")
+                logger.info(f"  {color}{linker} {benchmark} {mode}: "
+                            f"{run['articles_per_second']:.2f} articles/s ({throughput_change:+.1%}), "
+                            f"peak RSS {format_rss(run['peak_rss_mb'])} ({memory_change:+.1%}){color_end}")
+                if regressed:
+                    regressions.append(f"{linker} {benchmark} {mode}")
+        startup_change = result["startup_seconds"] / baseline_result["startup_seconds"] - 1 \
+            if baseline_result["startup_seconds"] else 0
+        memory_change = get_relative_change(result["peak_rss_mb"], baseline_result.get("peak_rss_mb"))
+        color, color_end = (Colors.RED, Colors.END) if memory_change > tolerance else ("", "")
+        logger.info(f"  {linker} startup: {result['startup_seconds']:.1f} s ({startup_change:+.1%})")
+        logger.info(f"  {color}{linker} process peak RSS: {format_rss(result['peak_rss_mb'])} "
+                    f"({memory_change:+.1%}){color_end}")
+        if memory_change > tolerance:
+            regressions.append(f"{linker} process peak RSS")
+    return regressions
+
+
+def main(args):
+    record = {"timestamp": datetime.now().strftime("%Y/%m/%d %H:%M:%S"),
+              "git_commit": get_git_commit(),
+              "host": platform.node(),
+              "python": platform.python_version(),
+              "mode": args.mode,
+              "n_articles": args.n_articles,
+              "coreference_linker": args.coreference_linker,
+              "linkers": {}}
+    for linker_spec in args.linkers:
+        name = parse_linker_spec(linker_spec)[0]
+        logger.info(f"Benchmarking linker {Colors.BLUE}{name}{Colors.END} ...")
+        result = run_linker(linker_spec, args)
+        if result is None:
+            continue
+        record["linkers"][name] = result
+        logger.info(f"  startup: {result['startup_seconds']:.1f} s, {result['startup_peak_rss_mb']:.0f} MB, "
+                    f"process peak RSS: {result['peak_rss_mb']:.0f} MB")
+        for benchmark, runs in result["benchmarks"].items():
+            for mode, run in runs.items():
+                logger.info(f"  {benchmark} {mode}: {run['articles_per_second']:.2f} articles/s, "
+                            f"{run['tokens_per_second']:.0f} tokens/s, peak RSS {format_rss(run['peak_rss_mb'])}")
+
+    with open(args.history_file, "a", encoding="utf8") as file:
+        file.write(json.dumps(record) + "\n")
+    logger.info(f"Appended results to {Colors.BOLD}{args.history_file}{Colors.END}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf8") as file:
+            json.dump(record, file)
+        logger.info(f"Wrote baseline to {Colors.BOLD}{args.save_baseline}{Colors.END}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf8") as file:
+            baseline = json.load(file)
+        regressions = compare_to_baseline(record, baseline, args.tolerance)
+        if regressions:
+            logger.error(f"{len(regressions)} performance regressions: {', '.join(regressions)}")
+            sys.exit(1)
+        logger.info("No performance regressions.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        log.setup_logger(sys.argv[0], write_to_file=False)
+        run_worker(json.loads(sys.argv[2]))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=__doc__)
+
+    parser.add_argument("-l", "--linkers", type=str, nargs='+', required=True,
+                        help="Linkers in the format [<name>=]<linker_name>[:<linker_config>].")
+    parser.add_argument("-b", "--benchmark", choices=get_available_benchmarks(), nargs='+', required=True,
+                        help="Benchmark(s) to link.")
+    parser.add_argument("-coref", "--coreference_linker", type=str,
+                        help="Coreference linker to apply after entity linkers.")
+    parser.add_argument("-n", "--n_articles", type=int, default=-1,
+                        help="Number of articles to link per benchmark. Default: all articles.")
+    parser.add_argument("--mode", choices=[COLD, WARM], default=WARM,
+                        help="cold: link each benchmark once in a fresh process after loading the linker. "
+                             "warm: additionally link each benchmark a second time.")
+    parser.add_argument("--history_file", type=str, default="linker_performance_history.jsonl",
+                        help="File to which the results are appended.")
+    parser.add_argument("--baseline", type=str,
+                        help="Baseline file (written with --save_baseline) to compare the results against.")
+    parser.add_argument("--save_baseline", type=str,
+                        help="Write the results to the given file to use them as baseline for later runs.")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Relative throughput decrease or memory increase that counts as regression.")
+
+    logger = log.setup_logger(sys.argv[0])
+    logger.debug(' '.join(sys.argv))
+
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""
+Checks that the fast date detection in elevant.utils.dates gives the same
+result as parsing with dateutil for all ground truth mentions of the given
+benchmarks and, optionally, all word n-grams of the benchmark texts.
+
+Exits with status 1 if the results differ for any text.
+
+Example:
+    python3 scripts/check_date_detection.py -b ALL -n 3
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from elevant.utils import log
+from elevant.utils.colors import Colors
+from elevant.utils.dates import is_date, is_date_dateutil
+from elevant.evaluation.benchmark import get_available_benchmarks
+from elevant.evaluation.benchmark_iterator import get_benchmark_iterator
+
+WORD_REGEX = re.compile(r"\S+")
+
+
+def get_texts(benchmark: str, max_ngram_length: int):
+    texts = set()
+    for article in get_benchmark_iterator(benchmark).iterate():
+        for label in article.labels:
+            texts.add(article.text[label.span[0]:label.span[1]])
+        words = [(match.start(), match.end()) for match in WORD_REGEX.finditer(article.text)]
+        for i in range(len(words)):
+            for j in range(i, min(i + max_ngram_length, len(words))):
+                texts.add(article.text[words[i][0]:words[j][1]])
+    return texts
+
+
+def main(args):
+    benchmarks = get_available_benchmarks() if "ALL" in args.benchmark else args.benchmark
+    texts = set()
+    for benchmark in benchmarks:
+        texts |= get_texts(benchmark, args.max_ngram_length)
+    logger.info(f"Checking {len(texts)} distinct texts from {len(benchmarks)} benchmarks ...")
+
+    start = time.time()
+    expected = {text: is_date_dateutil(text) for text in texts}
+    dateutil_time = time.time() - start
+    start = time.time()
+    results = {text: is_date(text) for text in texts}
+    fast_time = time.time() - start
+
+    mismatches = [text for text in texts if results[text] != expected[text]]
+    logger.info(f"dateutil: {dateutil_time:.2f} s, fast date detection: {fast_time:.2f} s, "
+                f"{sum(expected.values())} dates.")
+    for text in mismatches[:20]:
+        logger.error(f"Mismatch for \"{text}\": dateutil {expected[text]}, fast {results[text]}")
+    if mismatches:
+        logger.error(f"{Colors.RED}{len(mismatches)} mismatches.{Colors.END}")
+        sys.exit(1)
+    logger.info("No mismatches.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=__doc__)
+
+    parser.add_argument("-b", "--benchmark", choices=get_available_benchmarks() + ["ALL"], nargs='+', required=True,
+                        help="Benchmark(s) whose mentions are checked.")
+    parser.add_argument("-n", "--max_ngram_length", type=int, default=0,
+                        help="Also check all word n-grams of the benchmark texts up to this length.")
+
+    logger = log.setup_logger(sys.argv[0])
+    logger.debug(' '.join(sys.argv))
+
+    main(parser.parse_args())
@@ -0,0 +1,188 @@
+"""
+Checks that the error labelers that use the per-article case index
+(elevant.evaluation.article_case_index) give the same error labels as the
+previous implementation, which compares each case against all other cases
+of the article, for all evaluation cases in the evaluation results
+directory.
+
+The cases of each article are labeled by both implementations in each
+evaluation mode, once for benchmarks with and once for benchmarks without
+unknown entities. Only the labelers that use the case index are compared.
+
+Exits with status 1 if the labels differ for any case.
+
+Example:
+    python3 scripts/check_error_labels.py -b ALL
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Iterator, List
+
+from elevant import settings
+from elevant.utils import log, json_serialization
+from elevant.utils.colors import Colors
+from elevant.evaluation.article_case_index import ArticleCaseIndex
+from elevant.evaluation.benchmark import get_available_benchmarks
+from elevant.evaluation.case import Case, ErrorLabel, EvaluationMode, case_from_dict
+from elevant.evaluation.eval_cases_index import CASES_EXTENSION
+from elevant.evaluation.errors import is_subspan, overlaps, overlaps_any, is_true_quantity_or_datetime, \
+    label_undetected_errors, label_false_detections, label_span_errors, label_coreference_errors
+from elevant.evaluation.mention_type import MentionType, is_non_named_entity
+
+
+def label_undetected_errors_pairwise(cases: List[Case], eval_mode: EvaluationMode):
+    false_positive_spans = [case.span for case in cases if case.is_ner_fp(eval_mode)]
+    for case in cases:
+        if not case.is_coreference() and case.is_ner_fn(eval_mode):
+            case.add_error_label(ErrorLabel.NER_FN, eval_mode)
+            if is_non_named_entity(case.text):
+                case.add_error_label(ErrorLabel.NER_FN_LOWERCASED, eval_mode)
+            elif any(is_subspan(case.span, fp_span) for fp_span in false_positive_spans):
+                case.add_error_label(ErrorLabel.NER_FN_PARTIALLY_INCLUDED, eval_mode)
+            elif overlaps_any(case.span, false_positive_spans):
+                case.add_error_label(ErrorLabel.NER_FN_PARTIAL_OVERLAP, eval_mode)
+            else:
+                case.add_error_label(ErrorLabel.NER_FN_OTHER, eval_mode)
+
+
+def label_false_detections_pairwise(cases: List[Case], contains_unknowns: bool, eval_mode: EvaluationMode):
+    ground_truth_spans = [case.span for case in cases if case.has_relevant_ground_truth(eval_mode)]
+    for case in cases:
+        if not case.is_coreference() and case.is_ner_fp(eval_mode):
+            case.add_error_label(ErrorLabel.NER_FP, eval_mode)
+            overlap = overlaps_any(case.span, ground_truth_spans)
+            if not overlap and is_non_named_entity(case.text):
+                case.add_error_label(ErrorLabel.NER_FP_LOWERCASED, eval_mode)
+            elif not is_non_named_entity(case.text) and \
+                    ((not overlap and not contains_unknowns) or (case.has_ground_truth() and
+                                                                 case.ground_truth_is_unknown_entity())):
+                case.add_error_label(ErrorLabel.NER_FP_GROUNDTRUTH_UNKNOWN, eval_mode)
+            else:
+                case.add_error_label(ErrorLabel.NER_FP_OTHER, eval_mode)
+
+
+def label_coreference_errors_pairwise(cases: List[Case], eval_mode: EvaluationMode):
+    for i, case in enumerate(cases):
+        if case.is_coreference():
+            if case.is_ner_fp(eval_mode):
+                case.add_error_label(ErrorLabel.COREFERENCE_FALSE_DETECTION, eval_mode)
+            elif case.is_ner_fn(eval_mode):
+                case.add_error_label(ErrorLabel.COREFERENCE_UNDETECTED, eval_mode)
+            elif case.is_linking_fn(eval_mode) and case.is_linking_fp(eval_mode):
+                true_reference = None
+                for j in range(i - 1, -1, -1):
+                    if cases[j].mention_type == MentionType.ENTITY_NAMED and cases[j].has_ground_truth() and \
+                            cases[j].true_entity.entity_id == case.true_entity.entity_id:
+                        true_reference = cases[j]
+                        break
+                if true_reference is not None:
+                    if true_reference.prediction_is_known() and \
+                            true_reference.predicted_entity.entity_id == case.predicted_entity.entity_id:
+                        case.add_error_label(ErrorLabel.COREFERENCE_REFERENCE_WRONGLY_DISAMBIGUATED, eval_mode)
+                    else:
+                        case.add_error_label(ErrorLabel.COREFERENCE_WRONG_MENTION_REFERENCED, eval_mode)
+
+
+def label_span_errors_pairwise(cases: List[Case], eval_mode: EvaluationMode):
+    ground_truth_spans = {case.span: case.true_entity for case in cases if case.has_relevant_ground_truth(eval_mode)}
+    for case in cases:
+        if case.is_ner_fp(eval_mode):
+            for gt_span, gt_label in ground_truth_spans.items():
+                if gt_span == case.span:
+                    continue
+                if overlaps(case.span, gt_span) and (case.predicted_entity.entity_id == gt_label.entity_id or
+                                                     is_true_quantity_or_datetime(case.predicted_entity, gt_label)):
+                    case.add_error_label(ErrorLabel.NER_FP_WRONG_SPAN, eval_mode)
+                    break
+
+
+def label_pairwise(cases: List[Case], eval_mode: EvaluationMode, contains_unknowns: bool):
+    cases = [case for case in cases if case.true_entity is None or case.true_entity.parent is None]
+    label_undetected_errors_pairwise(cases, eval_mode)
+    label_false_detections_pairwise(cases, contains_unknowns, eval_mode)
+    label_span_errors_pairwise(cases, eval_mode)
+    label_coreference_errors_pairwise(cases, eval_mode)
+
+
+def label_with_index(case_index: ArticleCaseIndex, eval_mode: EvaluationMode, contains_unknowns: bool):
+    label_undetected_errors(case_index, eval_mode)
+    label_false_detections(case_index, contains_unknowns, eval_mode)
+    label_span_errors(case_index, eval_mode)
+    label_coreference_errors(case_index, eval_mode)
+
+
+def read_cases(line: str) -> List[Case]:
+    """
+    Reads the cases of an article without their error labels.
+    """
+    cases = []
+    for data in json_serialization.loads(line):
+        data["error_labels"] = {mode.value: [] for mode in EvaluationMode}
+        case = case_from_dict(data)
+        case.span = tuple(case.span)
+        cases.append(case)
+    return cases
+
+
+def format_error_labels(case: Case) -> str:
+    return ", ".join(f"{mode.value}: {sorted(label.value for label in labels)}"
+                     for mode, labels in case.error_labels.items())
+
+
+def get_cases_files(evaluation_dir: str, benchmarks: List[str]) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(evaluation_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(CASES_EXTENSION) and filename[:-len(CASES_EXTENSION)].split(".")[-1] in benchmarks:
+                yield os.path.join(dirpath, filename)
+
+
+def main(args):
+    benchmarks = get_available_benchmarks() if "ALL" in args.benchmark else args.benchmark
+    start = time.time()
+    n_files = n_articles = n_cases = 0
+    mismatches = []
+    for cases_file in get_cases_files(args.evaluation_dir, benchmarks):
+        with open(cases_file, "r", encoding="utf8") as file:
+            for article_idx, line in enumerate(file):
+                for contains_unknowns in (True, False):
+                    expected = read_cases(line)
+                    results = read_cases(line)
+                    case_index = ArticleCaseIndex(results)
+                    for mode in EvaluationMode:
+                        label_pairwise(expected, mode, contains_unknowns)
+                        label_with_index(case_index, mode, contains_unknowns)
+                    for expected_case, case in zip(expected, results):
+                        if case.error_labels != expected_case.error_labels:
+                            mismatches.append((cases_file, article_idx, contains_unknowns, expected_case, case))
+                n_articles += 1
+                n_cases += len(expected)
+        n_files += 1
+    logger.info(f"Checked {n_cases} cases in {n_articles} articles of {n_files} files in {time.time() - start:.1f} s.")
+
+    for cases_file, article_idx, contains_unknowns, expected_case, case in mismatches[:20]:
+        logger.error(f"Mismatch for case {case.span} in article {article_idx} of {cases_file} "
+                     f"(contains_unknowns={contains_unknowns}): expected {format_error_labels(expected_case)}, "
+                     f"got {format_error_labels(case)}")
+    if mismatches:
+        logger.error(f"{Colors.RED}{len(mismatches)} mismatches.{Colors.END}")
+        sys.exit(1)
+    logger.info("No mismatches.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=__doc__)
+
+    parser.add_argument("-b", "--benchmark", choices=get_available_benchmarks() + ["ALL"], nargs='+', required=True,
+                        help="Benchmark(s) whose evaluation cases are checked.")
+    parser.add_argument("-dir", "--evaluation_dir", default=settings.EVALUATION_RESULTS_DIR,
+                        help="Directory with the evaluation results.")
+
+    logger = log.setup_logger(sys.argv[0])
+    logger.debug(' '.join(sys.argv))
+
+    main(parser.parse_args())
@@ -0,0 +1,56 @@
+"""
+Convert linked articles (.linked_articles.jsonl) or evaluation cases
+(.eval_cases.jsonl) to the columnar storage format and back.
+
+The columnar format stores each key of the JSON objects in a separate,
+compressed and typed column, such that single columns (e.g. only the error
+labels of all evaluation cases) can be read without parsing the entire file.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(".")
+
+from elevant.utils import log
+from elevant.utils.colors import Colors
+from elevant.utils.columnar_storage import convert_jsonl_to_columnar, convert_columnar_to_jsonl, \
+    COLUMNAR_FILE_EXTENSION
+
+
+def main(args):
+    for input_file in args.input_files:
+        if input_file.endswith(COLUMNAR_FILE_EXTENSION):
+            output_file = input_file[:-len(COLUMNAR_FILE_EXTENSION)] + ".jsonl"
+            if os.path.exists(output_file) and not args.overwrite:
+                logger.warning(f"{output_file} already exists. Use --overwrite to overwrite it.")
+                continue
+            convert_columnar_to_jsonl(input_file, output_file)
+        elif input_file.endswith(".jsonl"):
+            output_file = input_file[:-len(".jsonl")] + COLUMNAR_FILE_EXTENSION
+            if os.path.exists(output_file) and not args.overwrite:
+                logger.warning(f"{output_file} already exists. Use --overwrite to overwrite it.")
+                continue
+            convert_jsonl_to_columnar(input_file, output_file)
+        else:
+            logger.warning(f"Skipping {input_file}: Input files must have extension .jsonl or "
+                           f"{COLUMNAR_FILE_EXTENSION}.")
+            continue
+        logger.info(f"Converted {input_file} to {Colors.BOLD}{output_file}{Colors.END}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=__doc__)
+
+    parser.add_argument("input_files", type=str, nargs='+',
+                        help=f"Input file(s) with extension .jsonl (converted to {COLUMNAR_FILE_EXTENSION}) or "
+                             f"{COLUMNAR_FILE_EXTENSION} (converted to .jsonl).")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Overwrite existing output files.")
+
+    logger = log.setup_logger(sys.argv[0])
+    logger.debug(' '.join(sys.argv))
+
+    main(parser.parse_args())
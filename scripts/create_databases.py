@@ -1,18 +1,28 @@
 import argparse
+import heapq
+import os
 import pickle
+import tempfile
 import time
 import lmdb
 import sys
-from typing import Optional
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional, Iterator, Tuple, List, Iterable, Dict
 from urllib.parse import unquote
 from enum import Enum
 
 sys.path.append(".")
 
 from elevant.utils import log
+from elevant.helpers.entity_database_reader import EntityDatabaseReader
 
 
 WIKI_URL_PREFIX = "https://en.wikipedia.org/wiki/"
+# Number of puts after which the LMDB write transaction is committed
+COMMIT_INTERVAL = 1000000
+# Number of (key, value) pairs that are pickled together in a sorted chunk file
+PICKLE_BATCH_SIZE = 10000
 
 
 class StorageFormat(Enum):
@@ -26,6 +36,20 @@ class ValueProcessingMethod(Enum):
     NAME_FROM_URL = "name_from_url"
 
 
+class Mapping(Enum):
+    """
+    Mappings that the entity database otherwise loads from TSV files into
+    memory at startup. The database contains exactly the loaded mapping.
+    """
+    GENDER = "gender"
+    COREFERENCE_TYPES = "coreference_types"
+    FAMILY_NAME_ALIASES = "family_name_aliases"
+    ENTITY_TO_FAMILY_NAME = "entity_to_family_name"
+    UNIGRAM_COUNTS = "unigram_counts"
+    DEMONYMS = "demonyms"
+    SET = "set"
+
+
 def read_from_pkl(filename: str, separator: str = ","):
     logger.info(f"Reading from file {filename} ...")
     start = time.time()
@@ -53,6 +77,40 @@ def read_from_tsv(filename, storage_format=StorageFormat.SINGLE_VAL, processing_
     logger.info(f"Reading from file {filename} ...")
     start = time.time()
     d = {}
+    if has_multiple_values(storage_format, inverse):
+        # Collect the values in lists and join them at the end. Concatenating strings for each value
+        # takes quadratic time for keys with many values.
+        for key, value in iterate_tsv_pairs(filename, storage_format, processing_method, inverse):
+            if key in d:
+                d[key].append(value)
+            else:
+                d[key] = [value]
+        for key in d:
+            d[key] = separator.join(d[key])
+    else:
+        for key, value in iterate_tsv_pairs(filename, storage_format, processing_method, inverse):
+            d[key] = value
+
+    logger.info(f"Done. Took {time.time() - start} s")
+    return d
+
+
+def has_multiple_values(storage_format: StorageFormat, inverse: bool) -> bool:
+    """
+    Returns True if the values of all pairs with the same key are joined,
+    False if the value of the last pair with a key is used.
+    """
+    if storage_format == StorageFormat.MULTI_VALS:
+        return True
+    return inverse and storage_format in (StorageFormat.MULTI_VALS_SS, StorageFormat.MULTI_VALS_TS)
+
+
+def iterate_tsv_pairs(filename: str, storage_format: StorageFormat = StorageFormat.SINGLE_VAL,
+                      processing_method: Optional[ValueProcessingMethod] = None,
+                      inverse: bool = False) -> Iterator[Tuple[str, str]]:
+    """
+    Yields the (key, value) pairs of the TSV file in the order of the file.
+    """
     with open(filename, "r", encoding="utf8") as f:
         for line in f:
             lst = line.strip("\n").split("\t")
@@ -60,46 +118,123 @@ def read_from_tsv(filename, storage_format=StorageFormat.SINGLE_VAL, processing_
                 logger.warning(f"Skipping line that contains less than two values: \"{line}\". "
                                f"This might be an indication that the data from {filename} is not complete.")
                 continue
-            if storage_format == StorageFormat.SINGLE_VAL:
-                if inverse:
-                    key = process(lst[1], processing_method)
-                    d[key] = lst[0]
-                else:
-                    d[lst[0]] = process(lst[1], processing_method)
-            elif storage_format == StorageFormat.MULTI_VALS:
+            if storage_format in (StorageFormat.SINGLE_VAL, StorageFormat.MULTI_VALS):
                 if inverse:
-                    curr_key = process(lst[1], processing_method)
-                    curr_val = lst[0]
-                    if curr_key in d:
-                        prev_val = d[curr_key]
-                        d[curr_key] = prev_val + separator + curr_val
-                    else:
-                        d[curr_key] = curr_val
+                    yield process(lst[1], processing_method), lst[0]
                 else:
-                    curr_key = lst[0]
-                    curr_val = process(lst[1], processing_method)
-                    if curr_key in d:
-                        prev_val = d[curr_key]
-                        d[curr_key] = prev_val + separator + curr_val
-                    else:
-                        d[curr_key] = curr_val
-            elif storage_format in [StorageFormat.MULTI_VALS_SS, StorageFormat.MULTI_VALS_TS]:
+                    yield lst[0], process(lst[1], processing_method)
+            elif storage_format in (StorageFormat.MULTI_VALS_SS, StorageFormat.MULTI_VALS_TS):
                 value_separator = ";" if storage_format == StorageFormat.MULTI_VALS_SS else "\t"
                 if inverse:
-                    keys = lst[1].split(value_separator)
-                    for key in keys:
-                        key = process(key, processing_method)
-                        if key in d:
-                            prev_val = d[key]
-                            d[key] = prev_val + separator + lst[0]
-                        else:
-                            d[key] = lst[0]
+                    for key in lst[1].split(value_separator):
+                        yield process(key, processing_method), lst[0]
                 else:
                     vals = [process(v, processing_method) for v in lst[1].split(value_separator)]
                     # Use the original value separator also in the DB, since the data might contain commas
-                    val = value_separator.join(vals)
-                    d[lst[0]] = val
+                    yield lst[0], value_separator.join(vals)
+
+
+def write_sorted_chunk(pairs: List[Tuple[str, str]], tmp_dir: str, chunk_index: int) -> str:
+    # The sort is stable, so pairs with the same key stay in the order of the input file
+    pairs.sort(key=itemgetter(0))
+    chunk_file = os.path.join(tmp_dir, f"chunk_{chunk_index}.pkl")
+    with open(chunk_file, "wb") as f:
+        for i in range(0, len(pairs), PICKLE_BATCH_SIZE):
+            pickle.dump(pairs[i:i + PICKLE_BATCH_SIZE], f, protocol=pickle.HIGHEST_PROTOCOL)
+    return chunk_file
+
+
+def iterate_chunk(chunk_file: str) -> Iterator[Tuple[str, str]]:
+    with open(chunk_file, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
 
+
+def external_sort(pairs: Iterable[Tuple[str, str]], tmp_dir: str, chunk_size: int) -> Iterator[Tuple[str, str]]:
+    """
+    Yields the given (key, value) pairs sorted by key. At most chunk_size pairs
+    are held in memory; sorted chunks are written to the temporary directory
+    and merged. Pairs with the same key are yielded in their original order.
+    """
+    chunk_files = []
+    chunk = []
+    for pair in pairs:
+        chunk.append(pair)
+        if len(chunk) >= chunk_size:
+            chunk_files.append(write_sorted_chunk(chunk, tmp_dir, len(chunk_files)))
+            logger.info(f"Wrote sorted chunk {len(chunk_files)}.")
+            chunk = []
+    if not chunk_files:
+        chunk.sort(key=itemgetter(0))
+        yield from chunk
+        return
+    if chunk:
+        chunk_files.append(write_sorted_chunk(chunk, tmp_dir, len(chunk_files)))
+    del chunk
+    # heapq.merge yields equal keys from earlier chunks first, so the original order is kept
+    yield from heapq.merge(*[iterate_chunk(chunk_file) for chunk_file in chunk_files], key=itemgetter(0))
+
+
+def group_sorted_pairs(sorted_pairs: Iterator[Tuple[str, str]], multiple_values: bool,
+                       separator: str = ",") -> Iterator[Tuple[str, str]]:
+    """
+    Yields one (key, value) pair per key: the joined values if multiple_values
+    is True, otherwise the last value, as when building a dictionary.
+    """
+    for key, group in groupby(sorted_pairs, key=itemgetter(0)):
+        values = [value for _, value in group]
+        yield key, separator.join(values) if multiple_values else values[-1]
+
+
+def build_db_streaming(filename: str, output_file: str, storage_format: StorageFormat = StorageFormat.SINGLE_VAL,
+                       processing_method: Optional[ValueProcessingMethod] = None, inverse: bool = False,
+                       chunk_size: int = 5000000, tmp_dir: Optional[str] = None, separator: str = ","):
+    """
+    Builds the same database as read_from_tsv() followed by write_to_dbm(),
+    but in bounded memory: the pairs are sorted externally and written to the
+    database in key order.
+    """
+    logger.info(f"Building database {output_file} from file {filename} in streaming mode ...")
+    start = time.time()
+    with tempfile.TemporaryDirectory(dir=tmp_dir, prefix="create_databases_") as sort_dir:
+        pairs = iterate_tsv_pairs(filename, storage_format, processing_method, inverse)
+        grouped_pairs = group_sorted_pairs(external_sort(pairs, sort_dir, chunk_size),
+                                           has_multiple_values(storage_format, inverse), separator)
+        write_sorted_pairs_to_dbm(grouped_pairs, output_file)
+    logger.info(f"Done. Took {time.time() - start} s")
+
+
+def read_mapping(filename: str, mapping: Mapping) -> Dict[str, str]:
+    """
+    Reads the mapping with the entity database reader and converts the values
+    to the strings from which the entity database reader's database
+    getters restore them.
+    """
+    logger.info(f"Reading {mapping.value} mapping from file {filename} ...")
+    start = time.time()
+    if mapping == Mapping.GENDER:
+        # Genders are stored by their enum name
+        d = {entity_id: gender.name for entity_id, gender in EntityDatabaseReader.get_gender_mapping(filename).items()}
+    elif mapping == Mapping.COREFERENCE_TYPES:
+        d = {entity_id: ";".join(types)
+             for entity_id, types in EntityDatabaseReader.get_coreference_types_mapping(filename).items()}
+    elif mapping == Mapping.FAMILY_NAME_ALIASES:
+        d = {family_name: ",".join(sorted(entity_ids))
+             for family_name, entity_ids in EntityDatabaseReader.get_family_name_aliases(filename).items()}
+    elif mapping == Mapping.ENTITY_TO_FAMILY_NAME:
+        d = EntityDatabaseReader.get_entity_to_family_name(filename)
+    elif mapping == Mapping.UNIGRAM_COUNTS:
+        d = {unigram: str(count) for unigram, count in EntityDatabaseReader.get_unigram_counts(filename).items()}
+    elif mapping == Mapping.DEMONYMS:
+        d = {demonym: ",".join(entity_ids)
+             for demonym, entity_ids in EntityDatabaseReader.get_demonyms(filename).items()}
+    else:
+        # Only the keys are needed to check whether the set contains an item
+        d = {item: "" for item in EntityDatabaseReader.read_into_set(filename) if item}
     logger.info(f"Done. Took {time.time() - start} s")
     return d
 
@@ -139,22 +274,42 @@ def process(value: str, method: Optional[ValueProcessingMethod] = None) -> str:
 def write_to_dbm(d, filename):
     logger.info(f"Writing database to file {filename} ...")
     start = time.time()
+    write_sorted_pairs_to_dbm(sorted(d.items(), key=itemgetter(0)), filename, len(d))
+    logger.info(f"Done. Took {time.time() - start} s")
+
+
+def write_sorted_pairs_to_dbm(sorted_pairs: Iterable[Tuple[str, str]], filename: str,
+                              n_items: Optional[int] = None):
+    """
+    Writes the given pairs with unique keys in ascending key order to the database.
+    Since the keys are sorted, they can be appended, which is much faster than
+    inserting them in arbitrary order. The transaction is committed regularly
+    so that the size of a single transaction is bounded.
+    """
     count = 0
     # Set max map size to 40 GB. There is allegedly no penalty for making this huge on 64 bit systems.
     env = lmdb.open(filename, map_size=42949672960)
-    with env.begin(write=True) as db:
-        # Store the dictionary data in the database
-        for key, value in d.items():
+    txn = env.begin(write=True)
+    try:
+        for key, value in sorted_pairs:
             try:
-                db.put(key.encode("utf-8"), value.encode("utf-8"))
+                # Python string order is the same as the byte order of the UTF-8 encoded keys used by LMDB
+                txn.put(key.encode("utf-8"), value.encode("utf-8"), append=True)
             except lmdb.BadValsizeError:
                 logger.warning(f"\nFailed to write key \"{key}\" with value \"{value}\".")
             count += 1
+            if count % COMMIT_INTERVAL == 0:
+                txn.commit()
+                txn = env.begin(write=True)
             if count % 100000 == 0:
-                print(f"\rWrote {count} items of {len(d)}.", end="")
+                print(f"\rWrote {count} items{f' of {n_items}' if n_items is not None else ''}.", end="")
+        txn.commit()
+    except BaseException:
+        txn.abort()
+        raise
+    finally:
         print()
-    env.close()
-    logger.info(f"Done. Took {time.time() - start} s")
+        env.close()
 
 
 def main(args):
@@ -163,7 +318,15 @@ def main(args):
     storage_format = StorageFormat(args.format)
     processing_method = ValueProcessingMethod(args.processing_method) if args.processing_method else None
 
-    if args.most_popular_candidates:
+    if (args.streaming and not args.mapping and not args.most_popular_candidates
+            and not args.input_file.endswith(".pkl")):
+        build_db_streaming(args.input_file, output_file, storage_format, processing_method, inverse=args.inverse,
+                           chunk_size=args.chunk_size, tmp_dir=args.tmp_dir)
+        return
+
+    if args.mapping:
+        dictionary = read_mapping(args.input_file, Mapping(args.mapping))
+    elif args.most_popular_candidates:
         dictionary = read_most_popular_candidates(args.input_file)
     elif args.input_file.endswith(".pkl"):
         dictionary = read_from_pkl(args.input_file)
@@ -189,6 +352,15 @@ if __name__ == "__main__":
     parser.add_argument("--most_popular_candidates", action="store_true",
                         help="Create a database that contains a mapping from hyperlink text to the its popular entity"
                              "candidates.")
+    parser.add_argument("--mapping", type=str, choices=[m.value for m in Mapping],
+                        help="Create a database that contains the given mapping as loaded by the entity database from "
+                             "the input file. Use \"set\" for files with one item per line.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Build the database from a TSV file in bounded memory by sorting the entries on disk.")
+    parser.add_argument("--chunk_size", type=int, default=5000000,
+                        help="Streaming mode: Number of entries that are sorted in memory at once.")
+    parser.add_argument("--tmp_dir", type=str,
+                        help="Streaming mode: Directory for the sorted chunks. Default: the system temp directory.")
 
     logger = log.setup_logger(sys.argv[0])
     logger.debug(' '.join(sys.argv))
@@ -0,0 +1,104 @@
+"""
+Creates the alias to top candidates database.
+
+For each alias, i.e. each Wikidata name, Wikidata alias, family name of a
+human and demonym, the database contains all candidate entities of the alias
+sorted by sitelink count, together with flags that indicate whether the alias
+is the name or a demonym of the entity. Candidates with the same sitelink
+count are sorted by these flags and then by entity ID, which is the order in
+which the popular entities linker prefers candidates. This way, the linker
+can disambiguate a mention with a single database lookup.
+
+The database has to be recreated whenever one of the underlying mappings changes.
+"""
+
+import argparse
+import heapq
+import sys
+import time
+from typing import Iterator
+
+import lmdb
+
+sys.path.append(".")
+
+from elevant import settings
+from elevant.utils import log
+from elevant.models.entity_database import EntityDatabase, TopCandidate
+
+COMMIT_INTERVAL = 1000000
+
+
+def iterate_aliases(entity_db: EntityDatabase) -> Iterator[str]:
+    """
+    Yields all aliases in ascending order without duplicates.
+    """
+    # LMDB keys are sorted by their UTF-8 bytes, which is the same as the order of Python strings
+    aliases = heapq.merge(entity_db.name_to_entities_db.keys(),
+                          entity_db.alias_to_entities_db.keys(),
+                          sorted(entity_db.family_name_aliases),
+                          sorted(entity_db.demonyms))
+    previous_alias = None
+    for alias in aliases:
+        if alias != previous_alias:
+            yield alias
+            previous_alias = alias
+
+
+def get_top_candidates_string(entity_db: EntityDatabase, alias: str) -> str:
+    names = entity_db.get_entities_by_name(alias) if entity_db.contains_entity_name(alias) else set()
+    demonym_entities = set(entity_db.get_entities_for_demonym(alias)) if entity_db.is_demonym(alias) else set()
+    candidates = entity_db.get_candidates(alias) | names | demonym_entities
+    top_candidates = [TopCandidate(entity_id, entity_db.get_sitelink_count(entity_id),
+                                   entity_id in names, entity_id in demonym_entities)
+                      for entity_id in candidates]
+    top_candidates.sort(key=lambda c: (-c.sitelink_count, not (c.is_name or c.is_demonym), c.entity_id))
+    return ";".join(candidate.to_string() for candidate in top_candidates)
+
+
+def main(args):
+    entity_db = EntityDatabase()
+    entity_db.load_name_to_entities()
+    entity_db.load_alias_to_entities()
+    entity_db.load_family_name_aliases()
+    entity_db.load_demonyms()
+    entity_db.load_sitelink_counts()
+
+    logger.info(f"Writing alias to top candidates database to {args.output_file} ...")
+    start = time.time()
+    count = 0
+    # Set max map size to 40 GB. There is allegedly no penalty for making this huge on 64 bit systems.
+    env = lmdb.open(args.output_file, map_size=42949672960)
+    txn = env.begin(write=True)
+    for alias in iterate_aliases(entity_db):
+        value = get_top_candidates_string(entity_db, alias)
+        if not value:
+            continue
+        try:
+            # Aliases are iterated in sorted order, so they can be appended
+            txn.put(alias.encode("utf-8"), value.encode("utf-8"), append=True)
+        except lmdb.BadValsizeError:
+            logger.warning(f"\nFailed to write alias \"{alias}\".")
+        count += 1
+        if count % COMMIT_INTERVAL == 0:
+            txn.commit()
+            txn = env.begin(write=True)
+        if count % 100000 == 0:
+            print(f"\rWrote {count} aliases.", end="")
+    txn.commit()
+    env.close()
+    print()
+    logger.info(f"Wrote {count} aliases in {time.time() - start:.1f} s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=__doc__)
+
+    parser.add_argument("-o", "--output_file", type=str, default=settings.ALIAS_TO_TOP_CANDIDATES_DB,
+                        help="File name of the generated database.")
+
+    logger = log.setup_logger(sys.argv[0])
+    logger.debug(' '.join(sys.argv))
+
+    main(parser.parse_args())
@@ -31,11 +31,12 @@ def main():
         if article is None:
             print()
             break
+        entity_ids = entity_db.link2ids(target for span, target in article.hyperlinks)
         for span, target in article.hyperlinks:
             link_text = article.text[span[0]:span[1]]
             if link_text not in links:
                 links[link_text] = {}
-            entity_id = entity_db.link2id(target)
+            entity_id = entity_ids[target]
             if entity_id is not None:
                 if entity_id not in links[link_text]:
                     links[link_text][entity_id] = 1
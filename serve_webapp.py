@@ -0,0 +1,320 @@
+"""
+Serves the evaluation web app.
+
+In addition to the static files of the web app, the server provides
+  /api/results
+      the evaluation results and metadata of all experiments in one response
+  /api/cases?experiment=<experiment_id>&start=<article_index>&count=<n_articles>
+      the evaluation cases of a range of articles of an experiment
+  /api/linked_articles?experiment=<experiment_id>&start=<article_index>&count=<n_articles>
+      the linked articles of a range of articles of an experiment
+
+The experiments are taken from an index of the evaluation results directory
+that is kept up to date by checking the directory for changes every few seconds.
+Responses are compressed (brotli if the brotli package is installed,
+otherwise gzip) and carry ETags so that unchanged files are not transferred
+again. Static files support HTTP range requests.
+"""
+
+import argparse
+import email.utils
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from elevant import settings
+from elevant.evaluation.results_index import ResultsIndex, CASES_EXTENSION, LINKED_ARTICLES_EXTENSION
+from elevant.utils import log
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WEBAPP_DIR = "evaluation-webapp"
+# Path of the evaluation results directory (or a link to it) within the web app directory
+RESULTS_PATH = "evaluation-results"
+COMPRESSIBLE_EXTENSIONS = (".json", ".jsonl", ".js", ".css", ".html", ".tsv", ".txt", ".obscured")
+MIN_COMPRESSION_SIZE = 1024
+MAX_COMPRESSED_CACHE_SIZE = 512 * 1024 * 1024
+
+mimetypes.add_type("application/json", ".jsonl")
+mimetypes.add_type("text/tab-separated-values", ".tsv")
+
+
+class CompressedCache:
+    """
+    LRU cache for compressed response bodies, bounded by the total size of
+    the compressed bodies.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def add(self, key: Tuple, data: bytes):
+        if len(data) > self.max_size:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_size:
+                _, removed_data = self.entries.popitem(last=False)
+                self.size -= len(removed_data)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+class WebappRequestHandler(SimpleHTTPRequestHandler):
+    results_index: ResultsIndex = None
+    compressed_cache: CompressedCache = None
+    server_id = str(int(time.time()))
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s" % (self.address_string(), format % args))
+
+    def get_encoding(self) -> Optional[str]:
+        accepted_encodings = {encoding.split(";")[0].strip()
+                              for encoding in self.headers.get("Accept-Encoding", "").split(",")}
+        if brotli is not None and "br" in accepted_encodings:
+            return "br"
+        if "gzip" in accepted_encodings:
+            return "gzip"
+        return None
+
+    def is_not_modified(self, etag: str) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        return if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]
+
+    def send_not_modified(self, etag: str):
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.end_headers()
+
+    def send_body(self, get_data: Callable[[], bytes], content_type: str, etag: str,
+                  cache_key: Optional[Tuple] = None, extra_headers: Optional[Dict[str, str]] = None,
+                  head_only: Optional[bool] = False):
+        """
+        Sends the response body returned by get_data(), compressed if the
+        client accepts it, or a 304 response if the client already has the
+        current version. get_data() is not called if the compressed body is
+        cached.
+        """
+        if self.is_not_modified(etag):
+            self.send_not_modified(etag)
+            return
+        encoding = self.get_encoding()
+        data = self.compressed_cache.get(cache_key + (encoding,)) if encoding and cache_key else None
+        if data is None:
+            data = get_data()
+            if encoding and len(data) >= MIN_COMPRESSION_SIZE:
+                data = compress(data, encoding)
+                if cache_key:
+                    self.compressed_cache.add(cache_key + (encoding,), data)
+            else:
+                encoding = None
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "no-cache")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        for header, value in (extra_headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(data)
+
+    def do_GET(self):
+        self.handle_request(head_only=False)
+
+    def do_HEAD(self):
+        self.handle_request(head_only=True)
+
+    def handle_request(self, head_only: bool):
+        url = urlsplit(self.path)
+        if url.path.startswith("/api/"):
+            self.handle_api_request(url.path, parse_qs(url.query), head_only)
+            return
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path) or url.path.endswith("/"):
+            # Directory listings and errors are handled by the SimpleHTTPRequestHandler
+            if head_only:
+                super().do_HEAD()
+            else:
+                super().do_GET()
+            return
+        self.send_static_file(path, head_only)
+
+    def send_static_file(self, path: str, head_only: bool):
+        stat = os.stat(path)
+        etag = '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+        content_type = self.guess_type(path)
+        range_match = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", "").strip())
+        if range_match and range_match.group(0) != "bytes=-" and not self.is_not_modified(etag):
+            self.send_range(path, stat.st_size, range_match, content_type, etag, head_only)
+            return
+        if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+            # Binary files are served uncompressed
+            if self.is_not_modified(etag):
+                self.send_not_modified(etag)
+                return
+            with open(path, "rb") as file:
+                self.send_response(HTTPStatus.OK)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(stat.st_size))
+                self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+                self.send_header("ETag", etag)
+                self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+                if not head_only:
+                    self.copyfile(file, self.wfile)
+            return
+
+        def read_file() -> bytes:
+            with open(path, "rb") as file:
+                return file.read()
+
+        self.send_body(read_file, content_type, etag, (path, etag), {"Accept-Ranges": "bytes"}, head_only)
+
+    def send_range(self, path: str, size: int, range_match, content_type: str, etag: str, head_only: bool):
+        start, end = range_match.group(1), range_match.group(2)
+        if start:
+            start = int(start)
+            end = min(int(end), size - 1) if end else size - 1
+        else:
+            # Suffix range: the last <end> bytes
+            start = max(size - int(end), 0)
+            end = size - 1
+        if start >= size or start > end:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.PARTIAL_CONTENT)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if not head_only:
+            with open(path, "rb") as file:
+                file.seek(start)
+                self.wfile.write(file.read(end - start + 1))
+
+    def handle_api_request(self, path: str, query: Dict, head_only: bool):
+        if path == "/api/results":
+            version, experiments = self.results_index.get_experiments()
+            etag = f'"results-{self.server_id}-{version}"'
+            self.send_body(lambda: json.dumps({"experiments": experiments}).encode("utf8"), "application/json", etag,
+                           ("/api/results", etag), head_only=head_only)
+        elif path in ("/api/cases", "/api/linked_articles"):
+            extension = CASES_EXTENSION if path == "/api/cases" else LINKED_ARTICLES_EXTENSION
+            # parse_qs() already decodes the query values
+            experiment_id = query.get("experiment", [""])[0]
+            try:
+                start = int(query.get("start", ["0"])[0])
+                count = int(query["count"][0]) if "count" in query else None
+            except ValueError:
+                self.send_error(HTTPStatus.BAD_REQUEST, "start and count must be integers")
+                return
+            filename = self.results_index.get_experiment_file(experiment_id, extension)
+            stat = os.stat(filename) if filename and os.path.exists(filename) else None
+            if stat is not None:
+                key = f"{filename}:{stat.st_size}:{stat.st_mtime_ns}:{start}:{count}"
+                etag = '"%s"' % hashlib.sha1(key.encode("utf8")).hexdigest()
+                if self.is_not_modified(etag):
+                    # The client already has the current version, so the lines are not read
+                    self.send_not_modified(etag)
+                    return
+            lines = self.results_index.read_lines(experiment_id, extension, start, count) if stat else None
+            if lines is None:
+                self.send_error(HTTPStatus.NOT_FOUND, f"No {extension} file for experiment {experiment_id}")
+                return
+            data, n_articles = lines
+            self.send_body(lambda: data, "application/x-ndjson", etag, (key,), {"X-Total-Articles": str(n_articles)},
+                           head_only=head_only)
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND, f"Unknown API endpoint {path}")
+
+
+def watch_results_dir(results_index: ResultsIndex, interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            results_index.update()
+        except Exception as e:
+            logger.warning(f"Could not update results index: {e}")
+
+
+def main(args):
+    results_dir = os.path.join(args.webapp_dir, RESULTS_PATH)
+    if not os.path.isdir(results_dir):
+        logger.warning(f"Evaluation results directory {results_dir} does not exist.")
+    results_index = ResultsIndex(results_dir, args.index_file)
+    results_index.update()
+    WebappRequestHandler.results_index = results_index
+    WebappRequestHandler.compressed_cache = CompressedCache(MAX_COMPRESSED_CACHE_SIZE)
+
+    watcher = threading.Thread(target=watch_results_dir, args=(results_index, args.watch_interval), daemon=True)
+    watcher.start()
+
+    handler = partial(WebappRequestHandler, directory=args.webapp_dir)
+    with ThreadingHTTPServer((args.bind, args.port), handler) as server:
+        logger.info(f"Serving {args.webapp_dir} at http://{args.bind or 'localhost'}:{args.port}/ "
+                    f"({'brotli and ' if brotli else ''}gzip compression enabled)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Server stopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=__doc__)
+
+    parser.add_argument("port", type=int, nargs="?", default=8000,
+                        help="Port on which to serve the web app.")
+    parser.add_argument("--bind", type=str, default="",
+                        help="Address to bind to. Default: all interfaces.")
+    parser.add_argument("--webapp_dir", type=str, default=WEBAPP_DIR,
+                        help="Directory of the web app.")
+    parser.add_argument("--index_file", type=str, default=settings.WEBAPP_RESULTS_INDEX_FILE,
+                        help="File in which the results index is stored between server restarts.")
+    parser.add_argument("--watch_interval", type=float, default=5,
+                        help="Interval in seconds in which the results directory is checked for changes.")
+
+    logger = log.setup_logger(sys.argv[0])
+    logger.debug(' '.join(sys.argv))
+
+    main(parser.parse_args())
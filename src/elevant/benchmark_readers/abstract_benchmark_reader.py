@@ -21,3 +21,15 @@ class AbstractBenchmarkReader(abc.ABC):
             if i == n:
                 break
             yield article
+
+    def get_article(self, index: int) -> Article:
+        """
+        Returns the article with the given index in the benchmark.
+        """
+        for i, article in enumerate(self.article_iterator()):
+            if i == index:
+                return article
+        raise IndexError(f"The benchmark has no article with index {index}.")
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.article_iterator())
@@ -0,0 +1,41 @@
+from typing import Callable, Iterator, List, Optional
+
+from elevant.benchmark_readers.abstract_benchmark_reader import AbstractBenchmarkReader
+from elevant.models.article import Article
+from elevant.utils.benchmark_cache import BenchmarkCache
+
+
+class CachedBenchmarkReader(AbstractBenchmarkReader):
+    """
+    Reads the articles of a benchmark from the benchmark cache. The actual
+    benchmark reader is only created if the cache does not exist yet, so
+    mappings that the reader needs to map benchmark entities to Wikidata
+    are not loaded when the cache can be used.
+    """
+    def __init__(self,
+                 benchmark_paths: List[str],
+                 create_reader: Callable[[], AbstractBenchmarkReader],
+                 reader_key: Optional[str] = "",
+                 reader_class: Optional[type] = None,
+                 mapping_files: Optional[List[str]] = None):
+        self.create_reader = create_reader
+        self.cache = BenchmarkCache(benchmark_paths, self.read_articles, reader_key, reader_class=reader_class,
+                                    mapping_files=mapping_files)
+
+    def read_articles(self) -> Iterator[Article]:
+        """
+        Yields all articles read by the actual benchmark reader.
+        """
+        return self.create_reader().article_iterator()
+
+    def article_iterator(self) -> Iterator[Article]:
+        return self.cache.article_iterator()
+
+    def get_article(self, index: int) -> Article:
+        """
+        Returns the article with the given index in the benchmark.
+        """
+        return self.cache.get_article(index)
+
+    def __len__(self) -> int:
+        return len(self.cache)
@@ -1,12 +1,13 @@
 import os
 import logging
 
-from typing import Iterator, Optional
+from typing import Iterable, Iterator, Optional
 
-from pynif import NIFCollection
+from pynif import NIFCollection, NIFContext
 
 from elevant.benchmark_readers.abstract_benchmark_reader import AbstractBenchmarkReader
 from elevant.evaluation.groundtruth_label import GroundtruthLabel
+from elevant.helpers.nif_context_reader import NifContextReader
 from elevant.models.entity_database import EntityDatabase
 from elevant.models.article import Article
 from elevant.utils.knowledge_base_mapper import KnowledgeBaseMapper, UnknownEntity
@@ -27,11 +28,17 @@ class NifBenchmarkReader(AbstractBenchmarkReader):
         Create articles from the given NIF content.
         """
         nif_doc = NIFCollection.loads(nif_content)
+        # NIF contexts have random order by default. Make sure results are reproducible by sorting by URI
+        for article in self.get_articles_from_contexts(sorted(nif_doc.contexts, key=lambda c: c.uri)):
+            yield article
 
+    def get_articles_from_contexts(self, contexts: Iterable[NIFContext]) -> Iterator[Article]:
+        """
+        Create articles from the given NIF contexts.
+        """
         no_mapping_count = 0
 
-        # NIF contexts have random order by default. Make sure results are reproducible by sorting by URI
-        for context in sorted(nif_doc.contexts, key=lambda c: c.uri):
+        for context in contexts:
             label_id_counter = 0
             text = context.mention
             if not text:
@@ -74,11 +81,9 @@ class NifBenchmarkReader(AbstractBenchmarkReader):
         """
         Yields all articles with their GT labels from the given file.
         """
-        with open(filepath, "r", encoding="utf8") as file:
-            file_content = file.readlines()
-            file_content = "".join(file_content)
-            for article in self.get_articles_from_nif(file_content):
-                yield article
+        contexts = NifContextReader().iterate_contexts(filepath)
+        for article in self.get_articles_from_contexts(contexts):
+            yield article
 
     def article_iterator(self) -> Iterator[Article]:
         """
@@ -1,5 +1,5 @@
 import logging
-from typing import Iterator
+from typing import Iterator, List, Optional
 
 from elevant.benchmark_readers.abstract_benchmark_reader import AbstractBenchmarkReader
 from elevant.models.article import Article, article_from_json
@@ -10,6 +10,9 @@ logger = logging.getLogger("main." + __name__.split(".")[-1])
 class OurJsonlBenchmarkReader(AbstractBenchmarkReader):
     def __init__(self, benchmark_filename: str):
         self.benchmark_filename = benchmark_filename
+        # Byte offsets of the article lines, computed on the first random access
+        self._offsets = None
+        self._offsets: Optional[List[int]]
 
     def article_iterator(self) -> Iterator[Article]:
         with open(self.benchmark_filename, "r") as benchmark_file:
@@ -21,3 +24,28 @@ class OurJsonlBenchmarkReader(AbstractBenchmarkReader):
                                    "or get your own copy of the AIDA-CoNLL benchmark and add it to ELEVANT as "
                                    "described in docs/add_benchmark.md.")
                 yield article
+
+    def _get_offsets(self) -> List[int]:
+        if self._offsets is None:
+            offsets = []
+            offset = 0
+            with open(self.benchmark_filename, "rb") as benchmark_file:
+                for line in benchmark_file:
+                    offsets.append(offset)
+                    offset += len(line)
+            self._offsets = offsets
+        return self._offsets
+
+    def get_article(self, index: int) -> Article:
+        """
+        Returns the article with the given index in the benchmark.
+        """
+        offsets = self._get_offsets()
+        if not 0 <= index < len(offsets):
+            raise IndexError(f"Benchmark {self.benchmark_filename} has no article with index {index}.")
+        with open(self.benchmark_filename, "rb") as benchmark_file:
+            benchmark_file.seek(offsets[index])
+            return article_from_json(benchmark_file.readline().decode("utf8"))
+
+    def __len__(self) -> int:
+        return len(self._get_offsets())
@@ -0,0 +1,84 @@
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from elevant.evaluation.case import Case
+from elevant.evaluation.mention_type import MentionType
+
+
+class ArticleCaseIndex:
+    """
+    Index over the evaluation cases of an article that are considered for
+    error labeling. It is built once per article and shared across evaluation
+    modes and error labelers.
+
+    Cases are sorted by span start. A case overlapping a query span can start
+    at most <max span length> characters before the query start, so overlap
+    queries only inspect cases in [query start - max span length, query end).
+    Named mentions with ground truth are indexed by their ground truth entity
+    id such that the last named mention of an entity before a case can be
+    retrieved without scanning all previous cases.
+    """
+    def __init__(self, cases: List[Case]):
+        self.source_cases = cases
+        # Child cases are not labeled, their labels are determined by the parent case
+        self.cases = [case for case in cases if case.true_entity is None or case.true_entity.parent is None]
+
+        # Sorting is stable, so cases with the same start keep their original order
+        self._positions_by_start = sorted(range(len(self.cases)), key=lambda i: self.cases[i].span[0])
+        self._starts = [self.cases[i].span[0] for i in self._positions_by_start]
+        self._max_length = max([case.span[1] - case.span[0] for case in self.cases], default=0)
+
+        self._named_mention_positions = defaultdict(list)
+        for i, case in enumerate(self.cases):
+            if case.mention_type == MentionType.ENTITY_NAMED and case.has_ground_truth():
+                self._named_mention_positions[case.true_entity.entity_id].append(i)
+
+    def is_index_of(self, cases: List[Case]) -> bool:
+        """
+        Return True if the index was built from the given cases.
+        """
+        return len(cases) == len(self.source_cases) and all(case is source_case for case, source_case
+                                                            in zip(cases, self.source_cases))
+
+    def get_overlapping_cases(self, span: Tuple[int, int], condition: Callable[[Case], bool]) -> Iterator[Case]:
+        """
+        Yield the cases that fulfill the given condition and whose span
+        overlaps with the given span, ordered by span start.
+        """
+        begin, end = span
+        i = bisect_left(self._starts, begin - self._max_length)
+        while i < len(self._starts) and self._starts[i] < end:
+            case = self.cases[self._positions_by_start[i]]
+            if case.span[1] > begin and condition(case):
+                yield case
+            i += 1
+
+    def get_contained_cases(self, span: Tuple[int, int], condition: Callable[[Case], bool]) -> Iterator[Case]:
+        """
+        Yield the cases that fulfill the given condition and whose span is
+        contained in the given span (including the span itself), ordered by span start.
+        """
+        begin, end = span
+        i = bisect_left(self._starts, begin)
+        while i < len(self._starts) and self._starts[i] <= end:
+            case = self.cases[self._positions_by_start[i]]
+            if case.span[1] <= end and condition(case):
+                yield case
+            i += 1
+
+    def has_overlapping_case(self, span: Tuple[int, int], condition: Callable[[Case], bool]) -> bool:
+        for _ in self.get_overlapping_cases(span, condition):
+            return True
+        return False
+
+    def get_last_named_mention(self, entity_id: str, position: int) -> Optional[Case]:
+        """
+        Return the last named mention with the given ground truth entity id
+        that comes before the case at the given position in self.cases.
+        """
+        positions = self._named_mention_positions.get(entity_id)
+        if not positions:
+            return None
+        i = bisect_left(positions, position)
+        return self.cases[positions[i - 1]] if i > 0 else None
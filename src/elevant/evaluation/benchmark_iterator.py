@@ -3,7 +3,9 @@ import random
 from typing import Optional, List
 
 from elevant import settings
+from elevant.benchmark_readers.abstract_benchmark_reader import AbstractBenchmarkReader
 from elevant.benchmark_readers.aida_conll_benchmark_reader import AidaConllBenchmarkReader
+from elevant.benchmark_readers.cached_benchmark_reader import CachedBenchmarkReader
 from elevant.benchmark_readers.nif_benchmark_reader import NifBenchmarkReader
 from elevant.benchmark_readers.oke_benchmark_reader import OkeBenchmarkReader
 from elevant.benchmark_readers.our_jsonl_benchmark_reader import OurJsonlBenchmarkReader
@@ -19,79 +21,128 @@ logger = logging.getLogger("main." + __name__.split(".")[-1])
 random.seed(42)
 
 
+# Mapping files that benchmark readers use to map benchmark entities to Wikidata
+_BENCHMARK_READER_MAPPING_FILES = [settings.WIKIPEDIA_NAME_TO_QID_DB, settings.REDIRECTS_DB,
+                                   settings.WIKIPEDIA_ID_TO_TITLE_FILE]
+
+
+# Reader class for each benchmark format that is not read from our JSONL format
+_BENCHMARK_READER_CLASSES = {
+    BenchmarkFormat.NIF.value: NifBenchmarkReader,
+    BenchmarkFormat.AIDA_CONLL.value: AidaConllBenchmarkReader,
+    BenchmarkFormat.SIMPLE_JSONL.value: SimpleJsonlBenchmarkReader,
+    BenchmarkFormat.TSV.value: TsvBenchmarkReader,
+    BenchmarkFormat.XML.value: XMLBenchmarkReader,
+    BenchmarkFormat.TAGME.value: TagmeBenchmarkReader,
+    BenchmarkFormat.OKE.value: OkeBenchmarkReader,
+}
+
+
 def get_benchmark_iterator(benchmark_name: str,
                            from_json_file: Optional[bool] = True,
                            benchmark_files: Optional[List[str]] = None,
                            benchmark_format: Optional[BenchmarkFormat] = None,
-                           custom_kb: Optional[bool] = False):
+                           custom_kb: Optional[bool] = False,
+                           use_cache: Optional[bool] = True) -> AbstractBenchmarkReader:
+    """
+    Returns a reader for the given benchmark.
+    If use_cache is True and the benchmark is imported from a format other
+    than our JSONL format, the articles of the benchmark are read from the
+    benchmark cache, which is created when the benchmark is read for the
+    first time and invalidated when the benchmark files change. This saves
+    loading the mappings that the benchmark reader needs. Benchmarks in our
+    JSONL format are always read directly, since reading them from the cache
+    is not faster.
+    """
     if custom_kb and benchmark_format not in {BenchmarkFormat.NIF.value, BenchmarkFormat.SIMPLE_JSONL.value}:
         logger.warning(f"Using a custom knowledge base is not supported for benchmark format {benchmark_format}. "
                        f"Please choose a different format.")
     if benchmark_files:
-        if benchmark_format == BenchmarkFormat.NIF.value:
-            entity_db = EntityDatabase()
-            if not custom_kb:
-                logger.info("Load mappings for NIF benchmark reader...")
-                entity_db.load_wikipedia_to_wikidata_db()
-                entity_db.load_redirects()
-                logger.info("-> Mappings loaded.")
-            benchmark_iterator = NifBenchmarkReader(entity_db, benchmark_files[0], custom_kb)
-        elif benchmark_format == BenchmarkFormat.AIDA_CONLL.value:
-            entity_db = EntityDatabase()
-            logger.info("Load mappings for AIDA CoNLL benchmark reader...")
-            entity_db.load_wikipedia_to_wikidata_db()
-            entity_db.load_redirects()
-            logger.info("-> Mappings loaded.")
-            benchmark_iterator = AidaConllBenchmarkReader(entity_db, benchmark_files[0], benchmark_name)
-        elif benchmark_format == BenchmarkFormat.SIMPLE_JSONL.value:
-            entity_db = EntityDatabase()
-            if not custom_kb:
-                logger.info("Load mappings for Simple JSONL benchmark reader...")
-                entity_db.load_wikipedia_to_wikidata_db()
-                entity_db.load_redirects()
-                logger.info("-> Mappings loaded.")
-            benchmark_iterator = SimpleJsonlBenchmarkReader(entity_db, benchmark_files[0], custom_kb)
-        elif benchmark_format == BenchmarkFormat.TSV.value:
-            entity_db = EntityDatabase()
-            logger.info("Load mappings for TSV benchmark reader...")
-            entity_db.load_wikipedia_to_wikidata_db()
-            entity_db.load_redirects()
-            logger.info("-> Mappings loaded.")
-            benchmark_iterator = TsvBenchmarkReader(entity_db, benchmark_files[0])
-        elif benchmark_format == BenchmarkFormat.XML.value:
-            if len(benchmark_files) == 1:
-                raise IndexError("The XML benchmark reader needs the XML file and the directory with raw texts "
-                                 "as input, but only one file was provided.")
-            entity_db = EntityDatabase()
-            logger.info("Load mappings for XML benchmark reader...")
-            entity_db.load_wikipedia_to_wikidata_db()
-            entity_db.load_redirects()
-            logger.info("-> Mappings loaded.")
-            benchmark_iterator = XMLBenchmarkReader(entity_db, benchmark_files[0], benchmark_files[1])
-        elif benchmark_format == BenchmarkFormat.TAGME.value:
-            if len(benchmark_files) == 1:
-                raise IndexError("The TagMe benchmark reader needs the annotation file and the text snippet file "
-                                 "as input, but only one file was provided.")
-            entity_db = EntityDatabase()
-            logger.info("Load mappings for TagMe benchmark reader...")
+        if benchmark_format in (None, BenchmarkFormat.OURS_JSONL.value):
+            return OurJsonlBenchmarkReader(benchmark_files[0])
+        if use_cache and benchmark_format in _BENCHMARK_READER_CLASSES:
+            reader_key = f"{benchmark_format};{benchmark_name};{custom_kb}"
+            return CachedBenchmarkReader(benchmark_files,
+                                         lambda: _create_benchmark_reader(benchmark_name, benchmark_files,
+                                                                          benchmark_format, custom_kb),
+                                         reader_key,
+                                         reader_class=_BENCHMARK_READER_CLASSES[benchmark_format],
+                                         mapping_files=_BENCHMARK_READER_MAPPING_FILES)
+        return _create_benchmark_reader(benchmark_name, benchmark_files, benchmark_format, custom_kb)
+    elif from_json_file or benchmark_name in [Benchmark.WIKI_FAIR.value, Benchmark.NEWS_FAIR.value]:
+        benchmark_filename = settings.BENCHMARK_DIR + benchmark_name + ".benchmark.jsonl"
+        return OurJsonlBenchmarkReader(benchmark_filename)
+    else:
+        raise ValueError("%s is not a known benchmark." % benchmark_name)
+
+
+def _create_benchmark_reader(benchmark_name: str,
+                             benchmark_files: List[str],
+                             benchmark_format: BenchmarkFormat,
+                             custom_kb: bool) -> AbstractBenchmarkReader:
+    """
+    Creates the benchmark reader for the given benchmark files and loads the
+    mappings it needs.
+    """
+    if benchmark_format == BenchmarkFormat.NIF.value:
+        entity_db = EntityDatabase()
+        if not custom_kb:
+            logger.info("Load mappings for NIF benchmark reader...")
             entity_db.load_wikipedia_to_wikidata_db()
             entity_db.load_redirects()
-            entity_db.load_wikipedia_id2wikipedia_title()
             logger.info("-> Mappings loaded.")
-            benchmark_iterator = TagmeBenchmarkReader(entity_db, benchmark_files[0], benchmark_files[1])
-        elif benchmark_format == BenchmarkFormat.OKE.value:
-            entity_db = EntityDatabase()
-            logger.info("Load mappings for OKE benchmark reader...")
+        benchmark_iterator = NifBenchmarkReader(entity_db, benchmark_files[0], custom_kb)
+    elif benchmark_format == BenchmarkFormat.AIDA_CONLL.value:
+        entity_db = EntityDatabase()
+        logger.info("Load mappings for AIDA CoNLL benchmark reader...")
+        entity_db.load_wikipedia_to_wikidata_db()
+        entity_db.load_redirects()
+        logger.info("-> Mappings loaded.")
+        benchmark_iterator = AidaConllBenchmarkReader(entity_db, benchmark_files[0], benchmark_name)
+    elif benchmark_format == BenchmarkFormat.SIMPLE_JSONL.value:
+        entity_db = EntityDatabase()
+        if not custom_kb:
+            logger.info("Load mappings for Simple JSONL benchmark reader...")
             entity_db.load_wikipedia_to_wikidata_db()
             entity_db.load_redirects()
             logger.info("-> Mappings loaded.")
-            benchmark_iterator = OkeBenchmarkReader(entity_db, benchmark_files[0])
-        else:
-            # Per default, assume OUR_JSONL format
-            benchmark_iterator = OurJsonlBenchmarkReader(benchmark_files[0])
-    elif from_json_file or benchmark_name in [Benchmark.WIKI_FAIR.value, Benchmark.NEWS_FAIR.value]:
-        benchmark_filename = settings.BENCHMARK_DIR + benchmark_name + ".benchmark.jsonl"
-        benchmark_iterator = OurJsonlBenchmarkReader(benchmark_filename)
+        benchmark_iterator = SimpleJsonlBenchmarkReader(entity_db, benchmark_files[0], custom_kb)
+    elif benchmark_format == BenchmarkFormat.TSV.value:
+        entity_db = EntityDatabase()
+        logger.info("Load mappings for TSV benchmark reader...")
+        entity_db.load_wikipedia_to_wikidata_db()
+        entity_db.load_redirects()
+        logger.info("-> Mappings loaded.")
+        benchmark_iterator = TsvBenchmarkReader(entity_db, benchmark_files[0])
+    elif benchmark_format == BenchmarkFormat.XML.value:
+        if len(benchmark_files) == 1:
+            raise IndexError("The XML benchmark reader needs the XML file and the directory with raw texts "
+                             "as input, but only one file was provided.")
+        entity_db = EntityDatabase()
+        logger.info("Load mappings for XML benchmark reader...")
+        entity_db.load_wikipedia_to_wikidata_db()
+        entity_db.load_redirects()
+        logger.info("-> Mappings loaded.")
+        benchmark_iterator = XMLBenchmarkReader(entity_db, benchmark_files[0], benchmark_files[1])
+    elif benchmark_format == BenchmarkFormat.TAGME.value:
+        if len(benchmark_files) == 1:
+            raise IndexError("The TagMe benchmark reader needs the annotation file and the text snippet file "
+                             "as input, but only one file was provided.")
+        entity_db = EntityDatabase()
+        logger.info("Load mappings for TagMe benchmark reader...")
+        entity_db.load_wikipedia_to_wikidata_db()
+        entity_db.load_redirects()
+        entity_db.load_wikipedia_id2wikipedia_title()
+        logger.info("-> Mappings loaded.")
+        benchmark_iterator = TagmeBenchmarkReader(entity_db, benchmark_files[0], benchmark_files[1])
+    elif benchmark_format == BenchmarkFormat.OKE.value:
+        entity_db = EntityDatabase()
+        logger.info("Load mappings for OKE benchmark reader...")
+        entity_db.load_wikipedia_to_wikidata_db()
+        entity_db.load_redirects()
+        logger.info("-> Mappings loaded.")
+        benchmark_iterator = OkeBenchmarkReader(entity_db, benchmark_files[0])
     else:
-        raise ValueError("%s is not a known benchmark." % benchmark_name)
+        # Per default, assume OUR_JSONL format
+        benchmark_iterator = OurJsonlBenchmarkReader(benchmark_files[0])
     return benchmark_iterator
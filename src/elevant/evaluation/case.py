@@ -1,11 +1,11 @@
 import logging
 from typing import Optional, Tuple, Set, Dict, List
 from enum import Enum
-import json
 
 from elevant.evaluation.groundtruth_label import GroundtruthLabel
 from elevant.models.wikidata_entity import WikidataEntity
 from elevant.evaluation.mention_type import get_mention_type
+from elevant.utils import json_serialization
 from elevant.utils.knowledge_base_mapper import KnowledgeBaseMapper
 
 logger = logging.getLogger("main." + __name__.split(".")[-1])
@@ -406,7 +406,7 @@ class Case:
         return data
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict())
+        return json_serialization.dumps(self.to_dict())
 
 
 def case_from_dict(data) -> Case:
@@ -456,4 +456,4 @@ def case_from_dict(data) -> Case:
 
 
 def case_from_json(dump) -> Case:
-    return case_from_dict(json.loads(dump))
+    return case_from_dict(json_serialization.loads(dump))
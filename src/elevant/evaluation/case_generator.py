@@ -2,6 +2,7 @@ from collections import defaultdict
 from typing import Tuple, List, Set, Dict
 
 from elevant.evaluation.case import Case, EvaluationType, EvaluationMode
+from elevant.evaluation.entity_lookup_cache import EntityLookups
 from elevant.evaluation.groundtruth_label import GroundtruthLabel
 from elevant.models.entity_database import EntityDatabase
 from elevant.models.entity_mention import EntityMention
@@ -38,7 +39,7 @@ def word_boundary(span: Tuple[int, int], text: str) -> Tuple[int, int]:
 
 
 class CaseGenerator:
-    def __init__(self, entity_db: EntityDatabase):
+    def __init__(self, entity_db: EntityLookups):
         self.entity_db = entity_db
         self.article = None
         self.label_dict = None
@@ -0,0 +1,94 @@
+import logging
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from elevant.models.entity_database import EntityDatabase
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+ENTITY_LOOKUP_CACHE_SIZE = 2 ** 18
+_NOT_CACHED = object()
+
+
+class EntityLookupCache:
+    """
+    Evaluation-scoped cache for the entity database lookups that are performed
+    for every case during case generation and error labeling. Entity names,
+    entity types and most popular candidates are read from database files,
+    so recently used QIDs and aliases are not looked up again. Each lookup
+    type keeps at most max_size entries and evicts the least recently used
+    entry when it is full, so the cache does not grow with the number of
+    evaluated benchmarks.
+
+    Provides the subset of the EntityDatabase interface that is used during
+    evaluation, such that it can be passed wherever an EntityDatabase is used
+    for these lookups. The returned values are shared between callers and
+    must not be modified.
+    """
+    def __init__(self, entity_db: EntityDatabase, max_size: Optional[int] = ENTITY_LOOKUP_CACHE_SIZE):
+        self.entity_db = entity_db
+        self.max_size = max_size
+        self._caches = {
+            "entity_name": OrderedDict(),
+            "entity_types": OrderedDict(),
+            "most_popular_candidates": OrderedDict(),
+        }
+        self.n_lookups = Counter()
+        self.n_db_lookups = Counter()
+
+    def _lookup(self, lookup_name: str, key: Any, lookup_function: Callable[[Any], Any]) -> Any:
+        self.n_lookups[lookup_name] += 1
+        cache = self._caches[lookup_name]
+        value = cache.get(key, _NOT_CACHED)
+        if value is not _NOT_CACHED:
+            cache.move_to_end(key)
+            return value
+        self.n_db_lookups[lookup_name] += 1
+        value = lookup_function(key)
+        cache[key] = value
+        if len(cache) > self.max_size:
+            # Evict the least recently used key
+            cache.popitem(last=False)
+        return value
+
+    def get_entity_name(self, entity_id: str) -> Optional[str]:
+        return self._lookup("entity_name", entity_id, self.entity_db.get_entity_name)
+
+    def get_entity_types(self, entity_id: str) -> Optional[List[str]]:
+        return self._lookup("entity_types", entity_id, self.entity_db.get_entity_types)
+
+    def get_most_popular_candidate_for_hyperlink(self, alias: str) -> Set[str]:
+        return self._lookup("most_popular_candidates", alias, self.entity_db.get_most_popular_candidate_for_hyperlink)
+
+    def is_quantity(self, entity_id: str) -> bool:
+        return self.entity_db.is_quantity(entity_id)
+
+    def is_datetime(self, entity_id: str) -> bool:
+        return self.entity_db.is_datetime(entity_id)
+
+    def is_demonym(self, text: str) -> bool:
+        return self.entity_db.is_demonym(text)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return for each lookup type the number of lookups, the number of
+        lookups that were answered from the database and the number of cached entries.
+        """
+        return {lookup_name: {"lookups": self.n_lookups[lookup_name],
+                              "db_lookups": self.n_db_lookups[lookup_name],
+                              "cached": len(cache)}
+                for lookup_name, cache in self._caches.items()}
+
+    def log_stats(self):
+        for lookup_name, stats in self.get_stats().items():
+            hits = stats["lookups"] - stats["db_lookups"]
+            hit_rate = hits / stats["lookups"] * 100 if stats["lookups"] else 0
+            logger.info(f"{lookup_name} lookups: {stats['lookups']}, database lookups: {stats['db_lookups']}, "
+                         f"cache hit rate: {hit_rate:.1f}%")
+
+    def reset_stats(self):
+        self.n_lookups = Counter()
+        self.n_db_lookups = Counter()
+
+
+EntityLookups = Union[EntityDatabase, EntityLookupCache]
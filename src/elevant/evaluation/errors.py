@@ -1,10 +1,11 @@
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple, Set
 
 from elevant import settings
+from elevant.evaluation.article_case_index import ArticleCaseIndex
 from elevant.evaluation.case import Case, ErrorLabel, EvaluationMode
+from elevant.evaluation.entity_lookup_cache import EntityLookups
 from elevant.evaluation.groundtruth_label import GroundtruthLabel
-from elevant.evaluation.mention_type import MentionType, is_non_named_entity
-from elevant.models.entity_database import EntityDatabase
+from elevant.evaluation.mention_type import is_non_named_entity
 from elevant.models.wikidata_entity import WikidataEntity
 from elevant.models.article import Article
 
@@ -13,18 +14,28 @@ from elevant.evaluation.benchmark_case import BenchmarkCaseLabel
 
 def label_errors(article: Article,
                  cases: List[Case],
-                 entity_db: EntityDatabase,
+                 entity_db: EntityLookups,
                  eval_mode: EvaluationMode,
-                 contains_unknowns: bool):
-    cases = [case for case in cases if case.true_entity is None or case.true_entity.parent is None]
-    label_undetected_errors(cases, eval_mode)
+                 contains_unknowns: bool,
+                 case_index: Optional[ArticleCaseIndex] = None):
+    """
+    Label the cases of the article with error labels for the given evaluation mode.
+    The case index can be built once with ArticleCaseIndex(cases) and passed
+    for each evaluation mode. Otherwise, it is built from the given cases.
+    """
+    if case_index is None:
+        case_index = ArticleCaseIndex(cases)
+    elif not case_index.is_index_of(cases):
+        raise ValueError("The case index was not built from the given cases.")
+    cases = case_index.cases
+    label_undetected_errors(case_index, eval_mode)
     label_disambiguation_errors(cases, entity_db, eval_mode)
-    label_false_detections(cases, contains_unknowns, eval_mode)
+    label_false_detections(case_index, contains_unknowns, eval_mode)
     label_candidate_errors(cases, eval_mode)
     label_multi_candidates(cases, eval_mode)
     label_hyperlink_errors(article, cases, eval_mode)
-    label_span_errors(cases, eval_mode)
-    label_coreference_errors(cases, eval_mode)
+    label_span_errors(case_index, eval_mode)
+    label_coreference_errors(case_index, eval_mode)
     label_correct(cases, entity_db, eval_mode)
 
 
@@ -37,17 +48,17 @@ def is_subspan(span: Tuple[int, int], subspan: Tuple[int, int]) -> bool:
     return span[0] <= subspan[0] and span[1] >= subspan[1]
 
 
-def is_partially_included_error(case: Case, false_positive_spans: List[Tuple[int, int]]) -> bool:
+def is_partially_included_error(case: Case, case_index: ArticleCaseIndex, eval_mode: EvaluationMode) -> bool:
     """
     A false positive span is subspan of the ground truth span.
     """
-    for fp_span in false_positive_spans:
-        if is_subspan(case.span, fp_span):
+    for fp_case in case_index.get_contained_cases(case.span, lambda c: c.is_ner_fp(eval_mode)):
+        if is_subspan(case.span, fp_case.span):
             return True
     return False
 
 
-def label_undetected_errors(cases: List[Case], eval_mode: EvaluationMode):
+def label_undetected_errors(case_index: ArticleCaseIndex, eval_mode: EvaluationMode):
     """
     Label undetected mentions as undetected and one of:
     - undetected lowercase
@@ -55,15 +66,14 @@ def label_undetected_errors(cases: List[Case], eval_mode: EvaluationMode):
     - undetected overlap
     - undetected other
     """
-    false_positive_spans = [case.span for case in cases if case.is_ner_fp(eval_mode)]
-    for case in cases:
+    for case in case_index.cases:
         if not case.is_coreference() and case.is_ner_fn(eval_mode):
             case.add_error_label(ErrorLabel.NER_FN, eval_mode)
             if is_non_named_entity(case.text):
                 case.add_error_label(ErrorLabel.NER_FN_LOWERCASED, eval_mode)
-            elif is_partially_included_error(case, false_positive_spans):
+            elif is_partially_included_error(case, case_index, eval_mode):
                 case.add_error_label(ErrorLabel.NER_FN_PARTIALLY_INCLUDED, eval_mode)
-            elif overlaps_any(case.span, false_positive_spans):
+            elif case_index.has_overlapping_case(case.span, lambda c: c.is_ner_fp(eval_mode)):
                 case.add_error_label(ErrorLabel.NER_FN_PARTIAL_OVERLAP, eval_mode)
             else:
                 case.add_error_label(ErrorLabel.NER_FN_OTHER, eval_mode)
@@ -72,7 +82,7 @@ def label_undetected_errors(cases: List[Case], eval_mode: EvaluationMode):
 DEMONYM_TYPES = {settings.TYPE_LOCATION_QID, settings.TYPE_ETHNICITY_QID, settings.TYPE_LANGUOID_QID}
 
 
-def is_demonym(case: Case, entity_db: EntityDatabase) -> bool:
+def is_demonym(case: Case, entity_db: EntityLookups) -> bool:
     """
     Mention is contained in the list of demonyms and ground truth type is location, ethnicity or languoid.
     """
@@ -93,7 +103,7 @@ def is_partial_name(case: Case) -> bool:
     return " " in name and len(case.text) < len(name) and case.text in name
 
 
-def is_rare_case(case: Case, entity_db: EntityDatabase) -> bool:
+def is_rare_case(case: Case, entity_db: EntityLookups) -> bool:
     """
     The most popular candidate is not the ground truth entity.
     """
@@ -103,7 +113,7 @@ def is_rare_case(case: Case, entity_db: EntityDatabase) -> bool:
     return most_popular_candidates and case.true_entity.entity_id not in most_popular_candidates
 
 
-def label_correct(cases: List[Case], entity_db: EntityDatabase, eval_mode: EvaluationMode):
+def label_correct(cases: List[Case], entity_db: EntityLookups, eval_mode: EvaluationMode):
     """
     Label correct predictions with one of (or no label):
     - demonym correct
@@ -157,7 +167,7 @@ def label_correct(cases: List[Case], entity_db: EntityDatabase, eval_mode: Evalu
                 case.add_error_label(ErrorLabel.AVOIDED_NER_FP_GROUNDTRUTH_UNKNOWN, eval_mode)
 
 
-def get_benchmark_case_labels(case: Case, entity_db: EntityDatabase):
+def get_benchmark_case_labels(case: Case, entity_db: EntityLookups):
     if not case.ground_truth_has_known_entity_id():
         # Unknown ground truth cases should not be considered rare errors.
         # Demonym is the only acceptable error label for unknown ground truth cases, but even that is
@@ -178,7 +188,7 @@ def get_benchmark_case_labels(case: Case, entity_db: EntityDatabase):
         return BenchmarkCaseLabel.RARE
 
 
-def get_most_popular_candidate(entity_db: EntityDatabase, alias: str) -> Set[str]:
+def get_most_popular_candidate(entity_db: EntityLookups, alias: str) -> Set[str]:
     """
     Returns the entity ID of the most popular candidate for the given alias, or None if no candidate exists
     or all link frequencies are 0.
@@ -190,7 +200,7 @@ def get_most_popular_candidate(entity_db: EntityDatabase, alias: str) -> Set[str
     return most_popular_candidates
 
 
-def is_metonymy(case: Case, entity_db: EntityDatabase) -> bool:
+def is_metonymy(case: Case, entity_db: EntityLookups) -> bool:
     """
     The most popular candidate is a location, and the ground truth is neither a location, person nor ethnicity.
     """
@@ -211,7 +221,7 @@ def is_metonymy(case: Case, entity_db: EntityDatabase) -> bool:
     return settings.TYPE_LOCATION_QID in most_popular_entity_types
 
 
-def is_metonymy_error(case: Case, entity_db: EntityDatabase) -> bool:
+def is_metonymy_error(case: Case, entity_db: EntityLookups) -> bool:
     """
     Same as is_metonymy(), and the predicted entity is a location.
     """
@@ -221,7 +231,7 @@ def is_metonymy_error(case: Case, entity_db: EntityDatabase) -> bool:
     return settings.TYPE_LOCATION_QID in predicted_types
 
 
-def label_disambiguation_errors(cases: List[Case], entity_db: EntityDatabase, eval_mode: EvaluationMode):
+def label_disambiguation_errors(cases: List[Case], entity_db: EntityLookups, eval_mode: EvaluationMode):
     """
     Mention was detected, but linked to the wrong entity.
     Cases get labeled with disambiguation errors, and one of the following:
@@ -287,7 +297,7 @@ def contains_uppercase_word(text: str) -> bool:
     return False
 
 
-def label_false_detections(cases: List[Case],
+def label_false_detections(case_index: ArticleCaseIndex,
                            contains_unknowns: bool,
                            eval_mode: EvaluationMode):
     """
@@ -300,16 +310,10 @@ def label_false_detections(cases: List[Case],
     Otherwise, it is also labeled when the mention does not overlap with any ground truth (because unknown labels can
     be missing, e.g. in the MSNBC and ACE benchmarks).
     """
-    ground_truth_spans = [case.span for case in cases if case.has_relevant_ground_truth(eval_mode)]
-
-    for case in cases:
+    for case in case_index.cases:
         if not case.is_coreference() and case.is_ner_fp(eval_mode):
             case.add_error_label(ErrorLabel.NER_FP, eval_mode)
-            overlap = False
-            for gt_span in ground_truth_spans:
-                if overlaps(case.span, gt_span):
-                    overlap = True
-                    break
+            overlap = case_index.has_overlapping_case(case.span, lambda c: c.has_relevant_ground_truth(eval_mode))
             # contains_upper = contains_uppercase_word(case.text)
             if not overlap and is_non_named_entity(case.text):
                 case.add_error_label(ErrorLabel.NER_FP_LOWERCASED, eval_mode)
@@ -331,8 +335,8 @@ def label_hyperlink_errors(article: Article, cases: List[Case], eval_mode: Evalu
                 case.add_error_label(ErrorLabel.HYPERLINK_WRONG, eval_mode)
 
 
-def label_coreference_errors(cases: List[Case], eval_mode):
-    for i, case in enumerate(cases):
+def label_coreference_errors(case_index: ArticleCaseIndex, eval_mode):
+    for i, case in enumerate(case_index.cases):
         if case.is_coreference():
             if case.is_ner_fp(eval_mode):
                 # Coreference NER FP
@@ -342,12 +346,7 @@ def label_coreference_errors(cases: List[Case], eval_mode):
                 case.add_error_label(ErrorLabel.COREFERENCE_UNDETECTED, eval_mode)
             elif case.is_linking_fn(eval_mode) and case.is_linking_fp(eval_mode):
                 # Coreference FN + FP = disambiguation error
-                true_reference = None
-                for j in range(i - 1, -1, -1):
-                    if cases[j].mention_type == MentionType.ENTITY_NAMED and cases[j].has_ground_truth() and \
-                            cases[j].true_entity.entity_id == case.true_entity.entity_id:
-                        true_reference = cases[j]
-                        break
+                true_reference = case_index.get_last_named_mention(case.true_entity.entity_id, i)
                 if true_reference is not None:
                     if true_reference.prediction_is_known() and \
                             true_reference.predicted_entity.entity_id == case.predicted_entity.entity_id:
@@ -356,20 +355,22 @@ def label_coreference_errors(cases: List[Case], eval_mode):
                         case.add_error_label(ErrorLabel.COREFERENCE_WRONG_MENTION_REFERENCED, eval_mode)
 
 
-def label_span_errors(cases: List[Case], eval_mode: EvaluationMode):
+def label_span_errors(case_index: ArticleCaseIndex, eval_mode: EvaluationMode):
     """
     False positives, that overlap with a ground truth mention with the same entity id.
     """
-    ground_truth_spans = {case.span: case.true_entity for case in cases if case.has_relevant_ground_truth(eval_mode)}
-    for case in cases:
+    for case in case_index.cases:
         if case.is_ner_fp(eval_mode):
+            # If several cases have the same span, the ground truth label of the last one is used
+            ground_truth_spans = {gt_case.span: gt_case.true_entity for gt_case in case_index.get_overlapping_cases(
+                case.span, lambda c: c.has_relevant_ground_truth(eval_mode))}
             for gt_span in ground_truth_spans:
                 gt_label = ground_truth_spans[gt_span]
                 if gt_span == case.span:
                     # Span is correct -> no need to consider it
                     continue
-                if overlaps(case.span, gt_span) and (case.predicted_entity.entity_id == gt_label.entity_id or
-                                                     is_true_quantity_or_datetime(case.predicted_entity, gt_label)):
+                if case.predicted_entity.entity_id == gt_label.entity_id or \
+                        is_true_quantity_or_datetime(case.predicted_entity, gt_label):
                     # Span is wrong and entity id is correct or it's a true quantity or datetime.
                     case.add_error_label(ErrorLabel.NER_FP_WRONG_SPAN, eval_mode)
                     break
@@ -0,0 +1,172 @@
+"""
+Sidecar index for .eval_cases.jsonl files.
+
+An .eval_cases.jsonl file contains one line per article with the list of
+evaluation cases of the article. The index file <prefix>.eval_cases.index.json
+stores for each article the byte offset and length of its line and, for each
+evaluation mode and error label, the articles with cases that have the error
+label together with the number of such cases. This allows reading the cases
+of single articles and finding the articles with a certain error label
+without parsing the whole cases file.
+
+Index file format (JSON):
+    version
+    cases_file_size: size of the indexed cases file, to detect outdated indices
+    cases_file_mtime_ns: modification time of the indexed cases file in ns,
+        to detect outdated indices of cases files with unchanged size
+    offsets: byte offset of the line of each article
+    lengths: byte length of the line of each article (without the newline)
+    error_labels: {evaluation mode: {error label: [[article index, number of cases], ...]}}
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from elevant.evaluation.case import EvaluationMode, ErrorLabel
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+CASES_EXTENSION = ".eval_cases.jsonl"
+INDEX_EXTENSION = ".eval_cases.index.json"
+INDEX_VERSION = 2
+
+
+def get_index_filename(cases_filename: str) -> str:
+    if cases_filename.endswith(CASES_EXTENSION):
+        return cases_filename[:-len(CASES_EXTENSION)] + INDEX_EXTENSION
+    return cases_filename + ".index.json"
+
+
+class EvalCasesIndexWriter:
+    """
+    Collects the index entries while an .eval_cases.jsonl file is written.
+    Call add_article() for each line written to the cases file in the order
+    of the lines and write() once the cases file is complete and closed.
+    """
+    def __init__(self):
+        self.offsets = []
+        self.lengths = []
+        self.error_labels: Dict[str, Dict[str, List[Tuple[int, int]]]] = {mode.value: {} for mode in EvaluationMode}
+        self.position = 0
+
+    def add_article(self, line: str, case_list: List[Dict[str, Any]]):
+        """
+        Add the given line of the cases file (without the newline) and the
+        case dictionaries it was created from.
+        """
+        article_index = len(self.offsets)
+        length = len(line.encode("utf8"))
+        self.offsets.append(self.position)
+        self.lengths.append(length)
+        self.position += length + 1
+        for mode in EvaluationMode:
+            label_counts = Counter(label for case in case_list for label in case["error_labels"][mode.value])
+            for label, count in sorted(label_counts.items()):
+                self.error_labels[mode.value].setdefault(label, []).append((article_index, count))
+
+    def write(self, index_filename: str, cases_filename: str):
+        index = {"version": INDEX_VERSION,
+                 "cases_file_size": self.position,
+                 "cases_file_mtime_ns": os.stat(cases_filename).st_mtime_ns,
+                 "offsets": self.offsets,
+                 "lengths": self.lengths,
+                 "error_labels": self.error_labels}
+        with open(index_filename, "w", encoding="utf8") as file:
+            json.dump(index, file, separators=(",", ":"))
+
+
+def write_eval_cases_index(cases_filename: str, index_filename: Optional[str] = None) -> str:
+    """
+    Create the index for an existing .eval_cases.jsonl file.
+    """
+    if index_filename is None:
+        index_filename = get_index_filename(cases_filename)
+    writer = EvalCasesIndexWriter()
+    with open(cases_filename, "r", encoding="utf8") as file:
+        for line in file:
+            line = line.rstrip("\n")
+            writer.add_article(line, json.loads(line))
+    writer.write(index_filename, cases_filename)
+    return index_filename
+
+
+class EvalCasesFile:
+    """
+    Reads the evaluation cases of single articles from an .eval_cases.jsonl
+    file using its index file. If the index file does not exist or does not
+    match the cases file, it is created.
+    """
+    def __init__(self, cases_filename: str, index_filename: Optional[str] = None):
+        self.cases_filename = cases_filename
+        self.index_filename = index_filename if index_filename else get_index_filename(cases_filename)
+        self.index = self._read_index()
+        if self.index is None:
+            logger.info(f"Creating index for {cases_filename} ...")
+            write_eval_cases_index(cases_filename, self.index_filename)
+            self.index = self._read_index()
+        self.offsets = self.index["offsets"]
+        self.lengths = self.index["lengths"]
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.index_filename):
+            return None
+        with open(self.index_filename, "r", encoding="utf8") as file:
+            index = json.load(file)
+        stat = os.stat(self.cases_filename)
+        if index.get("version") != INDEX_VERSION or index.get("cases_file_size") != stat.st_size or \
+                index.get("cases_file_mtime_ns") != stat.st_mtime_ns:
+            logger.info(f"Index file {self.index_filename} is outdated.")
+            return None
+        return index
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def get_article_cases(self, article_index: int) -> List[Dict[str, Any]]:
+        """
+        Returns the case dictionaries of the article with the given index.
+        """
+        return next(self.iterate_article_cases([article_index]))
+
+    def iterate_article_cases(self, article_indices: Optional[List[int]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields the case dictionaries of the articles with the given indices
+        (all articles if no indices are given).
+        """
+        if article_indices is None:
+            article_indices = range(len(self))
+        with open(self.cases_filename, "rb") as file:
+            for article_index in article_indices:
+                file.seek(self.offsets[article_index])
+                yield json.loads(file.read(self.lengths[article_index]).decode("utf8"))
+
+    def get_error_label_counts(self,
+                               error_label: ErrorLabel,
+                               mode: Optional[EvaluationMode] = EvaluationMode.IGNORED) -> Dict[int, int]:
+        """
+        Returns for each article with cases with the given error label the number of such cases.
+        """
+        article_counts = self.index["error_labels"][mode.value].get(error_label.value, [])
+        return {article_index: count for article_index, count in article_counts}
+
+    def get_articles_with_error_label(self,
+                                      error_label: ErrorLabel,
+                                      mode: Optional[EvaluationMode] = EvaluationMode.IGNORED) -> List[int]:
+        return sorted(self.get_error_label_counts(error_label, mode))
+
+    def iterate_cases_with_error_label(self,
+                                       error_label: ErrorLabel,
+                                       mode: Optional[EvaluationMode] = EvaluationMode.IGNORED) \
+            -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yields the article index and the case dictionary of all cases with the given error label.
+        Only the lines of articles that contain such cases are read.
+        """
+        article_indices = self.get_articles_with_error_label(error_label, mode)
+        for article_index, case_list in zip(article_indices, self.iterate_article_cases(article_indices)):
+            for case in case_list:
+                if error_label.value in case["error_labels"][mode.value]:
+                    yield article_index, case
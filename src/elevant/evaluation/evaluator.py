@@ -3,8 +3,10 @@ import spacy
 from typing import Optional, Dict, Tuple, List
 
 from elevant import settings
+from elevant.evaluation.article_case_index import ArticleCaseIndex
 from elevant.evaluation.case import Case, ErrorLabel, EvaluationMode
 from elevant.evaluation.case_generator import CaseGenerator
+from elevant.evaluation.entity_lookup_cache import EntityLookupCache
 from elevant.evaluation.groundtruth_label import GroundtruthLabel
 from elevant.evaluation.mention_type import MentionType
 from elevant.helpers.entity_database_reader import EntityDatabaseReader
@@ -85,7 +87,9 @@ class Evaluator:
         self.whitelist_types = EntityDatabaseReader.read_whitelist_types(whitelist_file, with_adjustments=True)
         self.entity_db = load_evaluation_entities(type_mapping_file, custom_kb)
         self.model = spacy.load("en_core_web_lg")
-        self.case_generator = CaseGenerator(self.entity_db)
+        # Entity names, types and most popular candidates are looked up once per entity / alias
+        self.entity_lookups = EntityLookupCache(self.entity_db)
+        self.case_generator = CaseGenerator(self.entity_lookups)
         self.contains_unknowns = contains_unknowns
         self.has_candidates = False
 
@@ -120,11 +124,14 @@ class Evaluator:
         self.n_words = 0
         self.n_lowercase_words = 0
         self.n_no_lowercase_words = 0
+        self.entity_lookups.reset_stats()
 
     def evaluate_article(self, article: Article) -> List[Case]:
         cases = self.case_generator.get_evaluation_cases(article)
+        case_index = ArticleCaseIndex(cases)
         for mode in EvaluationMode:
-            label_errors(article, cases, self.entity_db, mode, contains_unknowns=self.contains_unknowns)
+            label_errors(article, cases, self.entity_lookups, mode, contains_unknowns=self.contains_unknowns,
+                         case_index=case_index)
             for case in cases:
                 self.count_ner_case(case, mode)
                 self.count_mention_type_case(case, mode)
@@ -187,7 +194,7 @@ class Evaluator:
                 self.counts[eval_mode]["coref"]["fp"] += 1
             else:
                 pred_entity_id = case.predicted_entity.entity_id
-                type_ids = get_type_ids(self.entity_db.get_entity_types(pred_entity_id))
+                type_ids = get_type_ids(self.entity_lookups.get_entity_types(pred_entity_id))
                 if not type_ids:
                     type_ids = [GroundtruthLabel.OTHER]
                 for type_id in type_ids:
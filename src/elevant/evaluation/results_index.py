@@ -0,0 +1,206 @@
+"""
+Index of all experiments in the evaluation results directory.
+
+For each experiment, i.e. each .eval_results.json file in a subdirectory of
+the evaluation results directory, the index holds the evaluation results and
+the metadata of the experiment. The index is updated incrementally: only
+files whose size or modification time changed since the last update are read
+again. The index can be stored in a file such that a restarted server does
+not have to read all results files again.
+
+For the .eval_cases.jsonl and .linked_articles.jsonl files of an experiment,
+the index holds the byte offsets of the lines, i.e. of the articles, such that
+the lines of a range of articles can be read without reading the whole file.
+"""
+
+import json
+import logging
+import os
+import threading
+
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+RESULTS_EXTENSION = ".eval_results.json"
+METADATA_EXTENSION = ".metadata.json"
+CASES_EXTENSION = ".eval_cases.jsonl"
+LINKED_ARTICLES_EXTENSION = ".linked_articles.jsonl"
+
+INDEX_VERSION = 1
+
+
+def _get_file_stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_json(path: str) -> Optional[Any]:
+    try:
+        with open(path, "r", encoding="utf8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        # The file might be read while it is being written
+        logger.warning(f"Could not read {path}: {e}")
+        return None
+
+
+class ResultsIndex:
+    """
+    Thread-safe index of the experiments in the given evaluation results
+    directory. The version is incremented whenever an experiment is added,
+    changed or removed.
+    """
+    def __init__(self, results_dir: str, index_file: Optional[str] = None):
+        self.results_dir = results_dir
+        self.index_file = index_file
+        self.version = 0
+        self.experiments: Dict[str, Dict[str, Any]] = {}
+        self._line_offsets: Dict[str, Tuple[Tuple[int, int], List[int]]] = {}
+        self._lock = threading.Lock()
+        if index_file and os.path.exists(index_file):
+            self._load_index_file()
+
+    def _load_index_file(self):
+        index = _read_json(self.index_file)
+        if not index or index.get("index_version") != INDEX_VERSION or index.get("results_dir") != self.results_dir:
+            return
+        self.experiments = index["experiments"]
+        for experiment in self.experiments.values():
+            experiment["results_stat"] = tuple(experiment["results_stat"])
+            if experiment["metadata_stat"] is not None:
+                experiment["metadata_stat"] = tuple(experiment["metadata_stat"])
+        logger.info(f"Loaded index with {len(self.experiments)} experiments from {self.index_file}")
+
+    def _write_index_file(self):
+        index = {"index_version": INDEX_VERSION, "results_dir": self.results_dir, "experiments": self.experiments}
+        tmp_filename = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(tmp_filename, "w", encoding="utf8") as file:
+            json.dump(index, file)
+        os.replace(tmp_filename, self.index_file)
+
+    def _scan_results_files(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Returns for each experiment ID the subdirectory and the path prefix of
+        the experiment files relative to the results directory.
+        """
+        experiment_files = {}
+        if not os.path.isdir(self.results_dir):
+            return experiment_files
+        for folder in sorted(os.listdir(self.results_dir)):
+            folder_path = os.path.join(self.results_dir, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            for filename in sorted(os.listdir(folder_path)):
+                if filename.endswith(RESULTS_EXTENSION):
+                    experiment_id = filename[:-len(RESULTS_EXTENSION)]
+                    experiment_files[experiment_id] = (folder, folder + "/" + experiment_id)
+        return experiment_files
+
+    def update(self) -> bool:
+        """
+        Updates the index. Returns True if the index changed.
+        """
+        experiment_files = self._scan_results_files()
+        updated_experiments = {}
+        changed = False
+        for experiment_id, (folder, path) in experiment_files.items():
+            results_path = os.path.join(self.results_dir, path + RESULTS_EXTENSION)
+            metadata_path = os.path.join(self.results_dir, path + METADATA_EXTENSION)
+            results_stat = _get_file_stat(results_path)
+            metadata_stat = _get_file_stat(metadata_path)
+            experiment = self.experiments.get(experiment_id)
+            if experiment is not None and experiment["path"] == path and \
+                    experiment["results_stat"] == results_stat and experiment["metadata_stat"] == metadata_stat:
+                updated_experiments[experiment_id] = experiment
+                continue
+            results = _read_json(results_path)
+            if results is None:
+                if experiment is not None:
+                    # Keep the previous results until the file can be read
+                    updated_experiments[experiment_id] = experiment
+                continue
+            updated_experiments[experiment_id] = {
+                "folder": folder,
+                "path": path,
+                "results": results,
+                "metadata": _read_json(metadata_path) if metadata_stat else None,
+                "results_stat": results_stat,
+                "metadata_stat": metadata_stat,
+            }
+            changed = True
+        if set(updated_experiments) != set(self.experiments):
+            changed = True
+
+        if changed:
+            with self._lock:
+                self.experiments = updated_experiments
+                self.version += 1
+            logger.info(f"Updated results index: {len(updated_experiments)} experiments.")
+            if self.index_file:
+                self._write_index_file()
+        return changed
+
+    def get_experiments(self) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """
+        Returns the index version and the ID, path, results and metadata of all experiments.
+        """
+        with self._lock:
+            experiments = self.experiments
+            version = self.version
+        return version, {experiment_id: {"path": experiment["path"],
+                                         "results": experiment["results"],
+                                         "metadata": experiment["metadata"]}
+                         for experiment_id, experiment in experiments.items()}
+
+    def get_experiment_file(self, experiment_id: str, extension: str) -> Optional[str]:
+        with self._lock:
+            experiment = self.experiments.get(experiment_id)
+        if experiment is None:
+            return None
+        return os.path.join(self.results_dir, experiment["path"] + extension)
+
+    def _get_line_offsets(self, path: str) -> Optional[List[int]]:
+        """
+        Returns the byte offsets of the lines in the given file plus the file
+        size. The offsets are recomputed if the file changed.
+        """
+        stat = _get_file_stat(path)
+        if stat is None:
+            return None
+        with self._lock:
+            cached = self._line_offsets.get(path)
+        if cached is not None and cached[0] == stat:
+            return cached[1]
+        offsets = []
+        with open(path, "rb") as file:
+            offset = 0
+            for line in file:
+                offsets.append(offset)
+                offset += len(line)
+            offsets.append(offset)
+        with self._lock:
+            self._line_offsets[path] = (stat, offsets)
+        return offsets
+
+    def read_lines(self, experiment_id: str, extension: str, start: int, n_lines: Optional[int] = None) \
+            -> Optional[Tuple[bytes, int]]:
+        """
+        Returns the lines of the articles with index start to start + n_lines
+        of the experiment file with the given extension and the total number
+        of articles in the file. Returns None if the file does not exist.
+        """
+        path = self.get_experiment_file(experiment_id, extension)
+        offsets = self._get_line_offsets(path) if path else None
+        if offsets is None:
+            return None
+        n_total = len(offsets) - 1
+        start = min(max(start, 0), n_total)
+        end = n_total if n_lines is None else min(start + max(n_lines, 0), n_total)
+        with open(path, "rb") as file:
+            file.seek(offsets[start])
+            data = file.read(offsets[end] - offsets[start])
+        return data, n_total
@@ -81,13 +81,32 @@ class EntityDatabaseReader:
         return mapping
 
     @staticmethod
-    def read_human_names() -> Iterator[Tuple[str, str]]:
-        filename = settings.QID_TO_HUMAN_NAME_FILE
+    def read_human_names(filename: Optional[str] = settings.QID_TO_HUMAN_NAME_FILE) -> Iterator[Tuple[str, str]]:
         logger.info("Yielding given name mapping from %s ..." % filename)
         for line in open(filename):
             entity_id, name = line.strip('\n').split('\t')
             yield entity_id, name
 
+    @staticmethod
+    def get_family_name_aliases(filename: Optional[str] = settings.QID_TO_HUMAN_NAME_FILE) -> Dict[str, Set[str]]:
+        family_name_aliases = {}
+        for entity_id, name in EntityDatabaseReader.read_human_names(filename):
+            if " " in name:
+                family_name = name.split()[-1]
+                if family_name in family_name_aliases:
+                    family_name_aliases[family_name].add(entity_id)
+                else:
+                    family_name_aliases[family_name] = {entity_id}
+        return family_name_aliases
+
+    @staticmethod
+    def get_entity_to_family_name(filename: Optional[str] = settings.QID_TO_HUMAN_NAME_FILE) -> Dict[str, str]:
+        entity_to_family_name = {}
+        for entity_id, name in EntityDatabaseReader.read_human_names(filename):
+            if " " in name:
+                entity_to_family_name[entity_id] = name.split()[-1]
+        return entity_to_family_name
+
     @staticmethod
     def get_coreference_types_mapping(mappings_file: str = settings.QID_TO_COREF_TYPES_FILE) -> Dict[str, List[str]]:
         logger.info("Loading coreference types from %s ..." % mappings_file)
@@ -100,8 +119,7 @@ class EntityDatabaseReader:
         return mapping
 
     @staticmethod
-    def get_unigram_counts() -> Dict[str, int]:
-        filename = settings.UNIGRAMS_FILE
+    def get_unigram_counts(filename: Optional[str] = settings.UNIGRAMS_FILE) -> Dict[str, int]:
         logger.info("Loading unigram counts from %s ..." % filename)
         counts = {}
         with open(filename) as f:
@@ -112,8 +130,7 @@ class EntityDatabaseReader:
         return counts
 
     @staticmethod
-    def get_demonyms() -> Dict[str, List[str]]:
-        filename = settings.QID_TO_DEMONYM_FILE
+    def get_demonyms(filename: Optional[str] = settings.QID_TO_DEMONYM_FILE) -> Dict[str, List[str]]:
         logger.info("Loading demonyms from %s ..." % filename)
         demonyms = {}
         with open(filename) as f:
@@ -141,16 +158,14 @@ class EntityDatabaseReader:
         return languages
 
     @staticmethod
-    def get_real_numbers() -> Set[str]:
-        filename = settings.QUANTITY_FILE
+    def get_real_numbers(filename: Optional[str] = settings.QUANTITY_FILE) -> Set[str]:
         logger.info("Loading real numbers from %s ..." % filename)
         real_numbers = EntityDatabaseReader.read_into_set(filename)
         logger.info("-> %d real numbers loaded." % len(real_numbers))
         return real_numbers
 
     @staticmethod
-    def get_points_in_time() -> Set[str]:
-        filename = settings.DATETIME_FILE
+    def get_points_in_time(filename: Optional[str] = settings.DATETIME_FILE) -> Set[str]:
         logger.info("Loading points in time from %s ..." % filename)
         points_in_time = EntityDatabaseReader.read_into_set(filename)
         logger.info("-> %d points in time loaded." % len(points_in_time))
@@ -241,6 +256,14 @@ class EntityDatabaseReader:
         logger.info(f"-> {len(wikipedia_to_wikidata_db)} Wikipedia-Wikidata mappings loaded.")
         return wikipedia_to_wikidata_db
 
+    @staticmethod
+    def get_wikidata_to_wikipedia_db() -> Database:
+        filename = settings.QID_TO_WIKIPEDIA_NAME_DB
+        logger.info(f"Loading Wikidata to Wikipedia database from {filename} ...")
+        wikidata_to_wikipedia_db = EntityDatabaseReader.read_from_dbm(filename)
+        logger.info(f"-> {len(wikidata_to_wikipedia_db)} Wikidata-Wikipedia mappings loaded.")
+        return wikidata_to_wikipedia_db
+
     @staticmethod
     def get_entity_name_db() -> Database:
         filename = settings.QID_TO_LABEL_DB
@@ -286,6 +309,69 @@ class EntityDatabaseReader:
         logger.info(f"-> {len(hyperlink_aliases_db)} hyperlink to most popular entity IDs mappings loaded.")
         return hyperlink_aliases_db
 
+    @staticmethod
+    def get_alias_to_top_candidates_db(filename: Optional[str] = settings.ALIAS_TO_TOP_CANDIDATES_DB) -> Database:
+        logger.info(f"Loading alias to top candidates database from {filename} ...")
+        top_candidates_db = EntityDatabaseReader.read_from_dbm(filename)
+        logger.info(f"-> {len(top_candidates_db)} alias to top candidates mappings loaded.")
+        return top_candidates_db
+
+    @staticmethod
+    def get_gender_db(filename: Optional[str] = settings.QID_TO_GENDER_DB) -> Database:
+        logger.info(f"Loading entity ID to gender database from {filename} ...")
+        gender_db = EntityDatabaseReader.read_from_dbm(filename, value_type=Gender)
+        logger.info(f"-> {len(gender_db)} entity ID to gender mappings loaded.")
+        return gender_db
+
+    @staticmethod
+    def get_coreference_types_db(filename: Optional[str] = settings.QID_TO_COREF_TYPES_DB) -> Database:
+        logger.info(f"Loading entity ID to coreference types database from {filename} ...")
+        coreference_types_db = EntityDatabaseReader.read_from_dbm(filename, value_type=list, separator=";")
+        logger.info(f"-> {len(coreference_types_db)} entity ID to coreference types mappings loaded.")
+        return coreference_types_db
+
+    @staticmethod
+    def get_family_name_aliases_db(filename: Optional[str] = settings.FAMILY_NAME_TO_QIDS_DB) -> Database:
+        logger.info(f"Loading family name to entity IDs database from {filename} ...")
+        family_name_db = EntityDatabaseReader.read_from_dbm(filename, value_type=set)
+        logger.info(f"-> {len(family_name_db)} family name to entity IDs mappings loaded.")
+        return family_name_db
+
+    @staticmethod
+    def get_entity_to_family_name_db(filename: Optional[str] = settings.QID_TO_FAMILY_NAME_DB) -> Database:
+        logger.info(f"Loading entity ID to family name database from {filename} ...")
+        family_name_db = EntityDatabaseReader.read_from_dbm(filename)
+        logger.info(f"-> {len(family_name_db)} entity ID to family name mappings loaded.")
+        return family_name_db
+
+    @staticmethod
+    def get_unigram_counts_db(filename: Optional[str] = settings.UNIGRAMS_DB) -> Database:
+        logger.info(f"Loading unigram counts database from {filename} ...")
+        unigrams_db = EntityDatabaseReader.read_from_dbm(filename, value_type=int)
+        logger.info(f"-> {len(unigrams_db)} unigram counts loaded.")
+        return unigrams_db
+
+    @staticmethod
+    def get_demonyms_db(filename: Optional[str] = settings.DEMONYM_TO_QIDS_DB) -> Database:
+        logger.info(f"Loading demonym to entity IDs database from {filename} ...")
+        demonyms_db = EntityDatabaseReader.read_from_dbm(filename, value_type=list)
+        logger.info(f"-> {len(demonyms_db)} demonym to entity IDs mappings loaded.")
+        return demonyms_db
+
+    @staticmethod
+    def get_real_numbers_db(filename: Optional[str] = settings.QUANTITY_DB) -> Database:
+        logger.info(f"Loading real numbers database from {filename} ...")
+        real_numbers_db = EntityDatabaseReader.read_from_dbm(filename)
+        logger.info(f"-> {len(real_numbers_db)} real numbers loaded.")
+        return real_numbers_db
+
+    @staticmethod
+    def get_points_in_time_db(filename: Optional[str] = settings.DATETIME_DB) -> Database:
+        logger.info(f"Loading points in time database from {filename} ...")
+        points_in_time_db = EntityDatabaseReader.read_from_dbm(filename)
+        logger.info(f"-> {len(points_in_time_db)} points in time loaded.")
+        return points_in_time_db
+
     @staticmethod
     def get_name_to_entities_db() -> Database:
         filename = settings.LABEL_TO_QIDS_DB
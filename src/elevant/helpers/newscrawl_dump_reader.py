@@ -1,8 +1,8 @@
 from typing import Iterator, Optional
-import json
 
 from elevant.helpers.wikipedia_dump_reader import WikipediaDumpReader
 from elevant.models.article import Article
+from elevant.utils import json_serialization
 
 
 class NewscrawlDumpReader(WikipediaDumpReader):
@@ -22,7 +22,7 @@ class NewscrawlDumpReader(WikipediaDumpReader):
         :param json_dump: JSON string representing the extracted article
         :return: the article as WikipediaArticle object
         """
-        article_data = json.loads(json_dump)
+        article_data = json_serialization.loads(json_dump)
         article_id = article_data["id"].replace(".", "")
         title = article_data["date"] + " - " + article_data["text"].split("\n\n")[0]
         title = title.replace("\n", "")  # A title may not contain newlines (important for evaluation in txt format)
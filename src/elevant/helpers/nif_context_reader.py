@@ -0,0 +1,285 @@
+import logging
+import re
+
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from pynif import NIFContext
+from pynif.phrase import NIFPhrase
+from pynif.prefixes import NIF, RDF
+from rdflib import Dataset, Graph, URIRef
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+
+# Tokens that can contain a statement-terminating "." in Turtle and the statement terminator itself
+_TURTLE_TOKEN_REGEX = re.compile(r'"""|\'\'\'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^>\s]*>|#[^\n]*|\.(?=\s|$)')
+_LONG_STRING_END_REGEXES = {
+    '"""': re.compile(r'(?:[^"\\]|\\.|"(?!""))*"""'),
+    "'''": re.compile(r"(?:[^'\\]|\\.|'(?!''))*'''"),
+}
+_SPARQL_DIRECTIVE_REGEX = re.compile(r"\s*(PREFIX|BASE)\s", re.IGNORECASE)
+# Prefix of the names of the graphs that contain a single statement when locating the statements of contexts
+_STATEMENT_GRAPH_PREFIX = "urn:elevant:statement:"
+
+
+def _decode_line(line: bytes) -> str:
+    # Open files in text mode would translate Windows line breaks as well
+    return line.decode("utf8").replace("\r\n", "\n")
+
+
+class NifContextReader:
+    """
+    Reads the NIF contexts and their phrases from a NIF file in Turtle
+    format without loading the entire file into a single RDF graph.
+
+    The file is read in two passes. The first pass reads the file line by
+    line and splits it into Turtle statements. Batches of statements are
+    parsed into small RDF graphs together with the prefix and base directives
+    seen so far, to find out which statements describe which context or its
+    phrases. Only the URI of each context and the byte ranges of its
+    statements in the file are kept. The second pass reads and parses the
+    statements of one context at a time, so only a single context with its
+    phrases is held in memory.
+
+    As with NIFCollection.loads(), if the file contains a context collection,
+    only the contexts of the first collection are returned. Otherwise,
+    all contexts are returned.
+    """
+    def __init__(self, batch_size: Optional[int] = 1000):
+        self.batch_size = batch_size
+        # Directives with the byte offset of their start for each file
+        self._directives: Dict[str, List[Tuple[int, str]]] = {}
+
+    @staticmethod
+    def iterate_statements(filepath: str) -> Iterator[str]:
+        """
+        Yields the Turtle statements in the given file including the
+        terminating "." (except for SPARQL style directives that have none).
+        """
+        for statement, _, _ in NifContextReader.iterate_statements_with_offsets(filepath):
+            yield statement
+
+    @staticmethod
+    def iterate_statements_with_offsets(filepath: str) -> Iterator[Tuple[str, int, int]]:
+        """
+        Yields the Turtle statements in the given file like iterate_statements()
+        together with the byte offsets of the start and the end of each
+        statement in the file. Whitespace and comments before a statement
+        belong to the statement.
+        """
+        with open(filepath, "rb") as file:
+            statement = []
+            statement_start = 0
+            long_string_end = None
+            line_offset = 0
+            for raw_line in file:
+                line = _decode_line(raw_line)
+                next_line_offset = line_offset + len(raw_line)
+                position = 0
+                if long_string_end is None and not "".join(statement).strip() \
+                        and _SPARQL_DIRECTIVE_REGEX.match(line):
+                    yield line.strip(), statement_start, next_line_offset
+                    statement = []
+                    statement_start = line_offset = next_line_offset
+                    continue
+                while position < len(line):
+                    if long_string_end is not None:
+                        match = long_string_end.match(line, position)
+                        if not match:
+                            # The long string continues in the next line
+                            position = len(line)
+                            break
+                        long_string_end = None
+                        position = match.end()
+                        continue
+                    match = _TURTLE_TOKEN_REGEX.search(line, position)
+                    if not match:
+                        position = len(line)
+                        break
+                    token = match.group()
+                    if token in _LONG_STRING_END_REGEXES:
+                        long_string_end = _LONG_STRING_END_REGEXES[token]
+                    elif token == ".":
+                        statement.append(line[:match.end()])
+                        line_offset += len(line[:match.end()].encode("utf8"))
+                        line = line[match.end():]
+                        position = 0
+                        yield "".join(statement).strip(), statement_start, line_offset
+                        statement = []
+                        statement_start = line_offset
+                        continue
+                    position = match.end()
+                statement.append(line)
+                line_offset = next_line_offset
+            # Only comments can follow the last statement
+            remainder = "".join(statement).split("\n")
+            if any(line.strip() and not line.strip().startswith("#") for line in remainder):
+                logger.warning(f"Incomplete last statement in {filepath} is ignored.")
+
+    @staticmethod
+    def _is_directive(statement: str) -> bool:
+        return statement.startswith("@") or bool(_SPARQL_DIRECTIVE_REGEX.match(statement))
+
+    @staticmethod
+    def _merge(target, source):
+        """
+        Merge the attributes of a partially loaded context or phrase into the
+        attributes of a previously loaded context or phrase with the same URI.
+        """
+        for attribute, value in vars(source).items():
+            if isinstance(value, list) and isinstance(getattr(target, attribute), list):
+                getattr(target, attribute).extend(value)
+            elif value is not None and getattr(target, attribute) is None:
+                setattr(target, attribute, value)
+
+    def get_context_locations(self, filepath: str, sort_by_uri: Optional[bool] = True) \
+            -> List[Tuple[str, List[Tuple[int, int]]]]:
+        """
+        Returns the URI of each NIF context in the given file together with
+        the byte ranges of the statements that describe the context and its
+        phrases. The contexts are sorted by URI or, if sort_by_uri is False,
+        by the position of their first statement in the file.
+        """
+        directives = []
+        directive_offsets = []
+        # Byte ranges of the statements of each context and its phrases by context URI
+        context_ranges: Dict[str, List[List[int]]] = {}
+        context_uris: Set[str] = set()
+        # Context URI of each phrase and byte ranges of statements whose subject is not known to be a context or
+        # phrase yet, by subject URI
+        phrase_contexts: Dict[str, str] = {}
+        pending_ranges: Dict[str, List[List[int]]] = {}
+        collection_uri = None
+        collection_contexts: Set[str] = set()
+
+        def add_range(context_uri: str, start: int, end: int):
+            ranges = context_ranges.setdefault(context_uri, [])
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+
+        def parse_batch(batch: List[Tuple[str, int, int]]):
+            nonlocal collection_uri
+            # Each statement is parsed into its own named graph to know which statement a triple comes from
+            data = [f"<{_STATEMENT_GRAPH_PREFIX}{i}> {{\n{statement}\n}}" for i, (statement, _, _) in enumerate(batch)]
+            dataset = Dataset(default_union=True)
+            dataset.parse(data="\n".join(directives + data), format="trig")
+            if collection_uri is None:
+                for subject in dataset.subjects(RDF.type, NIF.ContextCollection):
+                    collection_uri = subject
+                    break
+            if collection_uri is not None:
+                for context_uri in dataset.objects(collection_uri, NIF.hasContext):
+                    collection_contexts.add(context_uri.toPython())
+            new_uris = []
+            for subject in set(dataset.subjects(RDF.type, NIF.Context)) | set(dataset.subjects(NIF.isString, None)):
+                context_uri = subject.toPython()
+                if context_uri not in context_uris:
+                    context_uris.add(context_uri)
+                    new_uris.append(context_uri)
+            for subject, context_uri in dataset.subject_objects(NIF.referenceContext):
+                phrase_uri = subject.toPython()
+                if phrase_uri not in context_uris and phrase_uri not in phrase_contexts:
+                    phrase_contexts[phrase_uri] = context_uri.toPython()
+                    new_uris.append(phrase_uri)
+            for uri in new_uris:
+                for start, end in pending_ranges.pop(uri, []):
+                    add_range(uri if uri in context_uris else phrase_contexts[uri], start, end)
+            for i, (_, start, end) in enumerate(batch):
+                owners = set()
+                for subject in set(dataset.graph(URIRef(f"{_STATEMENT_GRAPH_PREFIX}{i}")).subjects()):
+                    uri = subject.toPython()
+                    if uri in context_uris:
+                        owners.add(uri)
+                    elif uri in phrase_contexts:
+                        owners.add(phrase_contexts[uri])
+                    elif isinstance(subject, URIRef):
+                        pending_ranges.setdefault(uri, []).append([start, end])
+                for owner in owners:
+                    add_range(owner, start, end)
+
+        batch = []
+        for statement, start, end in self.iterate_statements_with_offsets(filepath):
+            if self._is_directive(statement):
+                directives.append(statement)
+                directive_offsets.append((start, statement))
+                continue
+            batch.append((statement, start, end))
+            if len(batch) >= self.batch_size:
+                parse_batch(batch)
+                batch = []
+        if batch:
+            parse_batch(batch)
+        self._directives[filepath] = directive_offsets
+
+        locations = []
+        for context_uri, ranges in context_ranges.items():
+            if context_uri not in context_uris or (collection_uri is not None
+                                                   and context_uri not in collection_contexts):
+                continue
+            # Ranges of statements whose subject was known only later are not in file order
+            merged_ranges = []
+            for start, end in sorted(ranges):
+                if merged_ranges and merged_ranges[-1][1] == start:
+                    merged_ranges[-1] = (merged_ranges[-1][0], end)
+                else:
+                    merged_ranges.append((start, end))
+            locations.append((context_uri, merged_ranges))
+        if sort_by_uri:
+            locations.sort(key=lambda location: location[0])
+        else:
+            locations.sort(key=lambda location: location[1][0][0])
+        return locations
+
+    def _get_directives(self, filepath: str) -> List[Tuple[int, str]]:
+        if filepath not in self._directives:
+            self._directives[filepath] = [(start, statement) for statement, start, _
+                                          in self.iterate_statements_with_offsets(filepath)
+                                          if self._is_directive(statement)]
+        return self._directives[filepath]
+
+    def read_context(self, filepath: str, context_uri: str, ranges: List[Tuple[int, int]]) -> NIFContext:
+        """
+        Reads the NIF context with the given URI and its phrases from the
+        given byte ranges of the file as returned by get_context_locations().
+        """
+        directives = self._get_directives(filepath)
+        contexts: Dict[str, NIFContext] = {}
+        phrases: Dict[str, NIFPhrase] = {}
+        with open(filepath, "rb") as file:
+            for start, end in ranges:
+                file.seek(start)
+                data = _decode_line(file.read(end - start))
+                graph = Graph(bind_namespaces="none")
+                graph.parse(data="\n".join([directive for offset, directive in directives if offset < start] + [data]),
+                            format="turtle")
+                graph_context_uris = set(graph.subjects(RDF.type, NIF.Context)) | \
+                    set(graph.subjects(NIF.isString, None))
+                for uri in graph_context_uris:
+                    context = NIFContext.load_from_graph(graph, uri)
+                    # Phrases are added after all ranges are read, since they can be in a different range
+                    context.phrases = []
+                    if context.original_uri in contexts:
+                        self._merge(contexts[context.original_uri], context)
+                    else:
+                        contexts[context.original_uri] = context
+                for uri in set(graph.subjects()) - graph_context_uris:
+                    phrase = NIFPhrase.load_from_graph(graph, uri)
+                    if phrase.original_uri in phrases:
+                        self._merge(phrases[phrase.original_uri], phrase)
+                    else:
+                        phrases[phrase.original_uri] = phrase
+        context = contexts[context_uri]
+        context.phrases = [phrase for phrase in phrases.values() if phrase.context == context_uri]
+        return context
+
+    def iterate_contexts(self, filepath: str, sort_by_uri: Optional[bool] = True) -> Iterator[NIFContext]:
+        """
+        Yields the NIF contexts with their phrases from the given file.
+        NIF contexts have no defined order, so by default they are yielded
+        sorted by URI to make results reproducible. Otherwise, they are
+        yielded in the order in which they appear in the file.
+        """
+        for context_uri, ranges in self.get_context_locations(filepath, sort_by_uri):
+            yield self.read_context(filepath, context_uri, ranges)
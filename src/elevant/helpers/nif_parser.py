@@ -1,36 +1,37 @@
 import os
 import logging
 
-from typing import Iterator, List, Optional
+from typing import Iterable, Iterator, List, Optional
 
-from pynif import NIFCollection
+from pynif import NIFCollection, NIFContext
 from urllib.parse import quote, unquote
 
 from elevant.evaluation.groundtruth_label import GroundtruthLabel
+from elevant.helpers.nif_context_reader import NifContextReader
 from elevant.models.entity_mention import EntityMention
 from elevant.models.article import Article
 from elevant.utils.knowledge_base_mapper import KnowledgeBaseMapper
+from elevant.utils.nested_groundtruth_handler import NestedGroundtruthHandler
 
 logger = logging.getLogger("main." + __name__.split(".")[-1])
 
 
 class NIFParser:
-    @staticmethod
-    def has_children(curr_label_idx: int, gt_labels: List[GroundtruthLabel]):
-        child_indices = []
-        curr_span = gt_labels[curr_label_idx].span
-        for i, gt_label in enumerate(gt_labels):
-            if gt_label.span[0] >= curr_span[0] and gt_label.span[1] <= curr_span[1] and curr_label_idx != i:
-                child_indices.append(i)
-        return child_indices
-
     def get_articles_from_nif_content(self, nif_content: str, groundtruth: bool) -> Iterator[Article]:
         """
         Create a WikipediaArticle from the given file in NIF format.
         """
         nif_doc = NIFCollection.loads(nif_content)
+        for article in self.get_articles_from_contexts(nif_doc.contexts, groundtruth):
+            yield article
+
+    @staticmethod
+    def get_articles_from_contexts(contexts: Iterable[NIFContext], groundtruth: bool) -> Iterator[Article]:
+        """
+        Create a WikipediaArticle for each of the given NIF contexts.
+        """
         article_id_counter = 0
-        for context in nif_doc.contexts:
+        for context in contexts:
             label_id_counter = 0
             text = context.mention
             title = unquote(context.uri[context.uri.find("/"):])
@@ -47,12 +48,7 @@ class NIFParser:
                     entity_mentions.append(EntityMention(span, "NIF_READER", entity_id))
 
             # Assign parent and child ids to groundtruth labels
-            for i, gt_label in enumerate(labels):
-                child_indices = self.has_children(i, labels)
-                for child_idx in child_indices:
-                    child_gt_label = labels[child_idx]
-                    child_gt_label.parent = gt_label.id
-                    gt_label.children.append(child_gt_label.id)
+            NestedGroundtruthHandler.assign_parent_and_child_ids(labels)
 
             article = Article(id=article_id_counter, title=title, text=text, hyperlinks=[], labels=labels,
                               entity_mentions=entity_mentions)
@@ -60,11 +56,9 @@ class NIFParser:
             yield article
 
     def get_articles_from_file(self, filename: str, groundtruth: bool) -> Iterator[Article]:
-        with open(filename, "r", encoding="utf8") as file:
-            file_content = file.readlines()
-            file_content = "".join(file_content)
-            for article in self.get_articles_from_nif_content(file_content, groundtruth):
-                yield article
+        contexts = NifContextReader().iterate_contexts(filename, sort_by_uri=False)
+        for article in self.get_articles_from_contexts(contexts, groundtruth):
+            yield article
 
     def article_iterator(self, nif_path: str, groundtruth: Optional[bool] = False) -> Iterator[Article]:
         """
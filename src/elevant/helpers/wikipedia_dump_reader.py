@@ -2,12 +2,12 @@ import logging
 from typing import Iterator, Dict, Tuple, List, Optional
 
 import os
-import json
 import re
 from urllib.parse import unquote
 
 from elevant.models.article import Article, ABSTRACT_INDICATOR
 from elevant import settings
+from elevant.utils import json_serialization
 
 logger = logging.getLogger("main." + __name__.split(".")[-1])
 
@@ -187,7 +187,7 @@ class WikipediaDumpReader:
         :param json_dump: JSON string representing the extracted article
         :return: the article as WikipediaArticle object
         """
-        article_data = json.loads(json_dump)
+        article_data = json_serialization.loads(json_dump)
         article_data: Dict
         text, hyperlinks, title_synonyms, sections = WikipediaDumpReader._process_extractor_text(article_data["text"])
         article = Article(id=article_data["id"],
@@ -7,6 +7,7 @@ from spacy.tokens import Doc
 from elevant.models.entity_mention import EntityMention
 from elevant.models.entity_prediction import EntityPrediction
 from elevant.models.article import Article
+from elevant.utils import linking_profiler
 
 logger = logging.getLogger("main." + __name__.split(".")[-1])
 
@@ -43,10 +44,12 @@ class AbstractEntityLinker(abc.ABC):
                       doc: Optional[Doc] = None,
                       uppercase: Optional[bool] = False,
                       globally: Optional[bool] = False):
-        if globally:
-            entity_predictions = self.predict_globally(article.text, doc=doc, uppercase=uppercase,
-                                                       linked_entities=article.entity_mentions)
-        else:
-            entity_predictions = self.predict(article.text, doc=doc, uppercase=uppercase)
-
-        article.link_entities(entity_predictions, self.ner_identifier, self.linker_identifier)
+        with linking_profiler.stage("prediction"):
+            if globally:
+                entity_predictions = self.predict_globally(article.text, doc=doc, uppercase=uppercase,
+                                                           linked_entities=article.entity_mentions)
+            else:
+                entity_predictions = self.predict(article.text, doc=doc, uppercase=uppercase)
+
+        with linking_profiler.stage("adding_mentions"):
+            article.link_entities(entity_predictions, self.ner_identifier, self.linker_identifier)
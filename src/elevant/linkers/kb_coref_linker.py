@@ -9,7 +9,6 @@ from collections import defaultdict
 import elevant.utils.custom_sentencizer  # import is needed so Python finds the custom component
 from elevant.linkers.abstract_coref_linker import AbstractCorefLinker
 from elevant.models.coref_cluster import CorefCluster
-from elevant.utils.dependency_conll_extractor import DependencyConllExtractor
 from elevant.models.dependency_graph import EnhancedDependencyGraph
 from elevant.models.entity_database import EntityDatabase
 from elevant.models.gender import Gender
@@ -215,6 +214,8 @@ class KBCorefLinker(AbstractCorefLinker):
         direct_speeches = get_direct_speeches(article, doc)
         paragraphs = get_paragraphs(article)
         self.type_aliases = dict()
+        # Dependency graphs of the sentences in the doc by sentence start token index
+        sentence_graphs = dict()
 
         for sent in doc.sents:
 
@@ -267,8 +268,9 @@ class KBCorefLinker(AbstractCorefLinker):
                     problematic_pronoun = False
                     if p_text == "it":
                         sent = OffsetConverter.get_sentence(span[0], doc)
-                        conll_string = DependencyConllExtractor.to_conll_7(sent)
-                        dep_graph = EnhancedDependencyGraph(conll_string)
+                        if sent.start not in sentence_graphs:
+                            sentence_graphs[sent.start] = EnhancedDependencyGraph.from_spacy_sentence(sent)
+                        dep_graph = sentence_graphs[sent.start]
                         it_idx = OffsetConverter.get_token_idx_in_sent(span[0], doc) + 1
                         if dep_graph.is_problematic_it(it_idx):
                             problematic_pronoun = True
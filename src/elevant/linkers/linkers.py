@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional, Tuple
 
 
 class Linkers(Enum):
@@ -36,3 +37,15 @@ class PredictionFormats(Enum):
     WIKIFIER = "wikifier"
     EPGEL = "epgel"
     WEXEA = "wexea"
+
+
+def parse_linker_spec(linker_spec: str) -> Tuple[str, str, Optional[str]]:
+    """
+    Returns experiment name, linker name and linker config path for a linker
+    specified as [<experiment_name>=]<linker_name>[:<linker_config>].
+    """
+    experiment_name, _, linker = linker_spec.rpartition("=")
+    linker_name, _, linker_config = linker.partition(":")
+    if not experiment_name:
+        experiment_name = linker_name
+    return experiment_name, linker_name, linker_config if linker_config else None
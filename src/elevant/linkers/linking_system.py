@@ -5,6 +5,7 @@ from typing import Optional, Tuple, Dict, Set, Any
 from elevant.linkers.linkers import Linkers, CoreferenceLinkers, PredictionFormats, APILinkers
 from elevant.models.article import Article
 from elevant.models.entity_database import EntityDatabase, MappingName
+from elevant.utils import linking_profiler, mapping_registry
 from elevant import settings
 
 import logging
@@ -23,7 +24,10 @@ class LinkingSystem:
                  min_score: Optional[int] = 0,
                  type_mapping_file: Optional[str] = settings.QID_TO_WHITELIST_TYPES_DB,
                  custom_kb: Optional[bool] = False,
-                 api_url: Optional[str] = None):
+                 api_url: Optional[str] = None,
+                 lazy_predictions: Optional[bool] = False,
+                 entity_db: Optional[EntityDatabase] = None,
+                 lazy_mappings: Optional[bool] = False):
         self.linker = None
         self.prediction_reader = None
         self.prediction_name = prediction_name
@@ -34,28 +38,51 @@ class LinkingSystem:
         self.type_mapping_file = type_mapping_file  # Only needed for pure prior linker
         self.linker_config = self.read_linker_config(linker_name, config_path) if linker_name else {}
         self.custom_kb = custom_kb
+        self.lazy_predictions = lazy_predictions
 
         if (custom_kb and prediction_format and
                 prediction_format not in {PredictionFormats.NIF.value, PredictionFormats.SIMPLE_JSONL.value}):
             logger.warning(f"Using a custom knowledge base is not supported for linking result format "
                            f"{prediction_format}. Please choose a different format.")
 
-        self._initialize_entity_db(linker_name, coref_linker, min_score)
-        self._initialize_linker(linker_name, prediction_file, prediction_format, api_url)
-        self._initialize_coref_linker(coref_linker)
+        # Mappings are attributed to the component that loads them in the mapping registry
+        with mapping_registry.component("linking_system"):
+            self._initialize_entity_db(linker_name, coref_linker, min_score, entity_db, lazy_mappings)
+        with mapping_registry.component(f"linker {linker_name or prediction_format or APILinkers.NIF_API.value}"):
+            self._initialize_linker(linker_name, prediction_file, prediction_format, api_url)
+        with mapping_registry.component(f"coref_linker {coref_linker}"):
+            self._initialize_coref_linker(coref_linker)
+        mapping_registry.log_report()
 
-    def _initialize_entity_db(self, linker_name: str, coref_linker: str, min_score: int):
+    @staticmethod
+    def uses_entity_set(linker_name: Optional[str], coref_linker: Optional[str]) -> bool:
+        """
+        Returns True if the given linkers need the set of all entities in
+        Wikipedia together with their types and names in the entity database.
+        """
         # Linkers for which to load entities into the entity database, including their types and names.
         # The Wikipedia2Wikidata mapping that might be loaded in _initialize_linker()
         # remains unaffected by this.
         db_linkers = (Linkers.BASELINE.value, Linkers.POPULAR_ENTITIES.value, Linkers.POS_PRIOR.value)
         db_coref_linkers = (CoreferenceLinkers.KB_COREF.value,)
+        # When a prediction_file is given linker_name is None
+        return coref_linker in db_coref_linkers or linker_name in db_linkers
 
-        self.entity_db = EntityDatabase()
+    def _initialize_entity_db(self,
+                              linker_name: str,
+                              coref_linker: str,
+                              min_score: int,
+                              entity_db: Optional[EntityDatabase] = None,
+                              lazy_mappings: Optional[bool] = False):
+        # An entity database can be shared between linking systems. Mappings that are already loaded
+        # into the shared entity database are not loaded again.
+        # With lazy mappings, mappings are only loaded when they are accessed for the first time.
+        self.entity_db = entity_db if entity_db is not None else EntityDatabase(lazy=lazy_mappings)
 
-        # When a prediction_file is given linker_name is None
-        if coref_linker in db_coref_linkers or linker_name in db_linkers:
-            self.entity_db.load_all_entities_in_wikipedia(minimum_sitelink_count=min_score)
+        if self.uses_entity_set(linker_name, coref_linker):
+            loaded_entities = self.entity_db.loaded_info.get(MappingName.ENTITIES)
+            if loaded_entities is None or loaded_entities.info != min_score:
+                self.entity_db.load_all_entities_in_wikipedia(minimum_sitelink_count=min_score)
             self.entity_db.load_entity_types(self.type_mapping_file)
             self.entity_db.load_entity_names()
 
@@ -134,12 +161,18 @@ class LinkingSystem:
             self.linker = BaselineLinker(self.entity_db, self.linker_config)
         elif linker_type == Linkers.POPULAR_ENTITIES.value:
             from elevant.linkers.popular_entities_linker import PopularEntitiesLinker
-            self.load_missing_mappings({MappingName.FAMILY_NAME_ALIASES,
-                                        MappingName.WIKIDATA_ALIASES,
-                                        MappingName.LANGUAGES,
-                                        MappingName.DEMONYMS,
-                                        MappingName.SITELINKS,
-                                        MappingName.NAME_TO_ENTITY_ID})
+            mappings = {MappingName.LANGUAGES,
+                        MappingName.DEMONYMS,
+                        MappingName.SITELINKS,
+                        MappingName.NAME_TO_ENTITY_ID}
+            if os.path.exists(settings.ALIAS_TO_TOP_CANDIDATES_DB):
+                # The top candidates database contains the candidates from the Wikidata and family name aliases
+                mappings.add(MappingName.ALIAS_TO_TOP_CANDIDATES)
+            else:
+                logger.info(f"{settings.ALIAS_TO_TOP_CANDIDATES_DB} does not exist. Candidates are ranked "
+                            f"during linking. Run `make generate-top-candidates-index` to create it.")
+                mappings.update({MappingName.FAMILY_NAME_ALIASES, MappingName.WIKIDATA_ALIASES})
+            self.load_missing_mappings(mappings)
             self.linker = PopularEntitiesLinker(self.entity_db, self.linker_config)
             self.globally = True
         elif linker_type == PredictionFormats.WIKIFIER.value:
@@ -161,7 +194,8 @@ class LinkingSystem:
             if not self.custom_kb:
                 self.load_missing_mappings({MappingName.WIKIPEDIA_WIKIDATA,
                                             MappingName.REDIRECTS})
-            self.prediction_reader = NifPredictionReader(prediction_file, self.entity_db, self.custom_kb)
+            self.prediction_reader = NifPredictionReader(prediction_file, self.entity_db, self.custom_kb,
+                                                         lazy=self.lazy_predictions)
         elif linker_type == PredictionFormats.EPGEL.value:
             from elevant.prediction_readers.epgel_prediction_reader import EPGELPredictionReader
             self.prediction_reader = EPGELPredictionReader(prediction_file)
@@ -254,24 +288,27 @@ class LinkingSystem:
             # This takes a lot of time, so if several components of the linking_system rely on the processed
             # document, only do this once. However, be aware the models of the different components might
             # differ slightly or have different pipeline components.
-            doc = self.linker.model(article.text)
+            with linking_profiler.stage("spacy_parse"):
+                doc = self.linker.model(article.text)
         else:
             doc = None
 
-        if self.linker:
-            self.linker.link_entities(article, doc, uppercase=uppercase, globally=self.globally)
-        elif self.prediction_reader:
-            self.prediction_reader.link_entities(article, uppercase=uppercase)
+        with linking_profiler.stage("entity_linking"):
+            if self.linker:
+                self.linker.link_entities(article, doc, uppercase=uppercase, globally=self.globally)
+            elif self.prediction_reader:
+                self.prediction_reader.link_entities(article, uppercase=uppercase)
 
-        if self.coref_linker:
-            coref_eval_span = evaluation_span if evaluation_span else None
-            self.coref_linker.link_entities(article,
-                                            doc,
-                                            only_pronouns=only_pronouns,
-                                            evaluation_span=coref_eval_span)
-        elif self.coref_prediction_iterator:
-            predicted_coref_entities = next(self.coref_prediction_iterator)
-            article.link_entities(predicted_coref_entities, "PREDICTION_READER_COREF", "PREDICTION_READER_COREF")
+        with linking_profiler.stage("coreference_linking"):
+            if self.coref_linker:
+                coref_eval_span = evaluation_span if evaluation_span else None
+                self.coref_linker.link_entities(article,
+                                                doc,
+                                                only_pronouns=only_pronouns,
+                                                evaluation_span=coref_eval_span)
+            elif self.coref_prediction_iterator:
+                predicted_coref_entities = next(self.coref_prediction_iterator)
+                article.link_entities(predicted_coref_entities, "PREDICTION_READER_COREF", "PREDICTION_READER_COREF")
 
     def load_missing_mappings(self, mappings: Set[MappingName]):
         if MappingName.WIKIPEDIA_WIKIDATA in mappings and not self.entity_db.is_wikipedia_to_wikidata_mapping_loaded():
@@ -309,6 +346,8 @@ class LinkingSystem:
             self.entity_db.load_wikipedia_id2wikipedia_title()
         if MappingName.NAME_TO_ENTITY_ID in mappings and not self.entity_db.loaded_info.get(MappingName.NAME_TO_ENTITY_ID):
             self.entity_db.load_name_to_entities()
+        if MappingName.ALIAS_TO_TOP_CANDIDATES in mappings and not self.entity_db.has_alias_to_top_candidates_loaded():
+            self.entity_db.load_alias_to_top_candidates()
 
         if MappingName.GENDER in mappings and not self.entity_db.is_gender_loaded():
             self.entity_db.load_gender()
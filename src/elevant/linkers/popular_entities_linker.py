@@ -1,7 +1,8 @@
-from typing import Dict, Tuple, List, Optional, Set, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple, List, Optional, Set, Any, FrozenSet
 
 import logging
-import pygtrie
 import spacy
 from spacy.tokens import Doc
 
@@ -11,11 +12,13 @@ from elevant.models.entity_mention import EntityMention
 from elevant.models.entity_prediction import EntityPrediction
 from elevant.ner.maximum_matching_ner import MaximumMatchingNER
 from elevant.settings import NER_IGNORE_TAGS
-from elevant.models.entity_database import EntityDatabase
+from elevant.models.entity_database import EntityDatabase, TopCandidate
+from elevant.utils import linking_profiler
 from elevant.utils.dates import is_date
 from elevant import settings
 from elevant.utils.knowledge_base_mapper import KnowledgeBaseMapper, UnknownEntity
 from elevant.utils.offset_converter import OffsetConverter
+from elevant.utils.word_trie import WordTrie
 import elevant.ner.ner_postprocessing  # import is needed so Python finds the custom factory
 import elevant.utils.custom_sentencizer  # import is needed so Python finds the custom component
 
@@ -44,17 +47,24 @@ class PopularEntitiesLinker(AbstractEntityLinker):
         self.min_score = config["min_score"] if "min_score" in config else 15
         self.longest_alias_ner = config["longest_alias_ner"] if "longest_alias_ner" in config else False
         self.ner_identifier = "LongestAliasNER" if self.longest_alias_ner else "EnhancedSpacy"
+        # Maximum number of mentions in the prediction cache that persists across articles. 0 disables the cache.
+        self.global_prediction_cache_size = config["global_prediction_cache_size"] \
+            if "global_prediction_cache_size" in config else 0
 
         if self.longest_alias_ner:
             self.ner = MaximumMatchingNER(self.entity_db)
 
+        # With the precomputed alias to top candidates database, the candidates of a mention
+        # and the selected entity are retrieved with a single lookup.
+        self.use_top_candidates = self.entity_db.has_alias_to_top_candidates_loaded()
+
         self.model = spacy.load(settings.LARGE_MODEL_NAME, disable=["lemmatizer"])
         self.model.add_pipe("custom_sentencizer", before="parser")
         self.model.add_pipe("ner_postprocessor", after="ner")
 
         # Create a prefix trie to speed up lowercase entity detection
         logger.info("Building prefix trie for detection of lowercase entities...")
-        self.trie = pygtrie.StringTrie(separator=" ")
+        self.trie = WordTrie()
         for i, (entity_name, qids) in enumerate(entity_db.name_to_entities_db.items()):
             if entity_name.islower():
                 if len(qids) == 1:
@@ -68,6 +78,15 @@ class PopularEntitiesLinker(AbstractEntityLinker):
                     self.trie[entity_name] = max_entity[0]
         logger.info(f"Built prefix trie with {len(self.trie)} non-named entities.")
 
+        # Maps (snippet, is_language, is_person) to the predicted entity ID and candidates in least
+        # recently used order. Unlike the prediction cache in predict_globally() it persists across articles.
+        self.global_prediction_cache = OrderedDict()
+        self.global_prediction_cache: Dict[Tuple[str, bool, bool], Tuple[str, FrozenSet[str]]]
+        self.global_prediction_cache_lookups = 0
+        self.global_prediction_cache_hits = 0
+        # Guards the LRU order against concurrent predictions, e.g. in the threaded API server
+        self.global_prediction_cache_lock = threading.Lock()
+
     def entity_spans(self, text: str, doc: Optional[Doc]) -> List[Tuple[Tuple[int, int], bool, bool]]:
         """
         Retrieve entity spans from the given text, i.e. perform entity recognition step.
@@ -121,6 +140,7 @@ class PopularEntitiesLinker(AbstractEntityLinker):
                 entity_id, candidates, is_language_cache, is_person_cache = prediction_cache[snippet]
                 if is_language_cache == is_language and is_person_cache == is_person:
                     predictions[span] = EntityPrediction(span, entity_id, candidates)
+                    linking_profiler.count("prediction_cache_hits")
                     continue
 
             if snippet.islower():
@@ -133,27 +153,10 @@ class PopularEntitiesLinker(AbstractEntityLinker):
                 # Don't link parts of a person entity that was linked to unknown before
                 continue
 
-            candidates = set()
-            name_and_demonym_candidates = set()
-            if is_language and self.entity_db.is_language(snippet):
-                # If NER component determined mention is a language, link to language if it
-                # exists in the database
-                entity_id = self.entity_db.get_entity_for_language(snippet)
+            if self.global_prediction_cache_size > 0:
+                entity_id, candidates = self.predict_mention_cached(snippet, is_language, is_person)
             else:
-                if self.entity_db.contains_entity_name(snippet):
-                    # Prefer entities where the name matches the mention instead of some alias
-                    name_and_demonym_candidates = self.entity_db.get_entities_by_name(snippet)
-                if self.entity_db.is_demonym(snippet):
-                    # If mention is a demonym, add corresponding entity to candidates
-                    # Countries are preferred automatically, since they generally have
-                    # a higher sitelink count than languages or ethnicities
-                    demonym_entities = self.entity_db.get_entities_for_demonym(snippet)
-                    name_and_demonym_candidates.update(demonym_entities)
-                candidates = self.entity_db.get_candidates(snippet)
-                entity_id = self.select_entity(name_and_demonym_candidates, candidates)
-            if entity_id is None:
-                entity_id = UnknownEntity.NIL.value
-            candidates.update(name_and_demonym_candidates)
+                entity_id, candidates = self.predict_mention(snippet, is_language)
             predictions[span] = EntityPrediction(span, entity_id, candidates)
             prediction_cache[snippet] = (entity_id, candidates, is_language, is_person)
 
@@ -167,6 +170,78 @@ class PopularEntitiesLinker(AbstractEntityLinker):
         predictions.update(self.get_lowercase_predictions(linked_entities, predictions, doc, text))
         return predictions
 
+    def predict_mention(self, snippet: str, is_language: bool) -> Tuple[str, Set[str]]:
+        """
+        Returns the predicted entity ID and the candidates for the mention.
+        """
+        candidates = set()
+        name_and_demonym_candidates = set()
+        if is_language and self.entity_db.is_language(snippet):
+            # If NER component determined mention is a language, link to language if it
+            # exists in the database
+            entity_id = self.entity_db.get_entity_for_language(snippet)
+        elif self.use_top_candidates:
+            top_candidates = self.entity_db.get_top_candidates(snippet)
+            candidates = {candidate.entity_id for candidate in top_candidates}
+            entity_id = self.select_top_candidate(top_candidates)
+        else:
+            if self.entity_db.contains_entity_name(snippet):
+                # Prefer entities where the name matches the mention instead of some alias
+                name_and_demonym_candidates = self.entity_db.get_entities_by_name(snippet)
+            if self.entity_db.is_demonym(snippet):
+                # If mention is a demonym, add corresponding entity to candidates
+                # Countries are preferred automatically, since they generally have
+                # a higher sitelink count than languages or ethnicities
+                demonym_entities = self.entity_db.get_entities_for_demonym(snippet)
+                name_and_demonym_candidates.update(demonym_entities)
+            candidates = self.entity_db.get_candidates(snippet)
+            entity_id = self.select_entity(name_and_demonym_candidates, candidates)
+        if entity_id is None:
+            entity_id = UnknownEntity.NIL.value
+        candidates.update(name_and_demonym_candidates)
+        return entity_id, candidates
+
+    def predict_mention_cached(self, snippet: str, is_language: bool, is_person: bool) -> Tuple[str, Set[str]]:
+        """
+        Same as predict_mention(), but the result is taken from the global
+        prediction cache if the mention was predicted before in any article.
+        """
+        key = snippet, is_language, is_person
+        with self.global_prediction_cache_lock:
+            self.global_prediction_cache_lookups += 1
+            cached = self.global_prediction_cache.get(key)
+            if cached is not None:
+                self.global_prediction_cache.move_to_end(key)
+                self.global_prediction_cache_hits += 1
+        if cached is not None:
+            linking_profiler.count("global_prediction_cache_hits")
+            entity_id, candidates = cached
+            # Predictions get their own candidate set, since the cached one is shared across articles
+            return entity_id, set(candidates)
+
+        entity_id, candidates = self.predict_mention(snippet, is_language)
+        with self.global_prediction_cache_lock:
+            self.global_prediction_cache[key] = entity_id, frozenset(candidates)
+            if len(self.global_prediction_cache) > self.global_prediction_cache_size:
+                self.global_prediction_cache.popitem(last=False)
+        return entity_id, candidates
+
+    def get_global_prediction_cache_stats(self) -> Dict[str, Any]:
+        """
+        Returns the number of lookups and hits of the global prediction cache,
+        the hit rate and the number of cached mentions.
+        """
+        lookups = self.global_prediction_cache_lookups
+        return {"lookups": lookups,
+                "hits": self.global_prediction_cache_hits,
+                "hit_rate": self.global_prediction_cache_hits / lookups if lookups else 0,
+                "cached": len(self.global_prediction_cache)}
+
+    def log_global_prediction_cache_stats(self):
+        stats = self.get_global_prediction_cache_stats()
+        logger.info(f"Global prediction cache lookups: {stats['lookups']}, hit rate: {stats['hit_rate'] * 100:.1f}%, "
+                    f"cached mentions: {stats['cached']}")
+
     def get_lowercase_predictions(self, linked_entities, predictions, doc, text):
         linked_entities.update(predictions)
         lowercase_predictions = {}
@@ -178,34 +253,39 @@ class PopularEntitiesLinker(AbstractEntityLinker):
                 i += 1
                 continue
 
+            # The snippet is the text from the start of tok to span_end. The cursor is extended by the text
+            # that is appended to the snippet, so the trie is not walked from the root for each snippet.
             span_end = tok.idx + len(tok.text)
-            snippet = text[tok.idx:span_end]
-            last_snippet_in_trie = None
+            cursor = self.trie.cursor()
+            cursor.extend(text[tok.idx:span_end])
+            last_entity_in_trie = None
+            last_snippet_in_trie_end = -1
             last_snippet_in_trie_j = -1
             j = i + 1
 
-            while self.trie.has_subtrie(snippet) and j < len(doc):
+            while cursor.has_subtrie() and j < len(doc):
                 new_tok = doc[j]
                 new_span_end = new_tok.idx + len(new_tok.text)
-                if self.is_snippet_variant_in_trie(snippet):
-                    last_snippet_in_trie = snippet
+                if cursor.has_variant():
+                    last_entity_in_trie = cursor.get_variant_value()
+                    last_snippet_in_trie_end = span_end
                     last_snippet_in_trie_j = j
-                snippet += text[span_end:new_span_end]
+                cursor.extend(text[span_end:new_span_end])
                 span_end = new_span_end
                 j += 1
-            if self.is_snippet_variant_in_trie(snippet):
-                # has_subtrie(snippet) is False if the only key with the prefix snippet
-                # is snippet so I need this check here
-                entity_id = self.get_entity_from_trie(snippet)
-            elif last_snippet_in_trie is not None:
-                entity_id = self.get_entity_from_trie(last_snippet_in_trie)
-                snippet = last_snippet_in_trie
+            if cursor.has_variant():
+                # has_subtrie() is False if the only key with the snippet as prefix
+                # is the snippet itself, so this check is needed here
+                entity_id = cursor.get_variant_value()
+            elif last_snippet_in_trie_j >= 0:
+                entity_id = last_entity_in_trie
+                span_end = last_snippet_in_trie_end
                 j = last_snippet_in_trie_j
             else:
                 i += 1
                 continue
 
-            span = tok.idx, tok.idx + len(snippet)
+            span = tok.idx, span_end
             tokens = [t for t in doc[i:j]]
 
             if overlaps_with_linked_entity(span, linked_entities):
@@ -229,20 +309,6 @@ class PopularEntitiesLinker(AbstractEntityLinker):
             i = j + 1
         return lowercase_predictions
 
-    def is_snippet_variant_in_trie(self, snippet: str) -> bool:
-        """
-        Returns true if the snippet or a potential singular form of it is in
-        the trie.
-        """
-        return snippet in self.trie or (snippet[-1] == "s" and snippet[:-1] in self.trie)
-
-    def get_entity_from_trie(self, snippet: str) -> str:
-        """
-        Returns the entity ID for the given snippet (or its singular form)
-        from the trie
-        """
-        return self.trie[snippet] if snippet in self.trie else self.trie[snippet[:-1]]
-
     def select_entity(self, name_and_demonym_candidates: Set[str], candidates: Set[str]) -> str:
         """
         Select the entity from the set of candidates that has the highest sitelink count.
@@ -258,5 +324,15 @@ class PopularEntitiesLinker(AbstractEntityLinker):
                 highest_sitelink_count = sitelink_count
         return highest_sitelink_count_entity
 
+    def select_top_candidate(self, top_candidates: List[TopCandidate]) -> Optional[str]:
+        """
+        Same as select_entity() for candidates from the alias to top candidates database,
+        which are already sorted in the order in which select_entity() prefers them.
+        """
+        if top_candidates and top_candidates[0].sitelink_count >= self.min_score and \
+                top_candidates[0].sitelink_count > 0:
+            return top_candidates[0].entity_id
+        return None
+
     def has_entity(self, entity_id: str) -> bool:
         return self.entity_db.contains_entity(entity_id)
@@ -1,5 +1,4 @@
-import numpy as np
-from typing import Optional, Dict, Tuple, Iterator, Any
+from typing import Optional, Dict, Tuple, Iterator, Any, List
 
 import spacy
 from spacy.tokens import Doc
@@ -10,11 +9,37 @@ from elevant.models.entity_database import EntityDatabase
 from elevant.models.entity_prediction import EntityPrediction
 from elevant import settings
 from elevant.utils.offset_converter import OffsetConverter
+from elevant.utils.span_index import SpanIndex
 import logging
 
 logger = logging.getLogger("main." + __name__.split(".")[-1])
 
 
+class DocTokens:
+    """
+    Token attributes of a doc that are needed to enumerate mention spans.
+    They are extracted once per doc, so that each n-gram can be checked
+    in constant time without creating spaCy tokens.
+    """
+    def __init__(self, doc: Doc):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.is_sent_start: List[Optional[bool]] = []
+        # True for proper nouns that are longer than one character
+        self.is_long_propn: List[bool] = []
+        # n_nouns[i] is the number of nouns and proper nouns among the first i tokens
+        self.n_nouns: List[int] = [0]
+        for tok in doc:
+            self.starts.append(tok.idx)
+            self.ends.append(tok.idx + len(tok))
+            self.is_sent_start.append(tok.is_sent_start)
+            self.is_long_propn.append(tok.pos_ == "PROPN" and len(tok) > 1)
+            self.n_nouns.append(self.n_nouns[-1] + (tok.pos_ in ("PROPN", "NOUN")))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
 class PriorLinker(AbstractEntityLinker):
     def __init__(self, entity_database: EntityDatabase, config: Dict[str, Any]):
         self.entity_db = entity_database
@@ -76,41 +101,56 @@ class PriorLinker(AbstractEntityLinker):
     def has_entity(self, entity_id: str) -> bool:
         return self.entity_db.contains_entity(entity_id)
 
-    def get_mention_spans(self, doc: Doc, text: str) -> Iterator[Tuple[Tuple[int, int], str]]:
+    def get_mention_spans(self, doc: Doc, text: str) -> Iterator[Tuple[Tuple[int, int], str, int, bool]]:
+        tokens = DocTokens(doc)
         for n_tokens in range(self.max_tokens, 0, -1):
-            for result in self.get_mention_spans_with_n_tokens(doc, text, n_tokens):
+            for mention_start, result in self.get_mention_spans_with_n_tokens(tokens, text, n_tokens):
                 yield result
 
     def get_mention_spans_with_n_tokens(self,
-                                        doc: Doc,
+                                        tokens: DocTokens,
                                         text: str,
-                                        n_tokens: int) -> Iterator[Tuple[Tuple[int, int], str]]:
-        mention_start = 0
-        while mention_start + n_tokens <= len(doc):
+                                        n_tokens: int,
+                                        only_link_texts: Optional[bool] = False) \
+            -> Iterator[Tuple[int, Tuple[Tuple[int, int], str, int, bool]]]:
+        """
+        Yields the index of the first token and the span, text, number of
+        tokens and whether it contains a noun for each mention with n tokens.
+        If only_link_texts is True, only mentions whose text occurs as link
+        text are yielded, since no entity can be predicted for other mentions.
+        """
+        link_frequencies = self.entity_db.link_frequencies
+        n_doc_tokens = len(tokens)
+        for mention_start in range(n_doc_tokens - n_tokens + 1):
             mention_end = mention_start + n_tokens
-            span = doc[mention_start].idx, doc[mention_end - 1].idx + len(
-                doc[mention_end - 1])
+            span = tokens.starts[mention_start], tokens.ends[mention_end - 1]
             mention_text = text[span[0]:span[1]]
-            # Don't yield mention if directly adjacent tokens are proper nouns
-            skip = False
+            if len(mention_text) <= 1 or (only_link_texts and mention_text not in link_frequencies):
+                continue
             contains_noun = False
             if self.use_pos:
-                if mention_start > 0 and doc[mention_start - 1].pos_ == "PROPN" and len(doc[mention_start - 1]) > 1:
-                    skip = True
-                if mention_end < len(doc) and doc[mention_end].pos_ == "PROPN" and len(doc[mention_end]) > 1:
-                    skip = True
-                contains_noun = [True for tok in doc[mention_start:mention_end] if tok.pos_ in ["PROPN", "NOUN"]]
-            # For the pos-prior linker, require at least one noun in the mention tokens
-            if not skip and len(mention_text) > 1:
-                # Only consider span as mention span if it contains at least one noun
-                yield span, mention_text, n_tokens, contains_noun
-            mention_start += 1
+                # Don't yield mention if directly adjacent tokens are proper nouns
+                if (mention_start > 0 and tokens.is_long_propn[mention_start - 1]) or \
+                        (mention_end < n_doc_tokens and tokens.is_long_propn[mention_end]):
+                    continue
+                # For the pos-prior linker, require at least one noun in the mention tokens
+                contains_noun = tokens.n_nouns[mention_end] > tokens.n_nouns[mention_start]
+            yield mention_start, (span, mention_text, n_tokens, contains_noun)
+
+    def iterate_candidate_mentions(self, tokens: DocTokens, text: str) \
+            -> Iterator[Tuple[int, Tuple[Tuple[int, int], str, int, bool]]]:
+        """
+        Same as get_mention_spans(), but only yields mentions whose text occurs
+        as link text, together with the index of their first token.
+        """
+        for n_tokens in range(self.max_tokens, 0, -1):
+            yield from self.get_mention_spans_with_n_tokens(tokens, text, n_tokens, only_link_texts=True)
 
     def get_matching_entity_id(self, mention_text: str, is_sent_start: bool, contains_noun: bool) -> Optional[str]:
-        if mention_text in self.entity_db.link_frequencies:
+        entity_frequencies = self.entity_db.link_frequencies.get(mention_text)
+        if entity_frequencies is not None:
             # Get matching entity ids for given mention text in order of their link frequency
-            entity_id = max(self.entity_db.link_frequencies[mention_text],
-                            key=self.entity_db.link_frequencies[mention_text].get)
+            entity_id = max(entity_frequencies, key=entity_frequencies.get)
             is_uppercase = mention_text[0].isupper()
             # Return the with the highest link frequency that has a whitelist type and
             # a synonym matching the mention text
@@ -126,8 +166,8 @@ class PriorLinker(AbstractEntityLinker):
         starting with a lower case letter is a synonym.
         """
         lower_mention_text = mention_text[0].lower() + mention_text[1:]
-        return mention_text in self.entity_db.get_entity_aliases(entity_id) or \
-               (is_sent_start and lower_mention_text in self.entity_db.get_entity_aliases(entity_id))
+        aliases = self.entity_db.get_entity_aliases(entity_id)
+        return mention_text in aliases or (is_sent_start and lower_mention_text in aliases)
 
     def has_whitelist_type(self, entity_id: str) -> bool:
         types = self.entity_db.get_entity_types(entity_id)
@@ -143,23 +183,29 @@ class PriorLinker(AbstractEntityLinker):
         if doc is None:
             doc = self.model(text)
 
-        text = self.fix_capitalization(doc, text)
-        doc = self.model(text)
+        fixed_text = self.fix_capitalization(doc, text)
+        # The doc only has to be parsed again if the capitalization changed, unless the given doc
+        # was parsed by a different model
+        if fixed_text != text or doc.vocab is not self.model.vocab:
+            doc = self.model(fixed_text)
+        text = fixed_text
 
         predictions = {}
-        annotated_chars = np.zeros(shape=len(text), dtype=int)
-        spans = {}
-        for span, mention_text, n_tokens, contains_noun in self.get_mention_spans(doc, text):
+        annotated_spans = SpanIndex()
+        n_tokens_by_span = {}
+        tokens = DocTokens(doc)
+        candidate_mentions = self.iterate_candidate_mentions(tokens, text)
+        for mention_start, (span, mention_text, n_tokens, contains_noun) in candidate_mentions:
             if uppercase and mention_text.islower():
                 continue
-            is_sent_start = OffsetConverter.get_token(span[0], doc).is_sent_start
+            is_sent_start = tokens.is_sent_start[mention_start]
             predicted_entity_id = self.get_matching_entity_id(mention_text, is_sent_start, contains_noun)
             if predicted_entity_id:
-                if np.sum(annotated_chars[span[0]:span[1]]) != 0:
+                overlap_span = annotated_spans.get_overlapping_span(span)
+                if overlap_span is not None:
                     # Do not allow overlapping links. Prioritize links with more tokens and resolve ties by link
                     # frequency. This works, because spans are sorted by number of tokens and then from left to right.
-                    overlap_indices = np.nonzero(annotated_chars[span[0]:span[1]])[0]
-                    overlap_span, overlap_n_tokens = spans[annotated_chars[span[0]:span[1]][overlap_indices[0]]]
+                    overlap_n_tokens = n_tokens_by_span[overlap_span]
                     overlap_prediction = predictions[overlap_span]
                     overlap_mention_text = text[overlap_prediction.span[0]:overlap_prediction.span[1]]
                     overlap_link_frequency = self.entity_db.link_frequencies[overlap_mention_text] \
@@ -167,30 +213,29 @@ class PriorLinker(AbstractEntityLinker):
                     curr_link_frequency = self.entity_db.link_frequencies[mention_text][predicted_entity_id]
                     if overlap_n_tokens == n_tokens and overlap_link_frequency < curr_link_frequency:
                         # Remove previous predicted entity
-                        del predictions[overlap_prediction.span]
-                        del spans[overlap_prediction.span[0] + 1]
-                        annotated_chars[overlap_prediction.span[0]:overlap_prediction.span[1]] = 0
+                        del predictions[overlap_span]
+                        del n_tokens_by_span[overlap_span]
+                        annotated_spans.remove(overlap_span)
                     else:
                         # Skip current predicted entity
                         continue
 
-                elif n_tokens == 1 and span[0] >= 2 and annotated_chars[span[0] - 2] != 0:
+                elif n_tokens == 1 and span[0] >= 2 and annotated_spans.get_span_at(span[0] - 2) is not None:
                     # Do not allow two consecutive mentions that are only separated by a single character
                     # (usually a whitespace or a hyphen).
                     # Usually this means that a bigger mention could not be correctly identified.
                     # Delete both mentions.
                     # This does not prevent cases where a proper noun is directly preceding an entity but was not linked
-                    preceding_span, preceding_n_tokens = spans[annotated_chars[span[0] - 2]]
-                    if preceding_n_tokens == 1:
-                        annotated_chars[preceding_span[0]:preceding_span[1]] = 0
+                    preceding_span = annotated_spans.get_span_at(span[0] - 2)
+                    if n_tokens_by_span[preceding_span] == 1:
+                        annotated_spans.remove(preceding_span)
                         del predictions[preceding_span]
-                        del spans[preceding_span[0] + 1]
+                        del n_tokens_by_span[preceding_span]
                         continue
 
                 # Add new prediction
-                # +1 so we can use sum to detect overlaps (span[0] can be 0)
-                annotated_chars[span[0]:span[1]] = span[0] + 1
+                annotated_spans.add(span)
                 candidates = {predicted_entity_id}
                 predictions[span] = EntityPrediction(span, predicted_entity_id, candidates)
-                spans[span[0] + 1] = span, n_tokens  # there are no overlaps so span starts uniquely determine a span
+                n_tokens_by_span[span] = n_tokens
         return predictions
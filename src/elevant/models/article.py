@@ -1,11 +1,10 @@
 from typing import List, Dict, Tuple, Optional
 
-import json
-import numpy as np
-
 from elevant.evaluation.groundtruth_label import GroundtruthLabel, groundtruth_label_from_dict
 from elevant.models.entity_mention import EntityMention, entity_mention_from_dict
 from elevant.models.entity_prediction import EntityPrediction
+from elevant.utils import json_serialization
+from elevant.utils.span_index import SpanIndex
 
 ABSTRACT_INDICATOR = "ABSTRACT"
 
@@ -29,7 +28,7 @@ class Article:
         self.title_synonyms = title_synonyms if title_synonyms else []
         self.url = url
         self.entity_mentions = {}
-        self.entity_coverage = None
+        self.entity_coverage = SpanIndex()
         self.span_to_span_id = dict()
         self.spans = []
         self.add_entity_mentions(entity_mentions)
@@ -59,32 +58,24 @@ class Article:
         return data
 
     def to_json(self, evaluation_format: Optional[bool] = True) -> str:
-        return json.dumps(self.to_dict(evaluation_format))
+        return json_serialization.dumps(self.to_dict(evaluation_format))
 
     def add_entity_mentions(self, entity_mentions: Optional[List[EntityMention]]):
         if entity_mentions is not None:
             for entity_mention in entity_mentions:
                 self.entity_mentions[entity_mention.span] = entity_mention
 
-                # Int ids are not zero based such that 0 indicates no entity in entity_coverage
                 new_span_id = len(self.span_to_span_id) + 1
                 self.span_to_span_id[entity_mention.span] = new_span_id
                 self.spans.append(entity_mention.span)
-
-        self._update_entity_coverage()
-
-    def _update_entity_coverage(self):
-        self.entity_coverage = np.zeros(len(self.text), dtype=int)
-        if self.entity_mentions is not None:
-            for span in self.entity_mentions:
-                begin, end = span
-                self.entity_coverage[begin:end] = self.span_to_span_id[span]
+                self.entity_coverage.add(entity_mention.span)
 
     def get_overlapping_entity(self, span: Tuple[int, int]) -> EntityMention:
         begin, end = span
-        for val in self.entity_coverage[begin:end]:
-            if val != 0:
-                return self.entity_mentions[self.get_span_by_id(val)]
+        # Characters beyond the article text can not be covered by an entity mention
+        overlapping_span = self.entity_coverage.get_overlapping_span((begin, min(end, len(self.text))))
+        if overlapping_span is not None:
+            return self.entity_mentions[overlapping_span]
 
     def link_entities(self,
                       predictions: Dict[Tuple[int, int], EntityPrediction],
@@ -163,4 +154,4 @@ def article_from_dict(data: Dict) -> Article:
 
 
 def article_from_json(dump: str) -> Article:
-    return article_from_dict(json.loads(dump))
+    return article_from_dict(json_serialization.loads(dump))
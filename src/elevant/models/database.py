@@ -1,36 +1,92 @@
 import lmdb
 import atexit
-from typing import Optional, Union, List, Iterator, Tuple, Set
+from enum import Enum
+from typing import Optional, Union, List, Iterator, Tuple, Set, Any, Iterable, Dict
+
+from elevant.utils import mapping_registry
 
 
 class Database:
+    # Number of lookups over all databases, used for profiling
+    n_lookups = 0
+
     def __init__(self, db_file: str, value_type: Optional[type] = str, separator: Optional[str] = ","):
-        self.env = lmdb.open(db_file, readonly=True, lock=False)
+        # An LMDB environment can only be opened once per process, so databases for the same file share it
+        self.env = mapping_registry.get_mapping("lmdb_environment", db_file,
+                                                lambda: Database._open_environment(db_file))
         self.value_type = value_type
         self.separator = separator
 
+    @staticmethod
+    def _open_environment(db_file: str) -> lmdb.Environment:
+        env = lmdb.open(db_file, readonly=True, lock=False)
         # Register a cleanup function to close the environment when the program exits
-        atexit.register(self.env.close)
+        atexit.register(env.close)
+        return env
 
-    def __getitem__(self, key: str) -> Union[str, List[str], Set[str], int]:
+    def __getitem__(self, key: str) -> Union[str, List[str], Set[str], int, Enum]:
         """
         If the database values are multi-values, i.e. the value is actually a list,
         return a list, otherwise a string.
         """
+        Database.n_lookups += 1
         with self.env.begin() as txn:
             val = txn.get(key.encode("utf8")).decode("utf8")
-            if self.value_type is list:
-                return val.split(self.separator)
-            elif self.value_type is set:
-                return set(val.split(self.separator))
-            elif self.value_type is int:
-                return int(val)
-            else:
-                return val
+            return self._convert(val)
+
+    def _convert(self, val: str) -> Union[str, List[str], Set[str], int, Enum]:
+        if self.value_type is list:
+            return val.split(self.separator)
+        elif self.value_type is set:
+            return set(val.split(self.separator))
+        elif self.value_type is int:
+            return int(val)
+        elif isinstance(self.value_type, type) and issubclass(self.value_type, Enum):
+            # Enum values are stored by their name
+            return self.value_type[val]
+        else:
+            return val
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """
+        Return the value for the key or the default if the key does not exist.
+        Unlike a __contains__ check followed by __getitem__, this needs only one lookup.
+        """
+        if key is None or key == "":
+            return default
+        Database.n_lookups += 1
+        with self.env.begin() as txn:
+            try:
+                val = txn.get(key.encode("utf8"))
+            except lmdb.BadValsizeError:
+                return default
+        if val is None:
+            return default
+        return self._convert(val.decode("utf8"))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Return a dictionary with the values of the given keys that exist in the
+        database. All keys are looked up in a single transaction.
+        """
+        values = {}
+        with self.env.begin() as txn:
+            for key in keys:
+                if key is None or key == "":
+                    continue
+                Database.n_lookups += 1
+                try:
+                    val = txn.get(key.encode("utf8"))
+                except lmdb.BadValsizeError:
+                    continue
+                if val is not None:
+                    values[key] = self._convert(val.decode("utf8"))
+        return values
 
     def __contains__(self, key: str) -> bool:
         if key is None or key == "":
             return False
+        Database.n_lookups += 1
         with self.env.begin() as txn:
             try:
                 return txn.get(key.encode("utf8")) is not None
@@ -41,6 +97,9 @@ class Database:
         with self.env.begin() as txn:
             return txn.stat()["entries"]
 
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
     def values(self) -> Iterator[str]:
         with self.env.begin() as txn:
             with txn.cursor() as cursor:
@@ -1,7 +1,56 @@
 from nltk.parse.dependencygraph import DependencyGraph
+from spacy.tokens import Span
 
 
 class EnhancedDependencyGraph(DependencyGraph):
+    @classmethod
+    def from_spacy_sentence(cls, sent: Span) -> "EnhancedDependencyGraph":
+        """Builds the graph directly from a SpaCy-parsed sentence.
+
+        The resulting graph is the same as the graph built from
+        DependencyConllExtractor.to_conll_7(sent), but the CoNLL string does
+        not need to be created and parsed.
+
+        Args:
+            sent (Span): the parsed sentence
+
+        Returns:
+            EnhancedDependencyGraph: the dependency graph of the sentence
+        """
+        graph = cls()
+        sent_start = sent[0].i
+        # Whether the CoNLL string of the sentence would be non-empty
+        has_lines = False
+        for i, word in enumerate(sent):
+            if "\n" in word.text:
+                # Line breaks only yield empty lines in the CoNLL string
+                has_lines = True
+                continue
+            elif word.text.isspace():
+                continue
+            has_lines = True
+            address = i + 1
+            head = 0 if word.head is word else word.head.i - sent_start + 1
+            rel = "root" if word.dep_ == "ROOT" else word.dep_
+            graph.nodes[address].update({
+                "address": address,
+                "word": word.text,
+                "lemma": word.text,
+                "ctag": word.tag_,
+                "tag": word.tag_,
+                "feats": "",
+                "head": head,
+                "rel": rel,
+            })
+            graph.nodes[head]["deps"][rel].append(address)
+
+        if has_lines:
+            root_addresses = graph.nodes[0]["deps"]["ROOT"]
+            if root_addresses:
+                graph.root = graph.nodes[root_addresses[0]]
+                graph.top_relation_label = "ROOT"
+        return graph
+
     def get_by_address(self, address):
         """Returns the node with the given address.
 
@@ -1,5 +1,10 @@
+import functools
+import inspect
+import os
+import threading
+from collections import OrderedDict
 from enum import Enum
-from typing import Dict, Set, Tuple, Iterator, Optional, List, Any
+from typing import Dict, Set, Tuple, Iterator, Optional, List, Any, Iterable, Union
 
 import logging
 
@@ -8,9 +13,14 @@ from elevant.evaluation.groundtruth_label import GroundtruthLabel
 from elevant.models.database import Database
 from elevant.models.gender import Gender
 from elevant.helpers.entity_database_reader import EntityDatabaseReader
+from elevant.utils import mapping_registry
 
 logger = logging.getLogger("main." + __name__.split(".")[-1])
 
+# Maximum number of link targets for which the result of link2id() is memoized
+LINK2ID_CACHE_SIZE = 2 ** 20
+_NOT_CACHED = object()
+
 
 class MappingName(Enum):
     WIKIDATA_ALIASES = "wikidata_aliases"
@@ -31,6 +41,7 @@ class MappingName(Enum):
     ENTITY_ID_TO_FAMILY_NAME = "entity_id_to_family_name"
     ENTITY_ID_TO_LINK_ALIAS = "entity_id_to_link_alias"
     HYPERLINK_TO_MOST_POPULAR_CANDIDATES = "hyperlink_alias_to_most_popular_candidates"
+    ALIAS_TO_TOP_CANDIDATES = "alias_to_top_candidates"
 
 
 class LoadingType(Enum):
@@ -45,8 +56,138 @@ class LoadedInfo:
         self.info = info
 
 
+class TopCandidate:
+    """
+    Candidate entity of an alias in the alias to top candidates database.
+    is_name is True if the alias is the name of the entity,
+    is_demonym is True if the alias is a demonym of the entity.
+    """
+    NAME_FLAG = 1
+    DEMONYM_FLAG = 2
+
+    def __init__(self, entity_id: str, sitelink_count: int, is_name: bool, is_demonym: bool):
+        self.entity_id = entity_id
+        self.sitelink_count = sitelink_count
+        self.is_name = is_name
+        self.is_demonym = is_demonym
+
+    def to_string(self) -> str:
+        flags = (TopCandidate.NAME_FLAG if self.is_name else 0) | (TopCandidate.DEMONYM_FLAG if self.is_demonym else 0)
+        return f"{self.entity_id}:{self.sitelink_count}:{flags}"
+
+
+def top_candidate_from_string(string: str) -> TopCandidate:
+    entity_id, sitelink_count, flags = string.split(":")
+    flags = int(flags)
+    return TopCandidate(entity_id, int(sitelink_count), bool(flags & TopCandidate.NAME_FLAG),
+                        bool(flags & TopCandidate.DEMONYM_FLAG))
+
+
+class DeferredLoad:
+    def __init__(self, method_name: str, args: Tuple, kwargs: Dict[str, Any], defaults: Dict[str, Any]):
+        self.method_name = method_name
+        self.args = args
+        self.kwargs = kwargs
+        # Values of the attributes before they are loaded
+        self.defaults = defaults
+        self.running = False
+        # The component that requested the load, see mapping_registry
+        self.component = mapping_registry.get_current_component()
+
+
+def deferrable(*attribute_names: str, **conditional_attribute_names: str):
+    """
+    Decorator for EntityDatabase load methods that load the given attributes.
+    If the entity database is lazy, the call of the load method is deferred
+    until one of the attributes is accessed for the first time.
+    The keyword arguments map attributes that are only loaded if a boolean
+    argument of the load method is True to the name of that argument.
+    """
+    def decorator(load_method):
+        signature = inspect.signature(load_method)
+
+        def get_loaded_attribute_names(self, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[str, ...]:
+            if not conditional_attribute_names:
+                return attribute_names
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            return attribute_names + tuple(name for name, argument_name in conditional_attribute_names.items()
+                                           if arguments.arguments[argument_name])
+
+        @functools.wraps(load_method)
+        def wrapper(self, *args, **kwargs):
+            if self.lazy:
+                attribute_names = get_loaded_attribute_names(self, args, kwargs)
+                deferred_loads = [self._deferred_loads[name] for name in attribute_names
+                                  if name in self._deferred_loads]
+                if len(deferred_loads) == len(attribute_names) and \
+                        all(d.method_name == load_method.__name__ and d.args == args and d.kwargs == kwargs
+                            for d in deferred_loads):
+                    # The same load was already deferred
+                    return
+                if not deferred_loads and not any(getattr(self, name) for name in attribute_names):
+                    self._defer(load_method.__name__, args, kwargs, attribute_names)
+                    return
+                # Some of the attributes are already (about to be) loaded. Load them first and
+                # then call the load method, exactly as without lazy loading.
+                for name in attribute_names:
+                    if name in self._deferred_loads:
+                        self._run_deferred_load(name)
+            load_method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class EntitySetView:
+    """
+    Set-like view of the entities in a database with entity IDs as keys,
+    optionally restricted to entities with a minimum sitelink count.
+    Entities that are added to the view are kept in memory.
+    """
+    def __init__(self, db: Database, entity_db: "EntityDatabase", minimum_sitelink_count: Optional[int] = 0):
+        self.db = db
+        self.entity_db = entity_db
+        self.minimum_sitelink_count = minimum_sitelink_count
+        # Added entities that are not already in the view
+        self.added_entities = set()
+
+    def _has_minimum_sitelink_count(self, entity_id: str) -> bool:
+        return self.minimum_sitelink_count == 0 or \
+            self.minimum_sitelink_count <= self.entity_db.get_sitelink_count(entity_id)
+
+    def __contains__(self, entity_id: str) -> bool:
+        if entity_id in self.added_entities:
+            return True
+        if entity_id not in self.db:
+            return False
+        return self._has_minimum_sitelink_count(entity_id)
+
+    def __iter__(self) -> Iterator[str]:
+        for entity_id in self.db.keys():
+            if self._has_minimum_sitelink_count(entity_id):
+                yield entity_id
+        yield from self.added_entities
+
+    def __len__(self) -> int:
+        if self.minimum_sitelink_count == 0:
+            return len(self.db) + len(self.added_entities)
+        return sum(1 for _ in self)
+
+    def add(self, entity_id: str):
+        if entity_id not in self:
+            self.added_entities.add(entity_id)
+
+
 class EntityDatabase:
-    def __init__(self):
+    def __init__(self, lazy: Optional[bool] = False):
+        """
+        If lazy is True, calls of the load methods are deferred until the
+        loaded mapping is accessed for the first time, and the set of all
+        entities in Wikipedia is not built but answered by a database.
+        """
+        self.lazy = lazy
+        self._deferred_loads: Dict[str, DeferredLoad] = {}
+        self._deferred_load_lock = threading.RLock()
         self.entities = set()
         self.entities: Set[str]
         self.name_to_entities_db = {}
@@ -75,12 +216,19 @@ class EntityDatabase:
         self.wikidata2wikipedia: Dict[str, str]
         self.redirects = {}
         self.redirects: Database
+        # Memoized link2id() results, including link targets that could not be resolved. The lock guards the LRU
+        # order against concurrent link2id() calls, e.g. in the threaded API server.
+        self._link2id_cache = OrderedDict()
+        self._link2id_cache: Dict[str, Optional[str]]
+        self._link2id_cache_lock = threading.Lock()
         self.link_frequencies = {}
         self.link_frequencies: Dict[str, Dict[str, int]]
         self.entity_frequencies = {}
         self.entity_frequencies: Dict[str, int]
         self.hyperlink_to_most_popular_candidates_db = {}
         self.hyperlink_to_most_popular_candidates_db: Database
+        self.alias_to_top_candidates_db = {}
+        self.alias_to_top_candidates_db: Database
         self.entity2gender = {}
         self.entity2gender: Dict[str, Gender]
         self.entity2coreference_types = {}
@@ -95,6 +243,49 @@ class EntityDatabase:
         self.type_adjustments = {}
         self.loaded_info = {}
 
+    def __getattr__(self, name: str) -> Any:
+        # Only called if the attribute does not exist, i.e. if loading the attribute was deferred
+        deferred_loads = self.__dict__.get("_deferred_loads")
+        if not deferred_loads or name not in deferred_loads:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return self._run_deferred_load(name)
+
+    def _defer(self, method_name: str, args: Tuple, kwargs: Dict[str, Any], attribute_names: Tuple[str, ...]):
+        defaults = {name: self.__dict__.pop(name) for name in attribute_names}
+        deferred_load = DeferredLoad(method_name, args, kwargs, defaults)
+        for name in attribute_names:
+            self._deferred_loads[name] = deferred_load
+
+    def _run_deferred_load(self, name: str) -> Any:
+        """
+        Run the deferred load of the given attribute and return the attribute.
+        Other threads that access the attribute wait until loading is complete.
+        """
+        with self._deferred_load_lock:
+            deferred_load = self._deferred_loads.get(name)
+            if deferred_load is None:
+                # The attribute was loaded by another thread in the meantime
+                return self.__dict__[name]
+            if deferred_load.running:
+                # The load method itself accesses the attribute
+                return self.__dict__.get(name, deferred_load.defaults[name])
+            logger.info(f"Loading {name} on first access ...")
+            load_method = getattr(EntityDatabase, deferred_load.method_name).__wrapped__
+            deferred_load.running = True
+            try:
+                with mapping_registry.component(deferred_load.component):
+                    load_method(self, *deferred_load.args, **deferred_load.kwargs)
+            finally:
+                deferred_load.running = False
+            for attribute_name, default in deferred_load.defaults.items():
+                # Attributes that are filled instead of set by the load method
+                self.__dict__.setdefault(attribute_name, default)
+                del self._deferred_loads[attribute_name]
+            return self.__dict__[name]
+
+    def _is_loaded(self, name: str) -> bool:
+        return name in self._deferred_loads or len(getattr(self, name)) > 0
+
     def contains_entity(self, entity_id: str) -> bool:
         return entity_id in self.entities
 
@@ -102,6 +293,16 @@ class EntityDatabase:
         logger.info("Loading entities from Wikipedia to Wikidata mapping into entity database ...")
         self.loaded_info[MappingName.ENTITIES] = LoadedInfo(LoadingType.RELEVANT_ENTITIES,
                                                             minimum_sitelink_count)
+        if self.lazy:
+            if os.path.exists(settings.QID_TO_WIKIPEDIA_NAME_DB):
+                # Look up entities in the Wikidata to Wikipedia database instead of building a set of all entities
+                self.entities = EntitySetView(EntityDatabaseReader.get_wikidata_to_wikipedia_db(), self,
+                                              minimum_sitelink_count)
+                if minimum_sitelink_count > 0:
+                    self.load_sitelink_counts()
+                logger.info("-> Entities are looked up in the Wikidata to Wikipedia database.")
+                return
+            logger.info(f"Database {settings.QID_TO_WIKIPEDIA_NAME_DB} does not exist. Loading all entities.")
         db = EntityDatabaseReader.get_wikipedia_to_wikidata_db()
         entity_ids = set(db.values())
         if minimum_sitelink_count == 0:
@@ -110,18 +311,23 @@ class EntityDatabase:
             # If a minimum sitelink count is given, load sitelink mapping to check
             # entity sitelink counts against the given minimum sitelink count
             self.load_sitelink_counts()
+            self.entities = set()
             for entity_id in entity_ids:
                 if minimum_sitelink_count <= self.get_sitelink_count(entity_id):
                     self.entities.add(entity_id)
         logger.info(f"-> Entity database contains {len(self.entities)} entities.")
 
+    @deferrable("entity_type_db", "type_adjustments")
     def load_entity_types(self, type_db: Optional[str] = settings.QID_TO_WHITELIST_TYPES_DB):
         if not self.entity_type_db:
             self.entity_type_db = EntityDatabaseReader.get_whitelist_types_db(type_db)
-            self.type_adjustments = EntityDatabaseReader.read_whitelist_type_adjustments()
+            self.type_adjustments = mapping_registry.get_mapping("type_adjustments",
+                                                                 settings.WHITELIST_TYPE_ADJUSTMENTS_FILE,
+                                                                 EntityDatabaseReader.read_whitelist_type_adjustments)
         else:
             logger.info("Entity type database already loaded.")
 
+    @deferrable("entity_type_db")
     def load_custom_entity_types(self, filename: str):
         if not self.entity_type_db:
             self.entity_type_db = EntityDatabaseReader.get_entity_types_mapping(filename)
@@ -167,12 +373,14 @@ class EntityDatabase:
         else:
             return [GroundtruthLabel.OTHER]
 
+    @deferrable("entity_name_db")
     def load_entity_names(self):
         if not self.entity_name_db:
             self.entity_name_db = EntityDatabaseReader.get_entity_name_db()
         else:
             logger.info("Entity name database already loaded.")
 
+    @deferrable("entity_name_db")
     def load_custom_entity_names(self, filename: str):
         if not self.entity_name_db:
             self.entity_name_db = EntityDatabaseReader.get_entity_name_mapping(filename)
@@ -185,6 +393,7 @@ class EntityDatabase:
             return None
         return self.entity_name_db[entity_id] if entity_id in self.entity_name_db else "Unknown"
 
+    @deferrable("name_to_entities_db")
     def load_name_to_entities(self):
         self.loaded_info[MappingName.NAME_TO_ENTITY_ID] = LoadedInfo(LoadingType.FULL)
         if not self.name_to_entities_db:
@@ -198,6 +407,7 @@ class EntityDatabase:
     def get_entities_by_name(self, entity_name: str) -> Set[str]:
         return self.name_to_entities_db[entity_name]
 
+    @deferrable("alias_to_entities_db")
     def load_alias_to_entities(self):
         self.loaded_info[MappingName.WIKIDATA_ALIASES] = LoadedInfo(LoadingType.FULL)
         if not self.alias_to_entities_db:
@@ -207,18 +417,19 @@ class EntityDatabase:
         # The entity name is also an alias, so load it too.
         self.load_name_to_entities()
 
+    @deferrable("family_name_aliases")
     def load_family_name_aliases(self):
-        logger.info("Loading family name aliases into entity database ...")
         self.loaded_info[MappingName.FAMILY_NAME_ALIASES] = LoadedInfo(LoadingType.FULL)
-        for entity_id, name in EntityDatabaseReader.read_human_names():
-            if " " in name:
-                family_name = name.split()[-1]
-                if family_name in self.family_name_aliases:
-                    self.family_name_aliases[family_name].add(entity_id)
-                else:
-                    self.family_name_aliases[family_name] = {entity_id}
+        if os.path.exists(settings.FAMILY_NAME_TO_QIDS_DB):
+            self.family_name_aliases = EntityDatabaseReader.get_family_name_aliases_db()
+            return
+        logger.info("Loading family name aliases into entity database ...")
+        self.family_name_aliases = mapping_registry.get_mapping(MappingName.FAMILY_NAME_ALIASES.value,
+                                                                settings.QID_TO_HUMAN_NAME_FILE,
+                                                                EntityDatabaseReader.get_family_name_aliases)
         logger.info(f"-> {len(self.family_name_aliases)} family name aliases loaded into entity database.")
 
+    @deferrable("link_aliases", link_frequencies="with_frequencies")
     def load_link_aliases(self, with_frequencies: Optional[bool] = False):
         if with_frequencies:
             logger.info("Loading link aliases and their frequencies into entity database ...")
@@ -242,6 +453,7 @@ class EntityDatabase:
         else:
             logger.info(f"-> {len(self.link_aliases)} link aliases loaded into entity database.")
 
+    @deferrable("hyperlink_to_most_popular_candidates_db")
     def load_hyperlink_to_most_popular_candidates(self):
         logger.info("Loading hyperlink to most popular candidates into entity database ...")
         if not self.hyperlink_to_most_popular_candidates_db:
@@ -261,6 +473,36 @@ class EntityDatabase:
             return self.hyperlink_to_most_popular_candidates_db[alias]
         return set()
 
+    @deferrable("alias_to_top_candidates_db")
+    def load_alias_to_top_candidates(self):
+        self.loaded_info[MappingName.ALIAS_TO_TOP_CANDIDATES] = LoadedInfo(LoadingType.FULL)
+        self.alias_to_top_candidates_db = EntityDatabaseReader.get_alias_to_top_candidates_db()
+
+    def has_alias_to_top_candidates_loaded(self) -> bool:
+        return self._is_loaded("alias_to_top_candidates_db")
+
+    def get_top_candidates(self, alias: str, k: Optional[int] = None, min_score: Optional[int] = 0) \
+            -> List[TopCandidate]:
+        """
+        Returns the candidates of the alias from the Wikidata names, Wikidata
+        aliases, family names and demonyms, sorted by sitelink count. Candidates
+        with the same sitelink count are sorted by whether the alias is their
+        name or demonym and then by entity ID. At most k candidates with a
+        sitelink count >= min_score are returned.
+        """
+        top_candidates_string = self.alias_to_top_candidates_db.get(alias)
+        if top_candidates_string is None:
+            return []
+        top_candidates = []
+        for candidate_string in top_candidates_string.split(";"):
+            if k is not None and len(top_candidates) >= k:
+                break
+            candidate = top_candidate_from_string(candidate_string)
+            if candidate.sitelink_count < min_score:
+                break
+            top_candidates.append(candidate)
+        return top_candidates
+
     def get_candidates(self, alias: str) -> Set[str]:
         entity_ids = set()
         if alias in self.name_to_entities_db:
@@ -279,6 +521,7 @@ class EntityDatabase:
                alias in self.family_name_aliases or \
                alias in self.link_aliases
 
+    @deferrable("entity_to_aliases_db")
     def load_entity_to_aliases(self):
         self.loaded_info[MappingName.ENTITY_ID_TO_ALIAS] = LoadedInfo(LoadingType.FULL)
         if not self.entity_to_aliases_db:
@@ -288,16 +531,20 @@ class EntityDatabase:
         # The entity name is also an alias, so load it too.
         self.load_entity_names()
 
+    @deferrable("entity_to_family_name")
     def load_entity_to_family_name(self):
-        logger.info("Loading entity ID to family name aliases into entity database ...")
         self.loaded_info[MappingName.ENTITY_ID_TO_FAMILY_NAME] = LoadedInfo(LoadingType.FULL)
-        for entity_id, name in EntityDatabaseReader.read_human_names():
-            if " " in name:
-                family_name = name.split()[-1]
-                self.entity_to_family_name[entity_id] = family_name
+        if os.path.exists(settings.QID_TO_FAMILY_NAME_DB):
+            self.entity_to_family_name = EntityDatabaseReader.get_entity_to_family_name_db()
+            return
+        logger.info("Loading entity ID to family name aliases into entity database ...")
+        self.entity_to_family_name = mapping_registry.get_mapping(MappingName.ENTITY_ID_TO_FAMILY_NAME.value,
+                                                                  settings.QID_TO_HUMAN_NAME_FILE,
+                                                                  EntityDatabaseReader.get_entity_to_family_name)
         logger.info(f"-> {len(self.entity_to_family_name)} entity ID to family name aliases "
                     f"loaded into entity database.")
 
+    @deferrable("entity_to_link_alias")
     def load_entity_to_link_aliases(self):
         logger.info("Loading entity ID to link aliases into entity database ...")
         self.loaded_info[MappingName.ENTITY_ID_TO_LINK_ALIAS] = LoadedInfo(LoadingType.FULL)
@@ -322,38 +569,118 @@ class EntityDatabase:
             aliases = aliases.union(self.entity_to_link_alias[entity_id])
         return aliases
 
+    @deferrable("wikipedia2wikidata")
     def load_wikipedia_to_wikidata_db(self):
         self.wikipedia2wikidata = EntityDatabaseReader.get_wikipedia_to_wikidata_db()
+        self._clear_link2id_cache()
 
+    @deferrable("wikipedia2wikidata", "wikidata2wikipedia")
     def load_wikidata_to_wikipedia_mapping(self):
         self.wikipedia2wikidata = EntityDatabaseReader.get_wikipedia_to_wikidata_db()
+        self._clear_link2id_cache()
         for wikipedia_name, entity_id in self.wikipedia2wikidata.items():
             self.wikidata2wikipedia[entity_id] = wikipedia_name
 
     def is_wikipedia_to_wikidata_mapping_loaded(self) -> bool:
-        return len(self.wikipedia2wikidata) > 0
+        return self._is_loaded("wikipedia2wikidata")
 
     def is_wikidata_to_wikipedia_mapping_loaded(self) -> bool:
-        return len(self.wikidata2wikipedia) > 0
+        return self._is_loaded("wikidata2wikipedia")
 
+    @deferrable("redirects")
     def load_redirects(self):
         self.redirects = EntityDatabaseReader.get_redirects_db()
+        # Link targets that could not be resolved without redirects might be resolvable now
+        self._clear_link2id_cache()
 
     def is_redirects_loaded(self) -> bool:
-        return len(self.redirects) > 0
+        return self._is_loaded("redirects")
 
-    def link2id(self, link_target: str) -> Optional[str]:
+    @staticmethod
+    def _get_link_target_variants(link_target: str) -> List[str]:
         link_target_variants = [link_target]
         if link_target and link_target[0].islower():
             # In Wikipedia, links that start with a lowercase first letter are automatically redirected to the same link
             # that starts with a capital letter. So there probably won't exist redirect pages for such cases.
             link_target_variants.append(link_target[0].upper() + link_target[1:])
-        for target in link_target_variants:
-            if target in self.wikipedia2wikidata:
-                return self.wikipedia2wikidata[target]
-            elif target in self.redirects and self.redirects[target] in self.wikipedia2wikidata:
-                return self.wikipedia2wikidata[self.redirects[target]]
-        return None
+        return link_target_variants
+
+    def _get_cached_link2id(self, link_target: str) -> Any:
+        with self._link2id_cache_lock:
+            entity_id = self._link2id_cache.get(link_target, _NOT_CACHED)
+            if entity_id is not _NOT_CACHED:
+                self._link2id_cache.move_to_end(link_target)
+            return entity_id
+
+    def _cache_link2id(self, link_target: str, entity_id: Optional[str]):
+        with self._link2id_cache_lock:
+            self._link2id_cache[link_target] = entity_id
+            if len(self._link2id_cache) > LINK2ID_CACHE_SIZE:
+                # Evict the least recently used link target
+                self._link2id_cache.popitem(last=False)
+
+    def _clear_link2id_cache(self):
+        with self._link2id_cache_lock:
+            self._link2id_cache.clear()
+
+    def link2id(self, link_target: str) -> Optional[str]:
+        """
+        Returns the QID of the Wikipedia article the link target refers to,
+        following redirects, or None if the link target can not be resolved.
+        """
+        entity_id = self._get_cached_link2id(link_target)
+        if entity_id is not _NOT_CACHED:
+            return entity_id
+        entity_id = None
+        for target in self._get_link_target_variants(link_target):
+            entity_id = self.wikipedia2wikidata.get(target)
+            if entity_id is None:
+                redirect_target = self.redirects.get(target)
+                if redirect_target is not None:
+                    entity_id = self.wikipedia2wikidata.get(redirect_target)
+            if entity_id is not None:
+                break
+        self._cache_link2id(link_target, entity_id)
+        return entity_id
+
+    @staticmethod
+    def _get_many(mapping: Union[Database, Dict[str, str]], keys: Iterable[str]) -> Dict[str, str]:
+        if isinstance(mapping, Database):
+            return mapping.get_many(keys)
+        return {key: mapping[key] for key in keys if key in mapping}
+
+    def link2ids(self, link_targets: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Returns a dictionary that maps each of the link targets to the result
+        of link2id(). The link targets that are not memoized are resolved
+        together, with one database transaction per resolution step.
+        """
+        results = {}
+        uncached_variants = {}
+        for link_target in link_targets:
+            if link_target in results or link_target in uncached_variants:
+                continue
+            entity_id = self._get_cached_link2id(link_target)
+            if entity_id is _NOT_CACHED:
+                uncached_variants[link_target] = self._get_link_target_variants(link_target)
+            else:
+                results[link_target] = entity_id
+        if not uncached_variants:
+            return results
+
+        targets = {target for variants in uncached_variants.values() for target in variants}
+        resolved = self._get_many(self.wikipedia2wikidata, targets)
+        redirects = self._get_many(self.redirects, targets.difference(resolved))
+        redirect_entity_ids = self._get_many(self.wikipedia2wikidata, set(redirects.values()))
+        for target, redirect_target in redirects.items():
+            if redirect_target in redirect_entity_ids:
+                resolved[target] = redirect_entity_ids[redirect_target]
+
+        for link_target, variants in uncached_variants.items():
+            entity_id = next((resolved[target] for target in variants if target in resolved), None)
+            self._cache_link2id(link_target, entity_id)
+            results[link_target] = entity_id
+        return results
 
     def id2wikipedia_name(self, entity_id: str) -> str:
         if entity_id in self.wikidata2wikipedia:
@@ -366,6 +693,7 @@ class EntityDatabase:
                 frequency = link_frequencies[link_text][entity_id]
                 yield link_text, entity_id, frequency
 
+    @deferrable("link_frequencies")
     def load_link_frequencies(self):
         for link_text, entity_id, frequency in self._iterate_link_frequencies():
             if link_text not in self.link_frequencies:
@@ -376,6 +704,7 @@ class EntityDatabase:
                 # This case can happen, when different link targets map to the same article (e.g. due to redirects)
                 self.link_frequencies[link_text][entity_id] += frequency
 
+    @deferrable("entity_frequencies")
     def load_entity_frequencies(self):
         for link_text, entity_id, frequency in self._iterate_link_frequencies():
             if entity_id not in self.entity_frequencies:
@@ -384,7 +713,7 @@ class EntityDatabase:
                 self.entity_frequencies[entity_id] += frequency
 
     def is_link_frequencies_loaded(self) -> bool:
-        return len(self.link_frequencies) > 0
+        return self._is_loaded("link_frequencies")
 
     def get_link_frequency(self, alias: str, entity_id: str) -> int:
         if alias not in self.link_frequencies or entity_id not in self.link_frequencies[alias]:
@@ -400,25 +729,34 @@ class EntityDatabase:
     def get_entity_frequency(self, entity_id: str) -> int:
         return self.entity_frequencies[entity_id] if entity_id in self.entity_frequencies else 0
 
+    @deferrable("entity2gender")
     def load_gender(self):
-        self.entity2gender = EntityDatabaseReader.get_gender_mapping()
+        if os.path.exists(settings.QID_TO_GENDER_DB):
+            self.entity2gender = EntityDatabaseReader.get_gender_db()
+        else:
+            self.entity2gender = mapping_registry.get_mapping(MappingName.GENDER.value, settings.QID_TO_GENDER_FILE,
+                                                              EntityDatabaseReader.get_gender_mapping)
 
     def is_gender_loaded(self) -> bool:
-        return len(self.entity2gender) > 0
+        return self._is_loaded("entity2gender")
 
     def get_gender(self, entity_id: str) -> Gender:
         if len(self.entity2gender) == 0:
             logger.warning("Tried to access gender information but gender mapping was not loaded.")
-        elif entity_id in self.entity2gender:
-            return self.entity2gender[entity_id]
         else:
-            return Gender.NEUTRAL
+            return self.entity2gender.get(entity_id, Gender.NEUTRAL)
 
+    @deferrable("entity2coreference_types")
     def load_coreference_types(self):
-        self.entity2coreference_types = EntityDatabaseReader.get_coreference_types_mapping()
+        if os.path.exists(settings.QID_TO_COREF_TYPES_DB):
+            self.entity2coreference_types = EntityDatabaseReader.get_coreference_types_db()
+        else:
+            self.entity2coreference_types = mapping_registry.get_mapping(
+                MappingName.COREFERENCE_TYPES.value, settings.QID_TO_COREF_TYPES_FILE,
+                EntityDatabaseReader.get_coreference_types_mapping)
 
     def is_coreference_types_loaded(self) -> bool:
-        return len(self.entity2coreference_types) > 0
+        return self._is_loaded("entity2coreference_types")
 
     def has_coreference_types(self, entity_id: str) -> bool:
         return entity_id in self.entity2coreference_types
@@ -426,14 +764,18 @@ class EntityDatabase:
     def get_coreference_types(self, entity_id: str) -> List[str]:
         return self.entity2coreference_types[entity_id]
 
+    @deferrable("unigram_counts")
     def load_unigram_counts(self):
-        self.unigram_counts = EntityDatabaseReader.get_unigram_counts()
+        if os.path.exists(settings.UNIGRAMS_DB):
+            self.unigram_counts = EntityDatabaseReader.get_unigram_counts_db()
+        else:
+            self.unigram_counts = mapping_registry.get_mapping("unigram_counts", settings.UNIGRAMS_FILE,
+                                                               EntityDatabaseReader.get_unigram_counts)
 
     def get_unigram_count(self, token: str) -> int:
-        if token not in self.unigram_counts:
-            return 0
-        return self.unigram_counts[token]
+        return self.unigram_counts.get(token, 0)
 
+    @deferrable("sitelink_counts")
     def load_sitelink_counts(self):
         if self.loaded_info.get(MappingName.SITELINKS) == LoadedInfo(LoadingType.FULL):
             logger.info("-> Sitelink counts already loaded.")
@@ -442,18 +784,23 @@ class EntityDatabase:
             self.sitelink_counts = EntityDatabaseReader.get_sitelink_db()
 
     def has_sitelink_counts_loaded(self) -> bool:
-        return len(self.sitelink_counts) > 0
+        return self._is_loaded("sitelink_counts")
 
     def get_sitelink_count(self, entity_id: str) -> int:
         if not self.has_sitelink_counts_loaded():
             logger.warning("Tried to access sitelink counts, but sitelink counts were not loaded.")
         return self.sitelink_counts[entity_id] if entity_id in self.sitelink_counts else 0
 
+    @deferrable("demonyms")
     def load_demonyms(self):
-        self.demonyms = EntityDatabaseReader.get_demonyms()
+        if os.path.exists(settings.DEMONYM_TO_QIDS_DB):
+            self.demonyms = EntityDatabaseReader.get_demonyms_db()
+        else:
+            self.demonyms = mapping_registry.get_mapping(MappingName.DEMONYMS.value, settings.QID_TO_DEMONYM_FILE,
+                                                         EntityDatabaseReader.get_demonyms)
 
     def has_demonyms_loaded(self) -> bool:
-        return len(self.demonyms) > 0
+        return self._is_loaded("demonyms")
 
     def is_demonym(self, text: str) -> bool:
         if not self.has_demonyms_loaded():
@@ -463,11 +810,13 @@ class EntityDatabase:
     def get_entities_for_demonym(self, demonym: str) -> List[str]:
         return self.demonyms[demonym]
 
+    @deferrable("languages")
     def load_languages(self):
-        self.languages = EntityDatabaseReader.get_languages()
+        self.languages = mapping_registry.get_mapping(MappingName.LANGUAGES.value, settings.QID_TO_LANGUAGE_FILE,
+                                                      EntityDatabaseReader.get_languages)
 
     def has_languages_loaded(self) -> bool:
-        return len(self.languages) > 0
+        return self._is_loaded("languages")
 
     def is_language(self, text: str) -> bool:
         if not self.has_languages_loaded():
@@ -477,33 +826,46 @@ class EntityDatabase:
     def get_entity_for_language(self, language: str) -> str:
         return self.languages[language]
 
+    @deferrable("quantities")
     def load_quantities(self):
-        self.quantities = EntityDatabaseReader.get_real_numbers()
+        if os.path.exists(settings.QUANTITY_DB):
+            self.quantities = EntityDatabaseReader.get_real_numbers_db()
+        else:
+            self.quantities = mapping_registry.get_mapping("quantities", settings.QUANTITY_FILE,
+                                                           EntityDatabaseReader.get_real_numbers)
 
     def has_quantities_loaded(self) -> bool:
-        return len(self.quantities) > 0
+        return self._is_loaded("quantities")
 
     def is_quantity(self, entity_id: str) -> bool:
         if not self.has_quantities_loaded():
             logger.warning("Tried to access quantities, but quantities were not loaded.")
         return entity_id in self.quantities
 
+    @deferrable("datetimes")
     def load_datetimes(self):
-        self.datetimes = EntityDatabaseReader.get_points_in_time()
+        if os.path.exists(settings.DATETIME_DB):
+            self.datetimes = EntityDatabaseReader.get_points_in_time_db()
+        else:
+            self.datetimes = mapping_registry.get_mapping("datetimes", settings.DATETIME_FILE,
+                                                          EntityDatabaseReader.get_points_in_time)
 
     def has_datetimes_loaded(self) -> bool:
-        return len(self.datetimes) > 0
+        return self._is_loaded("datetimes")
 
     def is_datetime(self, entity_id: str) -> bool:
         if not self.has_datetimes_loaded():
             logger.warning("Tried to access datetimes, but datetimes were not loaded.")
         return entity_id in self.datetimes
 
+    @deferrable("wikipedia_id2wikipedia_title")
     def load_wikipedia_id2wikipedia_title(self):
-        self.wikipedia_id2wikipedia_title = EntityDatabaseReader.get_wikipedia_id2wikipedia_title_mapping()
+        self.wikipedia_id2wikipedia_title = mapping_registry.get_mapping(
+            MappingName.WIKIPEDIA_ID_WIKIPEDIA_TITLE.value, settings.WIKIPEDIA_ID_TO_TITLE_FILE,
+            EntityDatabaseReader.get_wikipedia_id2wikipedia_title_mapping)
 
     def has_wikipedia_id2wikipedia_title_loaded(self) -> bool:
-        return len(self.wikipedia_id2wikipedia_title) > 0
+        return self._is_loaded("wikipedia_id2wikipedia_title")
 
     def get_wikipedia_title_by_wikipedia_id(self, wikipedia_id: int) -> Optional[str]:
         if not self.has_wikipedia_id2wikipedia_title_loaded():
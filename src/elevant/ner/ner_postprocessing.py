@@ -2,6 +2,7 @@ from spacy.tokens import Span, Doc
 from spacy.language import Language
 
 from elevant.models.entity_database import EntityDatabase
+from elevant.utils import mapping_registry
 
 
 @Language.factory("ner_postprocessor")
@@ -11,8 +12,11 @@ def ner_postprocessor(nlp, name):
 
 class NERPostprocessor:
     def __init__(self):
-        self.entity_db = EntityDatabase()
-        self.entity_db.load_name_to_entities()
+        # spaCy components can not be given an entity database, but the name database
+        # is shared with other components through the mapping registry.
+        with mapping_registry.component("ner_postprocessor"):
+            self.entity_db = EntityDatabase()
+            self.entity_db.load_name_to_entities()
 
     def __call__(self, doc: Doc) -> Doc:
         entities = list(doc.ents)
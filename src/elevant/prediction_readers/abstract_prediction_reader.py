@@ -1,6 +1,8 @@
-from typing import Dict, Tuple, Iterator, List, Optional
+from typing import Any, Dict, Tuple, Iterator, List, Optional
 
 import os
+import json
+import zlib
 import logging
 
 from elevant.models.article import Article
@@ -36,10 +38,26 @@ class AbstractPredictionReader:
     order in the benchmark and the prediction file contains the original
     article texts.
     Set predictions_iterator_implemented = False when calling super().__init__()
+
+    If the reader additionally implements get_text_locations_from_file() and
+    get_predictions_at_location(), it can be created with lazy = True.
+    Instead of holding all predictions and article texts in memory, only a
+    small index with one record per article is built (or loaded from a
+    sidecar index file next to the prediction file) and the predictions of
+    an article are parsed on demand from their location in the file in
+    get_predictions_by_article().
     """
-    def __init__(self, input_filepath: str, predictions_iterator_implemented: bool):
+    index_file_suffix = ".prediction_index.json"
+    index_format_version = 2
+
+    def __init__(self, input_filepath: str, predictions_iterator_implemented: bool, lazy: Optional[bool] = False):
         self.input_filepath = input_filepath
         self.predictions_iterator_implemented = predictions_iterator_implemented
+        self.lazy = lazy and not predictions_iterator_implemented
+        if self.lazy and not self.supports_lazy_mode():
+            logger.warning("%s does not support lazy mode. Reading all predictions into memory."
+                           % self.__class__.__name__)
+            self.lazy = False
         self.linker_identifier = "Unknown Linker"
 
         # Needed only if predictions_iterator_implemented is True
@@ -55,8 +73,15 @@ class AbstractPredictionReader:
         # List of predictions where the predictions for article with index i are the ith entry in the list
         self.prediction_article_texts: List[str] = []
 
+        # Needed only if lazy is True
+        # List of records (filepath, location in file, text length, text checksum) where the record for the
+        # article with index i is the ith entry in the list
+        self.prediction_records: List[Tuple[str, Any, int, int]] = []
+
         if predictions_iterator_implemented:
             self.iterator = self.predictions_iterator()
+        elif self.lazy:
+            self.build_prediction_index(self.input_filepath)
         else:
             self.build_prediction_mappings(self.input_filepath)
 
@@ -87,6 +112,34 @@ class AbstractPredictionReader:
         """
         raise NotImplementedError()
 
+    def get_text_locations_from_file(self, filepath) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields the article text and the location of the article's predictions
+        in the file for each article in the file in the same order as
+        get_predictions_with_text_from_file(). A location can be any JSON
+        serializable value, e.g. a byte offset, that allows to read the
+        predictions of the article without reading the rest of the file.
+
+        Implement this method together with get_predictions_at_location()
+        to support lazy mode.
+
+        :return: iterator over article texts and locations
+        """
+        raise NotImplementedError()
+
+    def get_predictions_at_location(self, filepath, location) -> Dict[Tuple[int, int], EntityPrediction]:
+        """
+        Returns the predictions at the given location in the file as yielded by
+        get_text_locations_from_file().
+
+        :return: dictionary with predictions for the article
+        """
+        raise NotImplementedError()
+
+    def supports_lazy_mode(self) -> bool:
+        return type(self).get_text_locations_from_file is not AbstractPredictionReader.get_text_locations_from_file \
+            and type(self).get_predictions_at_location is not AbstractPredictionReader.get_predictions_at_location
+
     def build_prediction_mappings(self, input_filepath):
         """
         Build the following mappings:
@@ -110,12 +163,82 @@ class AbstractPredictionReader:
                 self.predictions.append(predictions)
                 self.prediction_article_texts.append(text)
 
+    def _get_prediction_files(self, input_filepath: str) -> List[str]:
+        if os.path.isdir(input_filepath):
+            return [os.path.join(input_filepath, filename) for filename in sorted(os.listdir(input_filepath))]
+        return [input_filepath]
+
+    def _get_index_filename(self, input_filepath: str) -> str:
+        return input_filepath.rstrip("/") + self.index_file_suffix
+
+    def _load_prediction_index(self, index_filename: str, filepaths: List[str]) -> bool:
+        """
+        Load the prediction index from the given sidecar index file.
+
+        :return: True if the index was loaded, False if the index file does not exist or is outdated
+        """
+        if not os.path.exists(index_filename):
+            return False
+        with open(index_filename, "r", encoding="utf8") as file:
+            index = json.load(file)
+        file_mtimes = {filepath: os.path.getmtime(filepath) for filepath in filepaths}
+        if index.get("format_version") != self.index_format_version or \
+                index.get("compare_length") != self.compare_length or index.get("files") != file_mtimes:
+            logger.info("Prediction index file %s is outdated." % index_filename)
+            return False
+        for filepath, location, text_start, text_length, text_checksum in index["records"]:
+            self.article_texts2prediction_index[text_start] = len(self.prediction_records)
+            self.prediction_records.append((filepath, location, text_length, text_checksum))
+        return True
+
+    def build_prediction_index(self, input_filepath: str):
+        """
+        Build the following mappings without keeping predictions or article texts in memory:
+        - self.article_texts2prediction_index: Dict[str, int]
+          maps the first <self.compare_length> characters of a prediction article text to an article index
+        - self.prediction_records: List[Tuple[str, Any, int, int]]
+          a list of (filepath, location in file, text length, text checksum) where the record for article with
+          index i is the ith list entry
+
+        The index is read from a sidecar index file if it exists and is up to date.
+        Otherwise, it is built from the prediction file(s) and written to the sidecar index file.
+        """
+        filepaths = self._get_prediction_files(input_filepath)
+        index_filename = self._get_index_filename(input_filepath)
+        if self._load_prediction_index(index_filename, filepaths):
+            logger.info("Loaded prediction index with %d articles from %s"
+                        % (len(self.prediction_records), index_filename))
+            return
+
+        records = []
+        for filepath in filepaths:
+            for text, location in self.get_text_locations_from_file(filepath):
+                text_start = text[:self.compare_length]
+                text_checksum = zlib.crc32(text.encode("utf8"))
+                self.article_texts2prediction_index[text_start] = len(self.prediction_records)
+                self.prediction_records.append((filepath, location, len(text), text_checksum))
+                records.append((filepath, location, text_start, len(text), text_checksum))
+
+        try:
+            index = {"format_version": self.index_format_version,
+                     "compare_length": self.compare_length,
+                     "files": {filepath: os.path.getmtime(filepath) for filepath in filepaths},
+                     "records": records}
+            with open(index_filename, "w", encoding="utf8") as file:
+                json.dump(index, file)
+            logger.info("Wrote prediction index with %d articles to %s" % (len(records), index_filename))
+        except OSError as e:
+            logger.warning("Could not write prediction index file %s: %s" % (index_filename, e))
+
     def get_predictions_by_article(self, article: Article) -> Dict[Tuple[int, int], EntityPrediction]:
         """
         Returns the predictions whose article text matches the text of the given article.
 
         :return: dictionary with predictions for the article
         """
+        if self.lazy:
+            return self.get_predictions_by_article_lazy(article)
+
         if article.text[:self.compare_length] in self.article_texts2prediction_index:
             index = self.article_texts2prediction_index[article.text[:self.compare_length]]
             prediction_article_text = self.prediction_article_texts[index]
@@ -129,6 +252,26 @@ class AbstractPredictionReader:
                            "Returning empty predictions." % article.text[:self.compare_length])
             return {}
 
+    def get_predictions_by_article_lazy(self, article: Article) -> Dict[Tuple[int, int], EntityPrediction]:
+        """
+        Returns the predictions whose article text matches the text of the given article.
+        The predictions are parsed on demand using the prediction index.
+
+        :return: dictionary with predictions for the article
+        """
+        if article.text[:self.compare_length] in self.article_texts2prediction_index:
+            index = self.article_texts2prediction_index[article.text[:self.compare_length]]
+            filepath, location, text_length, text_checksum = self.prediction_records[index]
+            if text_length != len(article.text) or text_checksum != zlib.crc32(article.text.encode("utf8")):
+                logger.warning("Benchmark article text and prediction article text are similar,"
+                               "but not completely the same. len(benchmark_article) = %d, len(prediction_article) = %d"
+                               % (len(article.text), text_length))
+            return self.get_predictions_at_location(filepath, location)
+        else:
+            logger.warning("No corresponding prediction article found for benchmark article \"%s...\""
+                           "Returning empty predictions." % article.text[:self.compare_length])
+            return {}
+
     def get_predictions(self, article: Article) -> Dict[Tuple[int, int], EntityPrediction]:
         """
         Returns the predictions for the given article.
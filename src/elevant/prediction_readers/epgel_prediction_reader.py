@@ -1,4 +1,4 @@
-from typing import Dict, Tuple, Iterator, List
+from typing import Dict, Tuple, Iterator
 import json
 import logging
 
@@ -12,38 +12,89 @@ class EPGELPredictionReader(AbstractPredictionReader):
     def __init__(self, input_filepath: str):
         super().__init__(input_filepath, predictions_iterator_implemented=True)
 
-    def _get_prediction_from_files(self, input_file_path: str) -> List[Dict[Tuple[int, int], EntityPrediction]]:
-        """
-        Yields all predictions in the disambiguation_file.
+    @staticmethod
+    def _count_lines(file_path: str) -> int:
+        with open(file_path, "r", encoding="utf8") as file:
+            return sum(1 for _ in file)
 
-        :param input_file_path: path to the EPGEL input file
-        :return: dictionary that contains all predictions for the given file
+    @staticmethod
+    def _scan_input_file(input_file_path: str) -> Tuple[int, int, bool]:
         """
-        # We cannot change the output, but we can add information to the input, e.g. the span of the mention
-        # and the article index within the benchmark.
-        input_lines = open(input_file_path).readlines()
-        output_lines = open(self.input_filepath).readlines()
-
-        last_article_idx = json.loads(input_lines[-1])["article_index"]
-        all_article_predictions = [{} for _ in range(last_article_idx + 1)]
+        Returns the number of mentions in the EPGEL input file, the largest
+        article index and whether the mentions are sorted by article index.
+        """
+        n_lines = 0
+        max_article_idx = -1
+        is_sorted = True
+        with open(input_file_path, "r", encoding="utf8") as input_file:
+            for input_line in input_file:
+                article_idx = json.loads(input_line)["article_index"]
+                if article_idx < max_article_idx:
+                    is_sorted = False
+                max_article_idx = max(max_article_idx, article_idx)
+                n_lines += 1
+        return n_lines, max_article_idx, is_sorted
 
-        if len(input_lines) != len(output_lines):
-            logger.error("Number of input mentions and output predictions differ: %d vs %d"
-                         % (len(input_lines), len(output_lines)))
-        else:
-            for i in range(len(input_lines)):
-                input_json = json.loads(input_lines[i])
-                output_json = json.loads(output_lines[i])
-                article_idx = input_json["article_index"]
+    def _iterate_mention_predictions(self, input_file_path: str) -> Iterator[Tuple[int, EntityPrediction]]:
+        """
+        Yields the article index and the prediction for each mention in the input file.
+        """
+        with open(input_file_path, "r", encoding="utf8") as input_file, \
+                open(self.input_filepath, "r", encoding="utf8") as output_file:
+            for input_line, output_line in zip(input_file, output_file):
+                input_json = json.loads(input_line)
+                output_json = json.loads(output_line)
                 span = input_json["mention_start"], input_json["mention_end"]
                 entity_id = None
                 candidates = set()
                 if len(output_json["candidates"]) > 0:
                     entity_id = output_json["candidates"][0]
                     candidates = set(output_json["candidates"])
-                all_article_predictions[article_idx][span] = EntityPrediction(span, entity_id, candidates)
+                yield input_json["article_index"], EntityPrediction(span, entity_id, candidates)
+
+    def _get_predictions_from_files(self, input_file_path: str) -> Iterator[Dict[Tuple[int, int], EntityPrediction]]:
+        """
+        Yields the predictions for each article in the disambiguation_file.
 
-        return all_article_predictions
+        If the input file contains the mentions in article order, both files
+        are read line by line, such that only the predictions of the current
+        article are held in memory. Otherwise, all predictions are read into
+        memory first.
+
+        :param input_file_path: path to the EPGEL input file
+        :return: iterator over dictionaries with predictions for each article
+        """
+        # We cannot change the output, but we can add information to the input, e.g. the span of the mention
+        # and the article index within the benchmark.
+        n_input_lines, max_article_idx, is_sorted = self._scan_input_file(input_file_path)
+        n_output_lines = self._count_lines(self.input_filepath)
+
+        if n_input_lines != n_output_lines:
+            logger.error("Number of input mentions and output predictions differ: %d vs %d"
+                         % (n_input_lines, n_output_lines))
+            for _ in range(max_article_idx + 1):
+                yield {}
+            return
+
+        if not is_sorted:
+            logger.warning("Input mentions are not sorted by article index. Reading all predictions into memory.")
+            all_article_predictions = [{} for _ in range(max_article_idx + 1)]
+            for article_idx, prediction in self._iterate_mention_predictions(input_file_path):
+                all_article_predictions[article_idx][prediction.span] = prediction
+            for predictions in all_article_predictions:
+                yield predictions
+            return
+
+        current_article_idx = 0
+        predictions = {}
+        for article_idx, prediction in self._iterate_mention_predictions(input_file_path):
+            while current_article_idx < article_idx:
+                yield predictions
+                predictions = {}
+                current_article_idx += 1
+            predictions[prediction.span] = prediction
+        if n_input_lines > 0:
+            yield predictions
 
     def predictions_iterator(self) -> Iterator[Dict[Tuple[int, int], EntityPrediction]]:
         """
@@ -52,6 +103,5 @@ class EPGELPredictionReader(AbstractPredictionReader):
         :return: iterator over dictionaries with predictions for each article
         """
         input_file_path = self.input_filepath.replace("output", "input")
-        all_article_predictions = self._get_prediction_from_files(input_file_path)
-        for predictions in all_article_predictions:
+        for predictions in self._get_predictions_from_files(input_file_path):
             yield predictions
@@ -1,8 +1,9 @@
 import logging
-from typing import Iterator, Tuple, Dict, Optional
+from typing import Iterator, Tuple, Dict, List, Optional
 
-from pynif import NIFCollection
+from pynif import NIFContext
 
+from elevant.helpers.nif_context_reader import NifContextReader
 from elevant.models.entity_database import EntityDatabase
 from elevant.models.entity_prediction import EntityPrediction
 from elevant.utils.knowledge_base_mapper import KnowledgeBaseMapper, UnknownEntity
@@ -12,10 +13,52 @@ logger = logging.getLogger("main." + __name__.split(".")[-1])
 
 
 class NifPredictionReader(AbstractPredictionReader):
-    def __init__(self, input_filepath: str, entity_db: EntityDatabase, custom_kb: Optional[bool] = False):
+    def __init__(self,
+                 input_filepath: str,
+                 entity_db: EntityDatabase,
+                 custom_kb: Optional[bool] = False,
+                 lazy: Optional[bool] = False):
         self.entity_db = entity_db
         self.custom_kb = custom_kb
-        super().__init__(input_filepath, predictions_iterator_implemented=False)
+        self.context_reader = NifContextReader()
+        super().__init__(input_filepath, predictions_iterator_implemented=False, lazy=lazy)
+
+    def get_text_locations_from_file(self, filepath: str) -> Iterator[Tuple[str, Tuple[str, List[Tuple[int, int]]]]]:
+        """
+        Yields the article text for each article in the file together with
+        the URI of the article's NIF context and the byte ranges of the
+        statements of the context and its phrases in the file.
+
+        :return: iterator over article texts and locations
+        """
+        for context_uri, ranges in self.context_reader.get_context_locations(filepath):
+            context = self.context_reader.read_context(filepath, context_uri, ranges)
+            if not context.mention:
+                continue
+            yield context.mention, (context_uri, ranges)
+
+    def get_predictions_at_location(self, filepath: str, location: Tuple[str, List[Tuple[int, int]]]) \
+            -> Dict[Tuple[int, int], EntityPrediction]:
+        """
+        Returns the predictions of the NIF context at the given location.
+
+        :return: dictionary with predictions for the article
+        """
+        context_uri, ranges = location
+        return self._get_predictions_from_context(self.context_reader.read_context(filepath, context_uri, ranges))
+
+    def _get_predictions_from_context(self, context: NIFContext) -> Dict[Tuple[int, int], EntityPrediction]:
+        predictions = {}
+        # Make sure predictions are sorted by start index
+        for phrase in sorted(context.phrases, key=lambda p: p.beginIndex):
+            entity_uri = phrase.taIdentRef
+            if self.custom_kb:
+                entity_id = entity_uri if entity_uri else UnknownEntity.NIL.value
+            else:
+                entity_id = KnowledgeBaseMapper.get_wikidata_qid(entity_uri, self.entity_db, verbose=True)
+            span = phrase.beginIndex, phrase.endIndex
+            predictions[span] = EntityPrediction(span, entity_id, {entity_id})
+        return predictions
 
     def get_predictions_with_text_from_file(self, filepath: str) -> Iterator[Tuple[Dict[Tuple[int, int],
                                                                                         EntityPrediction], str]]:
@@ -24,26 +67,11 @@ class NifPredictionReader(AbstractPredictionReader):
 
         :return: iterator over dictionaries with predictions for each article and the article text
         """
-        with open(filepath, "r", encoding="utf8") as file:
-            file_content = file.readlines()
-            nif_content = "".join(file_content)
-            nif_doc = NIFCollection.loads(nif_content)
-            # NIF contexts have random order by default. Make sure results are reproducible by sorting by URI
-            for context in sorted(nif_doc.contexts, key=lambda c: c.uri):
-                text = context.mention
-                if not text:
-                    # This happens e.g. in KORE50 for the parent context
-                    # <http://www.mpi-inf.mpg.de/yago-naga/aida/download/KORE50.tar.gz/AIDA.tsv>
-                    continue
-                predictions = {}
-                # Make sure predictions are sorted by start index
-                for phrase in sorted(context.phrases, key=lambda p: p.beginIndex):
-                    entity_uri = phrase.taIdentRef
-                    if self.custom_kb:
-                        entity_id = entity_uri if entity_uri else UnknownEntity.NIL.value
-                    else:
-                        entity_id = KnowledgeBaseMapper.get_wikidata_qid(entity_uri, self.entity_db, verbose=True)
-                    span = phrase.beginIndex, phrase.endIndex
-                    predictions[span] = EntityPrediction(span, entity_id, {entity_id})
-                # Add article text and predictions to mappings
-                yield predictions, text
+        # NIF contexts have random order by default. Make sure results are reproducible by sorting by URI
+        for context in self.context_reader.iterate_contexts(filepath):
+            if not context.mention:
+                # This happens e.g. in KORE50 for the parent context
+                # <http://www.mpi-inf.mpg.de/yago-naga/aida/download/KORE50.tar.gz/AIDA.tsv>
+                continue
+            # Add article text and predictions to mappings
+            yield self._get_predictions_from_context(context), context.mention
@@ -77,8 +77,18 @@ QID_TO_WHITELIST_TYPES_DB = WIKIDATA_MAPPINGS_PATH + "qid_to_whitelist_types.db"
 QID_TO_ALIASES_DB = WIKIDATA_MAPPINGS_PATH + "qid_to_aliases.db"
 ALIAS_TO_QIDS_DB = WIKIDATA_MAPPINGS_PATH + "alias_to_qids.db"
 WIKIPEDIA_NAME_TO_QID_DB = WIKIDATA_MAPPINGS_PATH + "wikipedia_name_to_qid.db"
+QID_TO_WIKIPEDIA_NAME_DB = WIKIDATA_MAPPINGS_PATH + "qid_to_wikipedia_name.db"
 REDIRECTS_DB = WIKIPEDIA_MAPPINGS_PATH + "redirects.db"
 HYPERLINK_TO_MOST_POPULAR_CANDIDATES_DB = WIKIPEDIA_MAPPINGS_PATH + "hyperlink_to_most_popular_candidates.db"
+ALIAS_TO_TOP_CANDIDATES_DB = WIKIDATA_MAPPINGS_PATH + "alias_to_top_candidates.db"
+QID_TO_GENDER_DB = WIKIDATA_MAPPINGS_PATH + "qid_to_gender.db"
+QID_TO_COREF_TYPES_DB = WIKIDATA_MAPPINGS_PATH + "qid_to_coreference_types.db"
+FAMILY_NAME_TO_QIDS_DB = WIKIDATA_MAPPINGS_PATH + "family_name_to_qids.db"
+QID_TO_FAMILY_NAME_DB = WIKIDATA_MAPPINGS_PATH + "qid_to_family_name.db"
+DEMONYM_TO_QIDS_DB = WIKIDATA_MAPPINGS_PATH + "demonym_to_qids.db"
+QUANTITY_DB = WIKIDATA_MAPPINGS_PATH + "quantity.db"
+DATETIME_DB = WIKIDATA_MAPPINGS_PATH + "datetime.db"
+UNIGRAMS_DB = WIKIPEDIA_MAPPINGS_PATH + "unigrams.db"
 
 # Custom mappings (have to be created by the user, e.g. using the scripts/extract_custom_mappings.py script)
 CUSTOM_ENTITY_TO_NAME_FILE = DATA_DIRECTORY + "custom-mappings/entity_to_name.tsv"
@@ -98,10 +108,12 @@ VECTORS_ABSTRACTS_DIRECTORY = LINKER_FILES + "spacy/knowledge_bases/vectors/vect
 
 # Benchmark files
 BENCHMARK_DIR = "benchmarks/"
+BENCHMARK_CACHE_DIR = BENCHMARK_DIR + ".cache/"
 
 # Other files and paths
 EVALUATION_RESULTS_DIR = "evaluation-results/"
 LOG_PATH = "logs/"
+WEBAPP_RESULTS_INDEX_FILE = "evaluation-webapp/.results_index.json"
 TMP_FORKSERVER_CONFIG_FILE = "configs/tmp_forkserver.config.json"
 
 # Other settings
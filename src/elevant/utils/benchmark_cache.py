@@ -0,0 +1,283 @@
+"""
+Compiled cache for benchmark articles imported from other formats.
+
+Importing a benchmark from another format than our JSONL format requires
+loading the mappings that are needed to map the benchmark entities to
+Wikidata. The cache stores the resulting articles as pickled objects such
+that subsequent reads of the same benchmark neither need the mappings nor
+the benchmark reader. Benchmarks in our JSONL format are not cached, since
+unpickling their articles is not faster than parsing them.
+
+A cache file is keyed by the hash of the content of the benchmark source
+files, a key that identifies how the articles were created from the source
+files (e.g. the benchmark format), the size and modification time of the
+mapping files used by the reader and the source of the modules whose
+objects are pickled (Article, GroundtruthLabel, EntityMention, SpanIndex)
+and of the reader module, such that changes to any of them invalidate it.
+The name of a cache file contains a hash of the source paths and the reader
+key, such that a new cache file replaces the outdated cache file of the
+same benchmark. If the cache directory is not writable, the articles are
+read without cache.
+
+Cache file layout:
+    MAGIC
+    pickled articles, one after the other
+    pickled list of the byte offsets of the articles
+    offset of the offset list (8 bytes, little endian)
+"""
+
+import glob
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import struct
+
+from typing import Callable, Iterator, List, Optional
+
+from elevant import settings
+from elevant.evaluation import groundtruth_label
+from elevant.models import article as article_module
+from elevant.models import entity_mention
+from elevant.models.article import Article
+from elevant.utils import span_index
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+MAGIC = b"ELEVBMC1"
+
+# Modules whose objects are part of the pickled articles
+_PICKLED_MODULES = (article_module, groundtruth_label, entity_mention, span_index)
+
+_source_hashes = {}
+
+
+def _update_with_path(file_hash, path: str):
+    if os.path.isdir(path):
+        for directory, subdirectories, filenames in os.walk(path):
+            subdirectories.sort()
+            for filename in sorted(filenames):
+                filepath = os.path.join(directory, filename)
+                file_hash.update(os.path.relpath(filepath, path).encode("utf8"))
+                _update_with_path(file_hash, filepath)
+    else:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                file_hash.update(chunk)
+
+
+def _get_source_hash(module) -> str:
+    if module.__name__ not in _source_hashes:
+        source_hash = hashlib.sha1()
+        _update_with_path(source_hash, inspect.getfile(module))
+        _source_hashes[module.__name__] = source_hash.hexdigest()
+    return _source_hashes[module.__name__]
+
+
+def get_mapping_files_fingerprint(mapping_files: List[str]) -> str:
+    """
+    Mapping files are too large to hash their content for each benchmark
+    read, so their size and modification time are used instead.
+    """
+    fingerprint = []
+    for filename in mapping_files:
+        if os.path.exists(filename):
+            stat = os.stat(filename)
+            fingerprint.append(f"{filename}:{stat.st_size}:{stat.st_mtime_ns}")
+    return ";".join(fingerprint)
+
+
+def get_cache_key(source_paths: List[str],
+                  reader_key: str,
+                  reader_class: Optional[type] = None,
+                  mapping_files: Optional[List[str]] = None) -> str:
+    """
+    Compute the cache key for the given benchmark source files or directories,
+    the given reader key, the module of the given reader class and the given
+    mapping files.
+    """
+    key_hash = hashlib.sha1()
+    key_hash.update(MAGIC)
+    modules = _PICKLED_MODULES + ((inspect.getmodule(reader_class),) if reader_class is not None else ())
+    for module in modules:
+        key_hash.update(_get_source_hash(module).encode("utf8"))
+    key_hash.update(reader_key.encode("utf8"))
+    key_hash.update(get_mapping_files_fingerprint(mapping_files or []).encode("utf8"))
+    for path in source_paths:
+        key_hash.update(b"\0" + path.encode("utf8") + b"\0")
+        _update_with_path(key_hash, path)
+    return key_hash.hexdigest()
+
+
+def get_cache_name(source_paths: List[str], reader_key: str) -> str:
+    """
+    Returns the name shared by all cache files of the given benchmark source
+    files or directories and the given reader key.
+    """
+    name_hash = hashlib.sha1(reader_key.encode("utf8"))
+    for path in source_paths:
+        name_hash.update(b"\0" + os.path.abspath(path).encode("utf8"))
+    return f"{os.path.basename(os.path.normpath(source_paths[0]))}.{name_hash.hexdigest()[:8]}"
+
+
+class BenchmarkCache:
+    """
+    Cache for the articles of a benchmark that supports sequential iteration
+    and random access by article index.
+
+    If the cache file does not exist, it is created from the articles yielded
+    by create_articles() while they are iterated. The cache file is only
+    written once all articles have been iterated. If the cache file can not
+    be written, the articles are read with create_articles() instead.
+    """
+    def __init__(self,
+                 source_paths: List[str],
+                 create_articles: Callable[[], Iterator[Article]],
+                 reader_key: Optional[str] = "",
+                 cache_dir: Optional[str] = settings.BENCHMARK_CACHE_DIR,
+                 reader_class: Optional[type] = None,
+                 mapping_files: Optional[List[str]] = None):
+        self.source_paths = source_paths
+        self.create_articles = create_articles
+        self.reader_key = reader_key
+        self.cache_dir = cache_dir
+        self.reader_class = reader_class
+        self.mapping_files = mapping_files
+        self._cache_filename = None
+        self._offsets = None
+        # Set if the cache file could not be written
+        self._uncached = False
+
+    def get_cache_filename(self) -> str:
+        if self._cache_filename is None:
+            name = get_cache_name(self.source_paths, self.reader_key)
+            cache_key = get_cache_key(self.source_paths, self.reader_key, self.reader_class, self.mapping_files)
+            self._cache_filename = os.path.join(self.cache_dir, f"{name}.{cache_key}.pkl")
+        return self._cache_filename
+
+    def exists(self) -> bool:
+        return os.path.exists(self.get_cache_filename())
+
+    def _remove_outdated_cache_files(self):
+        name = get_cache_name(self.source_paths, self.reader_key)
+        for filename in glob.glob(os.path.join(glob.escape(self.cache_dir), glob.escape(name) + ".*.pkl")):
+            if filename != self.get_cache_filename():
+                try:
+                    os.remove(filename)
+                    logger.info(f"Removed outdated benchmark cache file {filename}")
+                except OSError as e:
+                    logger.warning(f"Could not remove outdated benchmark cache file {filename}: {e}")
+
+    def _write_articles(self) -> Iterator[Article]:
+        """
+        Yields the articles from create_articles() and writes them to the cache file.
+        If the cache file can not be written, the articles are only yielded.
+        """
+        cache_filename = self.get_cache_filename()
+        tmp_filename = f"{cache_filename}.{os.getpid()}.tmp"
+        offsets = []
+        file = None
+        try:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                file = open(tmp_filename, "wb")
+                file.write(MAGIC)
+            except OSError as e:
+                logger.warning(f"Could not write benchmark cache file {cache_filename}: {e}. "
+                               f"Reading the benchmark without cache.")
+                self._uncached = True
+            for article in self.create_articles():
+                if file is not None:
+                    try:
+                        offsets.append(file.tell())
+                        pickle.dump(article, file, protocol=pickle.HIGHEST_PROTOCOL)
+                    except OSError as e:
+                        logger.warning(f"Could not write benchmark cache file {cache_filename}: {e}. "
+                                       f"Reading the benchmark without cache.")
+                        self._uncached = True
+                        file.close()
+                        file = None
+                yield article
+            if file is not None:
+                try:
+                    offsets_position = file.tell()
+                    pickle.dump(offsets, file, protocol=pickle.HIGHEST_PROTOCOL)
+                    file.write(struct.pack("<Q", offsets_position))
+                    file.close()
+                    file = None
+                    os.replace(tmp_filename, cache_filename)
+                    logger.info(f"Wrote benchmark cache with {len(offsets)} articles to {cache_filename}")
+                except OSError as e:
+                    logger.warning(f"Could not write benchmark cache file {cache_filename}: {e}.")
+                    self._uncached = True
+                else:
+                    self._remove_outdated_cache_files()
+        finally:
+            if file is not None:
+                file.close()
+            # The iteration was stopped before all articles were written or writing failed
+            if os.path.exists(tmp_filename):
+                try:
+                    os.remove(tmp_filename)
+                except OSError:
+                    pass
+
+    def _read_articles(self) -> Iterator[Article]:
+        with open(self.get_cache_filename(), "rb") as file:
+            file.seek(len(MAGIC))
+            for _ in range(len(self._get_offsets())):
+                yield pickle.load(file)
+
+    def _get_offsets(self) -> Optional[List[int]]:
+        """
+        Returns the byte offsets of the articles in the cache file or None if
+        the cache file can not be written.
+        """
+        if self._uncached:
+            return None
+        if self._offsets is None:
+            if not self.exists():
+                # Create the cache file
+                for _ in self._write_articles():
+                    pass
+                if self._uncached:
+                    return None
+            with open(self.get_cache_filename(), "rb") as file:
+                if file.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{self.get_cache_filename()} is not a benchmark cache file.")
+                file.seek(-8, os.SEEK_END)
+                offsets_position = struct.unpack("<Q", file.read(8))[0]
+                file.seek(offsets_position)
+                self._offsets = pickle.load(file)
+        return self._offsets
+
+    def article_iterator(self) -> Iterator[Article]:
+        """
+        Yields all articles, from the cache file if it exists.
+        """
+        if self.exists():
+            return self._read_articles()
+        if self._uncached:
+            return self.create_articles()
+        return self._write_articles()
+
+    def get_article(self, index: int) -> Article:
+        """
+        Returns the article with the given index. Creates the cache file if it does not exist.
+        """
+        offsets = self._get_offsets()
+        if offsets is None:
+            for i, article in enumerate(self.create_articles()):
+                if i == index:
+                    return article
+            raise IndexError(f"The benchmark has no article with index {index}.")
+        with open(self.get_cache_filename(), "rb") as file:
+            file.seek(offsets[index])
+            return pickle.load(file)
+
+    def __len__(self) -> int:
+        offsets = self._get_offsets()
+        if offsets is None:
+            return sum(1 for _ in self.create_articles())
+        return len(offsets)
@@ -0,0 +1,503 @@
+"""
+Compact columnar storage for JSONL files with one JSON object or one list of
+JSON objects per line, e.g. linked articles (.linked_articles.jsonl) and
+evaluation cases (.eval_cases.jsonl).
+
+The records of a file are stored in a table with one column per key.
+Keys whose values are lists of objects (e.g. the entity mentions and labels
+of an article or the cases of an article) are stored in a nested table.
+Columns are typed: integer and float columns are stored as binary arrays,
+string columns as one concatenated string with a length array, and all
+remaining values as JSON strings. Each column is compressed separately.
+
+File layout:
+    MAGIC
+    header length (8 bytes, little endian)
+    header (JSON): line format and for each table its number of rows and
+                   its columns with type, offset and length of the column data
+    column data
+
+Since the header contains the position of each column, a single column, e.g.
+the error labels of all cases, can be read without reading the rest of the file.
+Converting a JSONL file that was written with json.dumps() to the columnar
+format and back yields the original file.
+"""
+
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+
+MAGIC = b"ELEVCOL1"
+
+COLUMNAR_FILE_EXTENSION = ".columns"
+
+INT = "int"
+FLOAT = "float"
+STR = "str"
+JSON = "json"
+TABLE = "table"
+
+ROOT_TABLE = "rows"
+LIST_KEY = "items"
+
+LINE_FORMAT_OBJECT = "object"
+LINE_FORMAT_LIST = "list"
+
+_MISSING = object()
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+# Number of values or bytes per chunk when writing column data
+_CHUNK_SIZE = 1 << 16
+
+# Entry of a column spool file: row, number of items if the value is a list or -1, tag, payload length
+_SPOOL_ENTRY = struct.Struct("<qqcq")
+# Payload is the UTF-8 encoded string value / the JSON encoded value
+_STR_TAG = b"s"
+_JSON_TAG = b"j"
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _decode_strings(data: bytes, n_rows: int) -> List[Any]:
+    lengths = _from_bytes("q", data[:8 * n_rows])
+    values = []
+    position = 8 * n_rows
+    for length in lengths:
+        if length < 0:
+            values.append(_MISSING)
+        else:
+            values.append(data[position:position + length].decode("utf8"))
+            position += length
+    return values
+
+
+class _BlobWriter:
+    """
+    Compresses blobs into a temporary data file and records their offsets
+    and lengths relative to the start of the data.
+    """
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.offsets = []
+
+    def write(self, chunks: Iterable[bytes]) -> int:
+        """
+        Write the concatenation of the given chunks as one compressed blob and return its index.
+        """
+        offset = self.file.tell()
+        compressor = zlib.compressobj()
+        for chunk in chunks:
+            self.file.write(compressor.compress(chunk))
+        self.file.write(compressor.flush())
+        self.offsets.append((offset, self.file.tell() - offset))
+        return len(self.offsets) - 1
+
+
+def _iterate_array_chunks(typecode: str, values: Iterable[Any]) -> Iterator[bytes]:
+    chunk = array(typecode)
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == _CHUNK_SIZE:
+            yield _to_bytes(chunk)
+            chunk = array(typecode)
+    if chunk:
+        yield _to_bytes(chunk)
+
+
+class _ColumnWriter:
+    """
+    Spools the values of a column to a temporary file while the records are
+    added and determines the type of the column on the fly. Nested records
+    of a column that can still become a nested table are added to a child
+    table.
+    """
+    def __init__(self, table_name: str, key: str, spool_dir: str):
+        self.table_name = table_name
+        self.key = key
+        self.spool_dir = spool_dir
+        self.file = tempfile.TemporaryFile(dir=spool_dir)
+        self.n_values = 0
+        self.is_int = True
+        self.is_float = True
+        self.is_str = True
+        self.is_table = True
+        self.has_nested_records = False
+        self.child_table = None
+
+    def add(self, row: int, value: Any):
+        self.n_values += 1
+        value_type = type(value)
+        self.is_int = self.is_int and value_type is int and _INT64_MIN <= value <= _INT64_MAX
+        self.is_float = self.is_float and value_type is float
+        self.is_str = self.is_str and value_type is str
+        if self.is_table:
+            if value_type is list and all(type(item) is dict for item in value):
+                if self.child_table is None:
+                    self.child_table = _TableWriter(self.table_name + "." + self.key, self.spool_dir)
+                for item in value:
+                    self.child_table.add_record(item)
+                self.has_nested_records = self.has_nested_records or len(value) > 0
+            else:
+                self.is_table = False
+                self._close_child_table()
+        if value_type is str:
+            tag, payload = _STR_TAG, value.encode("utf8")
+        elif value_type is int:
+            # Same as the JSON encoding, but faster
+            tag, payload = _JSON_TAG, str(value).encode("utf8")
+        else:
+            tag, payload = _JSON_TAG, json.dumps(value).encode("utf8")
+        count = len(value) if value_type is list else -1
+        self.file.write(_SPOOL_ENTRY.pack(row, count, tag, len(payload)))
+        self.file.write(payload)
+
+    def _close_child_table(self):
+        if self.child_table is not None:
+            self.child_table.close()
+            self.child_table = None
+
+    def close(self):
+        self.file.close()
+        self._close_child_table()
+
+    def get_type(self, n_rows: int) -> str:
+        all_present = self.n_values == n_rows
+        if all_present and self.is_int:
+            return INT
+        if all_present and self.is_float:
+            return FLOAT
+        if self.is_str:
+            return STR
+        if self.is_table and self.has_nested_records:
+            return TABLE
+        return JSON
+
+    def _iterate_spool(self) -> Iterator[Tuple[int, int, bytes, bytes]]:
+        self.file.seek(0)
+        for _ in range(self.n_values):
+            row, count, tag, length = _SPOOL_ENTRY.unpack(self.file.read(_SPOOL_ENTRY.size))
+            yield row, count, tag, self.file.read(length)
+
+    def _iterate_rows(self, n_rows: int) -> Iterator[Optional[Tuple[int, bytes, bytes]]]:
+        """
+        Yields the count, tag and payload of the value of each row or None if the row does not contain the key.
+        """
+        next_row = 0
+        for row, count, tag, payload in self._iterate_spool():
+            for _ in range(next_row, row):
+                yield None
+            yield count, tag, payload
+            next_row = row + 1
+        for _ in range(next_row, n_rows):
+            yield None
+
+    def _iterate_string_payloads(self, n_rows: int, column_type: str) -> Iterator[Optional[bytes]]:
+        for value in self._iterate_rows(n_rows):
+            if value is None:
+                yield None
+            elif column_type == JSON and value[1] == _STR_TAG:
+                yield json.dumps(value[2].decode("utf8")).encode("utf8")
+            else:
+                yield value[2]
+
+    def iterate_data_chunks(self, n_rows: int, column_type: str) -> Iterator[bytes]:
+        """
+        Yields the column data in the encoding of the given column type. String and JSON
+        columns consist of the lengths of all values followed by the concatenated values.
+        """
+        if column_type == INT:
+            yield from _iterate_array_chunks("q", (json.loads(payload) for _, _, _, payload in self._iterate_spool()))
+        elif column_type == FLOAT:
+            yield from _iterate_array_chunks("d", (json.loads(payload) for _, _, _, payload in self._iterate_spool()))
+        elif column_type == TABLE:
+            yield from _iterate_array_chunks("q", (-1 if value is None else value[0]
+                                                   for value in self._iterate_rows(n_rows)))
+        else:
+            yield from _iterate_array_chunks("q", (-1 if payload is None else len(payload)
+                                                   for payload in self._iterate_string_payloads(n_rows, column_type)))
+            chunk = []
+            chunk_size = 0
+            for payload in self._iterate_string_payloads(n_rows, column_type):
+                if payload is not None:
+                    chunk.append(payload)
+                    chunk_size += len(payload)
+                    if chunk_size >= _CHUNK_SIZE:
+                        yield b"".join(chunk)
+                        chunk = []
+                        chunk_size = 0
+            yield b"".join(chunk)
+
+
+class _TableWriter:
+    """
+    Collects the records of a table column by column.
+    Keys are ordered in a single order that is consistent with the key order
+    of most records. Since inserting a new key into this order does not
+    change the relative order of the other keys, whether a record follows
+    the final key order is known when the record is added.
+    """
+    def __init__(self, name: str, spool_dir: str):
+        self.name = name
+        self.spool_dir = spool_dir
+        self.n_rows = 0
+        self.keys = []
+        self.key_positions = {}
+        self.columns: Dict[str, _ColumnWriter] = {}
+        # The distinct key orders of records that do not follow the key order and for each
+        # record the index of its key order + 1 or 0 if the record follows the key order
+        self.layouts = []
+        self.layout_ids = {}
+        self.record_layouts = array("q")
+
+    def add_record(self, record: Dict[str, Any]):
+        previous_key = None
+        for key in record:
+            if key not in self.columns:
+                position = self.keys.index(previous_key) + 1 if previous_key is not None else 0
+                self.keys.insert(position, key)
+                self.columns[key] = _ColumnWriter(self.name, key, self.spool_dir)
+            previous_key = key
+        key_positions = {key: i for i, key in enumerate(self.keys)} if len(self.key_positions) != len(self.keys) \
+            else self.key_positions
+        self.key_positions = key_positions
+        positions = [key_positions[key] for key in record]
+        if all(positions[i] < positions[i + 1] for i in range(len(positions) - 1)):
+            self.record_layouts.append(0)
+        else:
+            layout = tuple(record)
+            if layout not in self.layout_ids:
+                self.layouts.append(list(layout))
+                self.layout_ids[layout] = len(self.layouts)
+            self.record_layouts.append(self.layout_ids[layout])
+        for key, value in record.items():
+            self.columns[key].add(self.n_rows, value)
+        self.n_rows += 1
+
+    def close(self):
+        for column in self.columns.values():
+            column.close()
+
+    def write(self, tables: Dict[str, Dict], blob_writer: _BlobWriter):
+        """
+        Write the compressed columns of the table and its nested tables and add their description to tables.
+        """
+        columns = []
+        tables[self.name] = {"n_rows": self.n_rows, "columns": columns}
+        if self.layouts:
+            # Records whose key order differs from the column order are restored with their original key order
+            blob = blob_writer.write([_to_bytes(self.record_layouts)])
+            tables[self.name]["layouts"] = {"layouts": self.layouts, "blob": blob}
+        for key in self.keys:
+            column = self.columns[key]
+            column_type = column.get_type(self.n_rows)
+            if column_type == TABLE:
+                column.child_table.write(tables, blob_writer)
+            blob = blob_writer.write(column.iterate_data_chunks(self.n_rows, column_type))
+            columns.append({"name": key, "type": column_type, "blob": blob})
+
+
+def write_columnar_file(lines: Iterable[Any], filename: str):
+    """
+    Write the given JSON values, one per line of the original JSONL file, to
+    a columnar file. All values must be objects or all values must be lists
+    of objects.
+    The values are read in a single pass. The values of each column are
+    spooled to a temporary file in the directory of the columnar file and
+    compressed column by column, so apart from 8 bytes per record for the key
+    order of the record, the memory usage does not grow with the number of
+    values.
+    """
+    spool_dir = os.path.dirname(os.path.abspath(filename))
+    root_table = _TableWriter(ROOT_TABLE, spool_dir)
+    line_format = None
+    try:
+        for line in lines:
+            if line_format is None:
+                line_format = LINE_FORMAT_LIST if type(line) is list else LINE_FORMAT_OBJECT
+            if line_format == LINE_FORMAT_LIST and type(line) is list:
+                root_table.add_record({LIST_KEY: line})
+            elif line_format == LINE_FORMAT_OBJECT and type(line) is dict:
+                root_table.add_record(line)
+            else:
+                raise ValueError("Each line must contain a JSON object or each line must contain a list of JSON "
+                                 "objects.")
+        if line_format is None:
+            line_format = LINE_FORMAT_OBJECT
+
+        with tempfile.TemporaryFile(dir=spool_dir) as data_file:
+            tables = {}
+            blob_writer = _BlobWriter(data_file)
+            root_table.write(tables, blob_writer)
+
+            # Replace blob indices by offset and length relative to the end of the header
+            for table in tables.values():
+                for column in table["columns"] + ([table["layouts"]] if "layouts" in table else []):
+                    column["offset"], column["length"] = blob_writer.offsets[column.pop("blob")]
+
+            header = json.dumps({"line_format": line_format, "tables": tables}).encode("utf8")
+            data_file.seek(0)
+            with open(filename, "wb") as file:
+                file.write(MAGIC)
+                file.write(struct.pack("<Q", len(header)))
+                file.write(header)
+                shutil.copyfileobj(data_file, file)
+    finally:
+        root_table.close()
+
+
+class ColumnarFile:
+    """
+    Reader for files written with write_columnar_file().
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("%s is not a columnar file." % filename)
+            header_length = struct.unpack("<Q", file.read(8))[0]
+            header = json.loads(file.read(header_length).decode("utf8"))
+        self.data_start = len(MAGIC) + 8 + header_length
+        self.line_format = header["line_format"]
+        self.tables = header["tables"]
+
+    def get_table_names(self) -> List[str]:
+        """
+        Nested tables are named <parent table>.<key>, e.g. rows.entity_mentions
+        for linked articles or rows.items for evaluation cases.
+        """
+        return list(self.tables)
+
+    def get_column_names(self, table: str) -> List[str]:
+        return [column["name"] for column in self.tables[table]["columns"]]
+
+    def get_n_rows(self, table: str) -> int:
+        return self.tables[table]["n_rows"]
+
+    def _get_column(self, table: str, column_name: str) -> Dict[str, Any]:
+        for column in self.tables[table]["columns"]:
+            if column["name"] == column_name:
+                return column
+        raise KeyError("Table %s has no column %s." % (table, column_name))
+
+    def _read_data(self, column: Dict[str, Any]) -> bytes:
+        with open(self.filename, "rb") as file:
+            file.seek(self.data_start + column["offset"])
+            return zlib.decompress(file.read(column["length"]))
+
+    def _read_values(self, table: str, column: Dict[str, Any]) -> List[Any]:
+        data = self._read_data(column)
+        n_rows = self.get_n_rows(table)
+        if column["type"] == INT:
+            return _from_bytes("q", data).tolist()
+        elif column["type"] == FLOAT:
+            return _from_bytes("d", data).tolist()
+        elif column["type"] == TABLE:
+            return [_MISSING if count < 0 else count for count in _from_bytes("q", data)]
+        values = _decode_strings(data, n_rows)
+        if column["type"] == JSON:
+            values = [value if value is _MISSING else json.loads(value) for value in values]
+        return values
+
+    def read_column(self, table: str, column_name: str) -> List[Any]:
+        """
+        Read the values of a single column. Values of rows that do not contain
+        the key are returned as None. For a nested table column, the number of
+        nested rows per row is returned.
+        """
+        values = self._read_values(table, self._get_column(table, column_name))
+        return [None if value is _MISSING else value for value in values]
+
+    def read_records(self, table: str = ROOT_TABLE) -> List[Dict[str, Any]]:
+        """
+        Read all rows of the given table including their nested tables.
+        """
+        n_rows = self.get_n_rows(table)
+        columns = []
+        for column in self.tables[table]["columns"]:
+            values = self._read_values(table, column)
+            if column["type"] == TABLE:
+                child_records = self.read_records(table + "." + column["name"])
+                child_lists = []
+                position = 0
+                for count in values:
+                    if count is _MISSING:
+                        child_lists.append(_MISSING)
+                    else:
+                        child_lists.append(child_records[position:position + count])
+                        position += count
+                values = child_lists
+            columns.append((column["name"], values))
+        records = []
+        for i in range(n_rows):
+            record = {}
+            for name, values in columns:
+                if values[i] is not _MISSING:
+                    record[name] = values[i]
+            records.append(record)
+
+        if "layouts" in self.tables[table]:
+            layouts = self.tables[table]["layouts"]["layouts"]
+            record_layouts = _from_bytes("q", self._read_data(self.tables[table]["layouts"]))
+            for i, layout_id in enumerate(record_layouts):
+                if layout_id > 0:
+                    records[i] = {key: records[i][key] for key in layouts[layout_id - 1]}
+        return records
+
+    def read_lines(self) -> List[Any]:
+        """
+        Read the JSON values of all lines of the original JSONL file.
+        """
+        records = self.read_records()
+        if self.line_format == LINE_FORMAT_LIST:
+            return [record[LIST_KEY] for record in records]
+        return records
+
+    def get_row_ranges(self, table: str) -> List[Tuple[int, int]]:
+        """
+        For a nested table, return for each row of the root table the range of
+        rows in the nested table that belong to it, e.g. the range of cases
+        for each article.
+        """
+        path = table.split(".")
+        ranges = [(i, i + 1) for i in range(self.get_n_rows(path[0]))]
+        for depth in range(1, len(path)):
+            parent_table = ".".join(path[:depth])
+            counts = self._read_values(parent_table, self._get_column(parent_table, path[depth]))
+            starts = [0]
+            for count in counts:
+                starts.append(starts[-1] + (0 if count is _MISSING else count))
+            ranges = [(starts[start], starts[end]) for start, end in ranges]
+        return ranges
+
+
+def convert_jsonl_to_columnar(jsonl_filename: str, columnar_filename: str):
+    with open(jsonl_filename, "r", encoding="utf8") as file:
+        write_columnar_file((json.loads(line) for line in file), columnar_filename)
+
+
+def convert_columnar_to_jsonl(columnar_filename: str, jsonl_filename: str):
+    columnar_file = ColumnarFile(columnar_filename)
+    with open(jsonl_filename, "w", encoding="utf8") as file:
+        for line in columnar_file.read_lines():
+            file.write(json.dumps(line) + "\n")
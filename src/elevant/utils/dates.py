@@ -1,18 +1,49 @@
 import re
+from functools import lru_cache
 
-from dateutil.parser import parse
+from dateutil.parser import parse, parserinfo
 
 
 _DATE_RE = re.compile("([0-9]{1,2} )?(January|February|March|April|May|June|July|August|September|October|November|December)( [0-9]{1,4})?")
 
+# dateutil only parses a string if it contains a digit or a month or weekday name. dateutil splits words at
+# non-letters and compares them lowercased, so a name must be a lowercased word that is not part of a longer word.
+_MONTH_OR_WEEKDAY_NAMES = sorted({name.lower() for names in parserinfo.MONTHS + parserinfo.WEEKDAYS for name in names},
+                                 key=len, reverse=True)
+_MONTH_OR_WEEKDAY_RE = re.compile(r"(?<![^\W\d_])(%s)(?![^\W\d_])" % "|".join(_MONTH_OR_WEEKDAY_NAMES))
+_DIGIT_RE = re.compile(r"[0-9]")
+
+IS_DATE_CACHE_SIZE = 2 ** 18
+
 
 def is_date_by_re(text: str) -> bool:
     return bool(_DATE_RE.fullmatch(text))
 
 
-def is_date(text: str) -> bool:
+def might_be_date(text: str) -> bool:
+    """
+    Fast check that returns False for texts that dateutil can not parse as a date.
+    """
+    if _DIGIT_RE.search(text) is not None:
+        return True
+    if not text.isascii() and any(c.isdigit() for c in text):
+        # Digits other than 0-9, e.g. superscripts
+        return True
+    return _MONTH_OR_WEEKDAY_RE.search(text.lower()) is not None
+
+
+def is_date_dateutil(text: str) -> bool:
     try:
         parse(text, ignoretz=True)
         return True
     except:
         return False
+
+
+@lru_cache(maxsize=IS_DATE_CACHE_SIZE)
+def is_date(text: str) -> bool:
+    """
+    Returns True if dateutil can parse the text as a date. Texts that can
+    not be dates are rejected without calling dateutil.
+    """
+    return might_be_date(text) and is_date_dateutil(text)
@@ -0,0 +1,77 @@
+"""
+JSON backend used for serializing and deserializing linked articles,
+benchmark articles and evaluation cases.
+
+Parsing uses orjson if it is installed. orjson returns the same Python
+objects as the json module; input that orjson rejects but the json module
+accepts (e.g. NaN) is parsed with the json module.
+
+Serializing uses the json module by default, such that written files are
+byte-identical to files written by earlier versions. With the orjson backend
+the output is more compact and non-ASCII characters are not escaped, but it
+parses to the same objects.
+
+The backend can be selected with the environment variable
+ELEVANT_JSON_BACKEND or with set_backend():
+  auto   - parse with orjson if available, serialize with json (default)
+  orjson - parse and serialize with orjson if available
+  json   - parse and serialize with json
+"""
+
+from enum import Enum
+from typing import Any, Union
+
+import json
+import logging
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+
+class JsonBackend(Enum):
+    AUTO = "auto"
+    ORJSON = "orjson"
+    JSON = "json"
+
+
+_backend = JsonBackend.AUTO
+
+
+def set_backend(backend: Union[JsonBackend, str]):
+    global _backend
+    backend = JsonBackend(backend)
+    if backend == JsonBackend.ORJSON and orjson is None:
+        logger.warning("JSON backend orjson was selected but orjson is not installed. Using json instead.")
+        backend = JsonBackend.JSON
+    _backend = backend
+
+
+def get_backend() -> JsonBackend:
+    return _backend
+
+
+def loads(dump: Union[str, bytes]) -> Any:
+    if orjson is not None and _backend != JsonBackend.JSON:
+        try:
+            return orjson.loads(dump)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(dump)
+
+
+def dumps(data: Any) -> str:
+    if orjson is not None and _backend == JsonBackend.ORJSON:
+        try:
+            return orjson.dumps(data).decode("utf8")
+        except TypeError:
+            # E.g. numpy types or integers that exceed 64 bit
+            pass
+    return json.dumps(data)
+
+
+set_backend(os.environ.get("ELEVANT_JSON_BACKEND", JsonBackend.AUTO.value))
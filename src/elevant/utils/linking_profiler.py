@@ -0,0 +1,191 @@
+"""
+Opt-in instrumentation for the linking pipeline.
+
+While a LinkingProfiler is active, code marks stages with
+
+    with linking_profiler.stage("<stage_name>"):
+        ...
+
+and counts events with linking_profiler.count("<counter_name>"). If no
+profiler is active, stage() returns a no-op context manager and count() does
+nothing, so the instrumentation has (almost) no cost when it is not used.
+
+Stages can be nested. A nested stage is recorded under the path of all
+enclosing stages, e.g. "entity_linking/prediction", so the time of a nested
+stage is also included in the time of its enclosing stages.
+
+Wall time and CPU time of each stage and the counters are recorded per
+article and aggregated to totals, means and percentiles over all articles.
+Counters include the number of LMDB lookups per article.
+Optionally, the whole linking run is profiled with cProfile or, if installed
+and an .html output file is given, with pyinstrument.
+"""
+
+import cProfile
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+from elevant.models.database import Database
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+PERCENTILES = (50, 90, 99)
+
+_active_profiler = None
+
+
+def stage(name: str):
+    """
+    Returns a context manager that records the time of the given stage if a profiler is active.
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.stage(name)
+
+
+def count(name: str, n: Optional[int] = 1):
+    """
+    Increments the given counter of the active profiler, if any.
+    """
+    if _active_profiler is not None:
+        _active_profiler.article_counters[name] += n
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Percentile with linear interpolation between the closest ranks.
+    """
+    if not sorted_values:
+        return 0
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    sorted_values = sorted(values)
+    summary = {"total": sum(sorted_values),
+               "mean": sum(sorted_values) / len(sorted_values) if sorted_values else 0}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = percentile(sorted_values, p)
+    summary["max"] = sorted_values[-1] if sorted_values else 0
+    return summary
+
+
+class LinkingProfiler:
+    def __init__(self, profile_file: Optional[str] = None):
+        """
+        If a profile file is given, the linking run is profiled and the
+        profile is written to the file when the profiler is deactivated.
+        """
+        self.profile_file = profile_file
+        self.wall_times: Dict[str, List[float]] = defaultdict(list)
+        self.cpu_times: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Dict[str, List[int]] = defaultdict(list)
+        self.n_articles = 0
+        self.article_wall_times = Counter()
+        self.article_cpu_times = Counter()
+        self.article_counters = Counter()
+        self._stage_stack = []
+        self._article_start_lookups = 0
+        self._profiler = None
+
+    def activate(self):
+        global _active_profiler
+        _active_profiler = self
+        if self.profile_file:
+            if self.profile_file.endswith(".html"):
+                try:
+                    from pyinstrument import Profiler
+                    self._profiler = Profiler()
+                except ImportError:
+                    logger.warning("pyinstrument is not installed. Using cProfile instead.")
+            if self._profiler is None:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            else:
+                self._profiler.start()
+
+    def deactivate(self):
+        global _active_profiler
+        if _active_profiler is self:
+            _active_profiler = None
+        if self._profiler is not None:
+            if isinstance(self._profiler, cProfile.Profile):
+                self._profiler.disable()
+                self._profiler.dump_stats(self.profile_file)
+            else:
+                self._profiler.stop()
+                with open(self.profile_file, "w", encoding="utf8") as file:
+                    file.write(self._profiler.output_html())
+            logger.info(f"Wrote profile to {self.profile_file}")
+            self._profiler = None
+
+    @contextmanager
+    def stage(self, name: str):
+        self._stage_stack.append(name)
+        path = "/".join(self._stage_stack)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.article_wall_times[path] += time.perf_counter() - start_wall
+            self.article_cpu_times[path] += time.process_time() - start_cpu
+            self._stage_stack.pop()
+
+    def start_article(self):
+        self.article_wall_times = Counter()
+        self.article_cpu_times = Counter()
+        self.article_counters = Counter()
+        self._article_start_lookups = Database.n_lookups
+
+    def end_article(self):
+        """
+        Add the stage times and counters of the current article to the per-article values.
+        Stages and counters that did not occur for the article are recorded as 0.
+        """
+        self.article_counters["lmdb_lookups"] += Database.n_lookups - self._article_start_lookups
+        for name in set(self.wall_times) | set(self.article_wall_times):
+            self.wall_times[name].extend([0] * (self.n_articles - len(self.wall_times[name])))
+            self.wall_times[name].append(self.article_wall_times[name])
+            self.cpu_times[name].extend([0] * (self.n_articles - len(self.cpu_times[name])))
+            self.cpu_times[name].append(self.article_cpu_times[name])
+        for name in set(self.counters) | set(self.article_counters):
+            self.counters[name].extend([0] * (self.n_articles - len(self.counters[name])))
+            self.counters[name].append(self.article_counters[name])
+        self.n_articles += 1
+
+    def reset(self):
+        self.wall_times.clear()
+        self.cpu_times.clear()
+        self.counters.clear()
+        self.n_articles = 0
+
+    def get_summary(self) -> Dict:
+        """
+        Returns for each stage the total, mean, percentiles and maximum of the
+        per-article wall and CPU times in seconds, and the same statistics for each counter.
+        """
+        def padded(values: List) -> List:
+            return values + [0] * (self.n_articles - len(values))
+
+        return {"n_articles": self.n_articles,
+                "stages": {name: {"wall_time": summarize(padded(self.wall_times[name])),
+                                  "cpu_time": summarize(padded(self.cpu_times[name]))}
+                           for name in sorted(self.wall_times)},
+                "counters": {name: summarize(padded(values)) for name, values in sorted(self.counters.items())}}
+
+    def log_summary(self):
+        summary = self.get_summary()
+        logger.info(f"Linking profile over {summary['n_articles']} articles (wall time in ms per article):")
+        for name, times in summary["stages"].items():
+            wall_time = times["wall_time"]
+            logger.info(f"  {name:<40} mean {wall_time['mean'] * 1000:9.2f}  p50 {wall_time['p50'] * 1000:9.2f}  "
+                        f"p90 {wall_time['p90'] * 1000:9.2f}  p99 {wall_time['p99'] * 1000:9.2f}")
+        for name, values in summary["counters"].items():
+            logger.info(f"  {name:<40} mean {values['mean']:9.1f}  total {values['total']}")
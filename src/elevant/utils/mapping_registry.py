@@ -0,0 +1,92 @@
+"""
+Process-wide registry of loaded mappings.
+
+Mappings are registered under their name and the file they are loaded from.
+If a mapping is requested again, e.g. by the entity database of a linker and
+by the entity database of the ner_postprocessor spaCy component, the already
+loaded mapping is returned instead of loading it again. This way, each LMDB
+environment and each mapping dictionary is loaded only once per process.
+Registered mappings must therefore not be modified.
+
+Code that loads mappings can be marked as a component with
+
+    with mapping_registry.component("<component_name>"):
+        ...
+
+The registry records which components requested which mappings, see get_report().
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("main." + __name__.split(".")[-1])
+
+UNKNOWN_COMPONENT = "unknown"
+
+_mappings: Dict[Tuple[str, str], Any] = {}
+_components: Dict[Tuple[str, str], List[str]] = OrderedDict()
+_lock = threading.RLock()
+_local = threading.local()
+
+
+@contextmanager
+def component(name: Optional[str]):
+    """
+    Attribute the mappings requested within the context to the given component.
+    Components can be nested, mappings are attributed to the innermost one.
+    """
+    if not hasattr(_local, "components"):
+        _local.components = []
+    _local.components.append(name or UNKNOWN_COMPONENT)
+    try:
+        yield
+    finally:
+        _local.components.pop()
+
+
+def get_current_component() -> str:
+    components = getattr(_local, "components", None)
+    return components[-1] if components else UNKNOWN_COMPONENT
+
+
+def get_mapping(name: str, filename: str, load_function: Callable[[], Any]) -> Any:
+    """
+    Return the mapping with the given name loaded from the given file. The
+    mapping is loaded by calling load_function() if it was not loaded before.
+    """
+    key = (name, filename)
+    with _lock:
+        current_component = get_current_component()
+        if key in _mappings:
+            logger.debug(f"Sharing {name} from {filename} with component {current_component}.")
+        else:
+            _mappings[key] = load_function()
+            _components[key] = []
+        if current_component not in _components[key]:
+            _components[key].append(current_component)
+        return _mappings[key]
+
+
+def is_registered(name: str, filename: str) -> bool:
+    return (name, filename) in _mappings
+
+
+def get_report() -> List[Tuple[str, str, List[str]]]:
+    """
+    Return the name, file and requesting components of each loaded mapping.
+    """
+    with _lock:
+        return [(name, filename, list(components)) for (name, filename), components in _components.items()]
+
+
+def log_report():
+    shared_mappings = [(name, filename, components) for name, filename, components in get_report()
+                       if len(components) > 1]
+    if not shared_mappings:
+        return
+    logger.info(f"{len(shared_mappings)} mappings are shared between components:")
+    for name, filename, components in shared_mappings:
+        logger.info(f"  {name} ({filename}): {', '.join(components)}")
@@ -1,3 +1,4 @@
+from bisect import bisect_left, insort
 from typing import List
 
 from elevant.evaluation.groundtruth_label import GroundtruthLabel
@@ -17,14 +18,57 @@ class NestedGroundtruthHandler:
                 child_indices.append(i)
         return child_indices
 
+    @staticmethod
+    def get_enclosing_indices(gt_labels: List[GroundtruthLabel]) -> List[List[int]]:
+        """
+        For each groundtruth label in the label list get the list indices of
+        the labels whose span contains the label's span (including labels with
+        the same span).
+
+        Labels are processed sorted by start and, for equal starts, by
+        decreasing end. The labels processed so far are kept sorted by end.
+        Labels that end before the start of the current label can not contain
+        the current label or any of the following labels and are removed. Of
+        the remaining labels, exactly those that end at or after the end of
+        the current label contain it, so they are found by binary search
+        without looking at labels that only overlap the current label. This
+        takes O(n log n + k) time, where k is the number of (label, enclosing
+        label) pairs, plus the time for inserting into the sorted list.
+        """
+        order = sorted(range(len(gt_labels)), key=lambda i: (gt_labels[i].span[0], -gt_labels[i].span[1]))
+        enclosing_indices = [[] for _ in gt_labels]
+        # (end, index) of the processed labels that end at or after the start of the current label
+        open_labels = []
+        k = 0
+        while k < len(order):
+            begin, end = gt_labels[order[k]].span
+            # Labels with the same span contain each other
+            same_span_indices = []
+            while k < len(order) and tuple(gt_labels[order[k]].span) == (begin, end):
+                same_span_indices.append(order[k])
+                k += 1
+            del open_labels[:bisect_left(open_labels, (begin,))]
+            enclosing = [i for _, i in open_labels[bisect_left(open_labels, (end,)):]]
+            for i in same_span_indices:
+                enclosing_indices[i] = sorted(enclosing + [j for j in same_span_indices if j != i])
+            for i in same_span_indices:
+                insort(open_labels, (end, i))
+        return enclosing_indices
+
     @staticmethod
     def assign_parent_and_child_ids(labels: List[GroundtruthLabel]):
         """
         Assign parent and child ids to GT labels in case of nested GT labels.
+        The children of a label are all labels contained in its span in list
+        order and the parent of a label is the last label in the list that
+        contains it.
         """
-        for i, gt_label in enumerate(labels):
-            child_indices = NestedGroundtruthHandler.get_child_indices(i, labels)
-            for child_idx in child_indices:
-                child_gt_label = labels[child_idx]
-                child_gt_label.parent = gt_label.id
-                gt_label.children.append(child_gt_label.id)
+        child_indices = [[] for _ in labels]
+        for i, enclosing_indices in enumerate(NestedGroundtruthHandler.get_enclosing_indices(labels)):
+            if enclosing_indices:
+                labels[i].parent = labels[enclosing_indices[-1]].id
+            for enclosing_idx in enclosing_indices:
+                child_indices[enclosing_idx].append(i)
+        for gt_label, indices in zip(labels, child_indices):
+            for child_idx in indices:
+                gt_label.children.append(labels[child_idx].id)
@@ -1,16 +1,86 @@
+from array import array
+from bisect import bisect_left
 from typing import List, Tuple, Optional
 
 from spacy.tokens import Doc, Token, Span
 
 
+class DocOffsetIndex:
+    """
+    Lookup tables of a doc that map each character offset to a token index
+    and each token to its sentence. The index is created once per doc and
+    stored in doc.user_data, since the OffsetConverter methods are called
+    for almost every token and mention. The tokens and sentence boundaries
+    of the doc must not be changed after the index was created.
+    """
+    USER_DATA_KEY = "elevant_offset_index"
+
+    def __init__(self, doc: Doc):
+        self.doc = doc
+        self.token_starts = array("i", (tok.idx for tok in doc))
+        self.token_ends = array("i", (tok.idx + len(tok) for tok in doc))
+        # Index of the token that contains the character at the offset or -1. Characters between two tokens
+        # belong to the next token, characters before the first and after the last token to no token.
+        self.offset_to_token = array("i", [-1]) * len(doc.text)
+        previous_end = self.token_starts[0] if len(doc) else 0
+        for i, end in enumerate(self.token_ends):
+            self.offset_to_token[previous_end:end] = array("i", [i]) * (end - previous_end)
+            previous_end = end
+        # Sentence tables are only created when they are needed, since a doc might have no sentence boundaries
+        self.sentences = None
+        self.sentences: Optional[List[Span]]
+        self.sentence_end_chars = None
+        self.token_to_sentence = None
+
+    @staticmethod
+    def get(doc: Doc) -> "DocOffsetIndex":
+        index = doc.user_data.get(DocOffsetIndex.USER_DATA_KEY)
+        if index is None or index.doc is not doc:
+            # The user data of a copied doc contains the index of the original doc
+            index = DocOffsetIndex(doc)
+            doc.user_data[DocOffsetIndex.USER_DATA_KEY] = index
+        return index
+
+    def get_token_idx(self, offset: int) -> Optional[int]:
+        if offset < 0 or offset >= len(self.offset_to_token):
+            return None
+        token_idx = self.offset_to_token[offset]
+        return token_idx if token_idx >= 0 else None
+
+    def _index_sentences(self):
+        self.sentences = list(self.doc.sents)
+        self.sentence_end_chars = [sent.end_char for sent in self.sentences]
+        self.token_to_sentence = array("i", [0]) * len(self.doc)
+        for i, sent in enumerate(self.sentences):
+            self.token_to_sentence[sent.start:sent.end] = array("i", [i]) * (sent.end - sent.start)
+
+    def get_sentence(self, offset: int) -> Optional[Span]:
+        """
+        Get the first sentence that ends at or after the offset.
+        """
+        if self.sentences is None:
+            self._index_sentences()
+        i = bisect_left(self.sentence_end_chars, offset)
+        return self.sentences[i] if i < len(self.sentences) else None
+
+    def get_sentence_of_token(self, token_idx: int) -> Span:
+        if self.sentences is None:
+            self._index_sentences()
+        return self.sentences[self.token_to_sentence[token_idx]]
+
+
 class OffsetConverter:
     @staticmethod
     def get_token_idx(offset: int, doc: Doc, left: Optional[int] = None, right: Optional[int] = None) -> int:
         """
-        Performs binary search on the list of token indices in the doc to find
-        the token that contains the character at position offset. If the offset
-        is not found, returns None.
+        Find the token that contains the character at position offset. If the
+        offset lies between two tokens, the next token is returned. If the
+        offset is not found, returns None.
         """
+        if left is None and right is None:
+            return DocOffsetIndex.get(doc).get_token_idx(offset)
+
+        # Binary search on the list of token indices in the given range of the doc
         if left is None:
             left = 0
         if right is None:
@@ -45,16 +115,17 @@ class OffsetConverter:
         """
         Get all tokens that are fully contained in the given span.
         """
+        index = DocOffsetIndex.get(doc)
         # Get the index of the token that contains the start of the span
-        left_i = OffsetConverter.get_token_idx(span[0], doc)
+        left_i = index.get_token_idx(span[0])
         # We only want fully contained tokens, i.e. no tokens that start before the span starts
-        left_i = left_i if doc[left_i].idx >= span[0] else left_i + 1
+        left_i = left_i if index.token_starts[left_i] >= span[0] else left_i + 1
         # Get the index of the token that contains the end of the span
-        right_i = OffsetConverter.get_token_idx(span[1] - 1, doc)  # -1 because right end of span is exclusive
+        right_i = index.get_token_idx(span[1] - 1)  # -1 because right end of span is exclusive
         if right_i is None:
             return doc[left_i:]
         # We only want fully contained tokens, i.e. no tokens that end after the span ends
-        right_i = right_i if doc[right_i].idx + len(doc[right_i].text) <= span[1] else right_i - 1
+        right_i = right_i if index.token_ends[right_i] <= span[1] else right_i - 1
         # Get all contained tokens
         tokens = doc[left_i:right_i + 1]  # + 1 because the token at right_i is fully contained in the span
         return tokens
@@ -63,12 +134,9 @@ class OffsetConverter:
     def get_sentence(offset: int, doc: Doc) -> Span:
         """
         Get the span of the sentence that contains the character at position
-        offset. Binary search is not possible here, since doc.sents is an
-        iterator, so getting the length of doc.sents is in O(n).
+        offset.
         """
-        for i, sent in enumerate(doc.sents):
-            if sent.end_char >= offset:
-                return sent
+        return DocOffsetIndex.get(doc).get_sentence(offset)
 
     @staticmethod
     def get_token_idx_in_sent(offset: int, doc: Doc) -> int:
@@ -77,8 +145,11 @@ class OffsetConverter:
         token index within the sentence that contains it. I.e. if it's the
         first token in the sentence return 0.
         """
-        token = OffsetConverter.get_token(offset, doc)
-        if token:
-            for i, tok in enumerate(token.sent):
-                if tok.idx >= offset:
-                    return i
+        index = DocOffsetIndex.get(doc)
+        token_idx = index.get_token_idx(offset)
+        if token_idx is not None:
+            sent = index.get_sentence_of_token(token_idx)
+            # Index of the first token in the sentence that starts at or after the offset
+            i = bisect_left(index.token_starts, offset, sent.start, sent.end)
+            if i < sent.end:
+                return i - sent.start
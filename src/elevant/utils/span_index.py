@@ -0,0 +1,94 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+
+class SpanIndex:
+    """
+    Sorted-interval index over character spans that supports incremental
+    insertion and removal as well as overlap queries.
+
+    Spans are kept sorted by start (and end). A span overlapping a query
+    span can start at most L characters before the query start, where L is
+    the maximum length of all spans added to the index (L is not reduced
+    when spans are removed). An overlap query therefore inspects the m spans
+    that start in [query start - L, query end) and takes O(log n + m). m is
+    small if all spans are short, but a single long span widens this window
+    for every query, so m can be up to n.
+
+    The index mirrors the semantics of painting span ids into a character
+    array in insertion order: get_overlapping_span() returns the span that
+    covers the first covered character of the query span and, if several
+    spans cover this character, the one that was inserted last.
+    """
+    def __init__(self):
+        self._spans: List[Tuple[int, int]] = []
+        self._insertion_rank: Dict[Tuple[int, int], int] = {}
+        self._next_rank = 0
+        self._max_length = 0
+
+    def add(self, span: Tuple[int, int]):
+        """
+        Add the given span to the index. Adding a span that is already
+        contained in the index keeps its original insertion rank.
+        """
+        span = (span[0], span[1])
+        if span in self._insertion_rank:
+            return
+        insort(self._spans, span)
+        self._insertion_rank[span] = self._next_rank
+        self._next_rank += 1
+        self._max_length = max(self._max_length, span[1] - span[0])
+
+    def remove(self, span: Tuple[int, int]):
+        """
+        Remove the given span from the index. Does nothing if the span is
+        not contained in the index.
+        """
+        span = (span[0], span[1])
+        if span not in self._insertion_rank:
+            return
+        del self._insertion_rank[span]
+        del self._spans[bisect_left(self._spans, span)]
+
+    def get_overlapping_span(self, span: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """
+        Return the span in the index that covers the first covered character
+        within the given span or None if no character within the given span
+        is covered.
+        """
+        begin, end = span
+        if begin >= end:
+            return None
+        best_span = None
+        best_char = None
+        best_rank = -1
+        i = bisect_left(self._spans, (begin - self._max_length,))
+        while i < len(self._spans):
+            span_begin, span_end = self._spans[i]
+            if span_begin >= end or (best_char is not None and span_begin > best_char):
+                break
+            first_char = max(span_begin, begin)
+            if span_end > first_char:
+                rank = self._insertion_rank[(span_begin, span_end)]
+                if best_char is None or first_char < best_char or (first_char == best_char and rank > best_rank):
+                    best_span = (span_begin, span_end)
+                    best_char = first_char
+                    best_rank = rank
+            i += 1
+        return best_span
+
+    def get_span_at(self, position: int) -> Optional[Tuple[int, int]]:
+        """
+        Return the span in the index that covers the given character position
+        or None if the position is not covered.
+        """
+        return self.get_overlapping_span((position, position + 1))
+
+    def overlaps(self, span: Tuple[int, int]) -> bool:
+        return self.get_overlapping_span(span) is not None
+
+    def __contains__(self, span: Tuple[int, int]) -> bool:
+        return span in self._insertion_rank
+
+    def __len__(self) -> int:
+        return len(self._spans)
@@ -0,0 +1,108 @@
+from typing import Any, Dict, Optional
+
+# Key under which the value of a node is stored. Words are strings, so it can not clash with a word.
+_VALUE = None
+
+
+class WordTrie:
+    """
+    Trie whose keys are split into words at spaces, with the same semantics
+    as pygtrie.StringTrie(separator=" "). In addition, a cursor can walk the
+    trie incrementally while a key is extended, see WordTrieCursor.
+    """
+    def __init__(self):
+        self.root = {}
+        self.root: Dict[Optional[str], Any]
+        self.n_keys = 0
+
+    def __setitem__(self, key: str, value: Any):
+        node = self.root
+        for word in key.split(" "):
+            if word not in node:
+                node[word] = {}
+            node = node[word]
+        if _VALUE not in node:
+            self.n_keys += 1
+        node[_VALUE] = value
+
+    def _find_node(self, key: str) -> Optional[Dict[Optional[str], Any]]:
+        node = self.root
+        for word in key.split(" "):
+            node = node.get(word)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, key: str) -> bool:
+        node = self._find_node(key)
+        return node is not None and _VALUE in node
+
+    def __getitem__(self, key: str) -> Any:
+        node = self._find_node(key)
+        if node is None or _VALUE not in node:
+            raise KeyError(key)
+        return node[_VALUE]
+
+    def __len__(self) -> int:
+        return self.n_keys
+
+    def has_subtrie(self, key: str) -> bool:
+        """
+        Returns True if the key is a prefix of another key in the trie.
+        """
+        node = self._find_node(key)
+        return node is not None and len(node) > (1 if _VALUE in node else 0)
+
+    def cursor(self) -> "WordTrieCursor":
+        return WordTrieCursor(self)
+
+
+class WordTrieCursor:
+    """
+    Position in a WordTrie for a key that is extended step by step. Only the
+    appended text is processed on each step, instead of walking the trie
+    from the root for the whole key again.
+    """
+    def __init__(self, trie: WordTrie):
+        # Node of the complete words of the key. None if no key in the trie starts with these words.
+        self._words_node = trie.root
+        # The last word of the key, which is possibly extended by the next step
+        self._last_word = ""
+        self._node = None
+        self._plural_node = None
+
+    def extend(self, text: str):
+        words = (self._last_word + text).split(" ")
+        node = self._words_node
+        for word in words[:-1]:
+            if node is None:
+                break
+            node = node.get(word)
+        self._words_node = node
+        self._last_word = words[-1]
+        self._node = node.get(self._last_word) if node is not None else None
+        # Node of the key without a trailing "s", i.e. of the potential singular form of the key
+        self._plural_node = node.get(self._last_word[:-1]) \
+            if node is not None and self._last_word.endswith("s") else None
+
+    def has_subtrie(self) -> bool:
+        """
+        Returns True if the current key is a prefix of another key in the trie.
+        """
+        return self._node is not None and len(self._node) > (1 if _VALUE in self._node else 0)
+
+    def has_variant(self) -> bool:
+        """
+        Returns True if the current key or its potential singular form is in the trie.
+        """
+        return (self._node is not None and _VALUE in self._node) or \
+            (self._plural_node is not None and _VALUE in self._plural_node)
+
+    def get_variant_value(self) -> Any:
+        """
+        Returns the value of the current key or, if the key is not in the
+        trie, the value of its potential singular form.
+        """
+        if self._node is not None and _VALUE in self._node:
+            return self._node[_VALUE]
+        return self._plural_node[_VALUE]